@@ -0,0 +1,79 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compare the time and the peak Python memory of the reference and identifier
+checks with the identifiers in memory, in the disk-backed SQLite index and in
+the disk index with a Bloom filter prefilter. The memory of SQLite itself is
+not traced, its page cache is bounded.
+
+Run from the repository root with: python -m benchmarks.disk_index
+"""
+
+import argparse
+import tracemalloc
+
+from ghga_validator.core.compiled_schema import CompiledSchema
+from ghga_validator.core.validator import Validator
+from ghga_validator.plugins.ref_validation import RefValidationPlugin
+from ghga_validator.plugins.unique_identifier_validation import (
+    UniqueIdentifierValidationPlugin,
+)
+
+from .utils import SCHEMA, TARGET_CLASS, best_time, synthetic_submission
+
+
+def run():
+    """Run this benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=int, nargs="+", default=[20000, 100000])
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    compiled_schema = CompiledSchema.from_file(SCHEMA)
+    plugins = [
+        RefValidationPlugin(schema=compiled_schema),
+        UniqueIdentifierValidationPlugin(schema=compiled_schema),
+    ]
+
+    modes = {"memory": (False, False), "disk": (True, False), "bloom": (True, True)}
+    print(f"{'objects':>8} {'index':>7} {'time [s]':>9} {'peak [MB]':>10}")
+    for n_samples in args.samples:
+        data = synthetic_submission(n_samples)
+        n_objects = sum(len(objects) for objects in data.values())
+        for mode, (disk_index, prefilter) in modes.items():
+            validator = Validator(
+                schema=compiled_schema,
+                plugins=list(plugins),
+                disk_index=disk_index,
+                prefilter=prefilter,
+            )
+
+            def validate(data=data, validator=validator):
+                validator.validate(data, TARGET_CLASS)
+
+            validation_time = best_time(validate, args.repeat)
+            tracemalloc.start()
+            validate()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(
+                f"{n_objects:>8} {mode:>7}"
+                f" {validation_time:>9.2f} {peak / 1e6:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    run()
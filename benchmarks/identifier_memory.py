@@ -0,0 +1,107 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure the memory the reference and identifier checks record during a
+traversal. The identifier table is compared with recording the identifiers
+as Python objects: a set of identifiers per class, a dictionary from class
+name and identifier to the path of the first object and a tuple per
+reference field.
+
+Run from the repository root with: python -m benchmarks.identifier_memory
+"""
+
+import argparse
+import tracemalloc
+from collections import defaultdict
+from typing import Callable
+
+from ghga_validator.core.compiled_schema import CompiledSchema
+from ghga_validator.core.validator import Validator
+from ghga_validator.my_linkml.object_iterator import ObjectIterator, Projection
+from ghga_validator.my_linkml.schema_index import SchemaIndex
+from ghga_validator.plugins.ref_validation import RefValidationPlugin
+from ghga_validator.plugins.unique_identifier_validation import (
+    UniqueIdentifierValidationPlugin,
+)
+
+from .utils import SCHEMA, TARGET_CLASS, synthetic_submission
+
+
+def peak_memory(function: Callable[[], object]) -> int:
+    """Return the peak of the memory allocated by a call in bytes"""
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def record_objects(index: SchemaIndex, data: dict) -> tuple:
+    """Record identifiers, first paths and references as Python objects"""
+    class_ids: dict[str, set] = defaultdict(set)
+    first_paths: dict[tuple, object] = {}
+    refs = []
+    for class_name, identifier, obj, path in ObjectIterator(
+        index, data, TARGET_CLASS, projection=Projection.REFERENCES
+    ):
+        class_ids[class_name].add(identifier)
+        first_paths.setdefault((class_name, identifier), path)
+        for field, value in obj.items():
+            slot_def = index.slot(class_name, field)
+            if slot_def.range_class and not slot_def.is_inlined:
+                refs.append((slot_def.range_class, field, value, path))
+    return class_ids, first_paths, refs
+
+
+def run():
+    """Run this benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=int, nargs="+", default=[2000, 20000])
+    args = parser.parse_args()
+
+    compiled_schema = CompiledSchema.from_file(SCHEMA)
+    validator = Validator(
+        schema=compiled_schema,
+        plugins=[
+            RefValidationPlugin(schema=compiled_schema),
+            UniqueIdentifierValidationPlugin(schema=compiled_schema),
+        ],
+    )
+
+    print(
+        f"{'objects':>8} {'objects [MB]':>13} {'table [MB]':>11}"
+        f" {'per object [B]':>15} {'saving':>7}"
+    )
+    for n_samples in args.samples:
+        data = synthetic_submission(n_samples)
+        n_objects = sum(len(objects) for objects in data.values())
+
+        objects_peak = peak_memory(
+            lambda data=data: record_objects(compiled_schema.index, data)
+        )
+        table_peak = peak_memory(
+            lambda data=data: validator.validate(data, TARGET_CLASS)
+        )
+        print(
+            f"{n_objects:>8} {objects_peak / 1e6:>13.1f} {table_peak / 1e6:>11.1f}"
+            f" {objects_peak // n_objects:>7} -> {table_peak // n_objects:<4}"
+            f" {objects_peak / table_peak:>6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    run()
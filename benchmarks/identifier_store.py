@@ -0,0 +1,112 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compare the validation of a small submission that references the files of an
+accepted archive, once merged with the archive and once against an identifier
+store in which the archive is registered.
+
+Run from the repository root with: python -m benchmarks.identifier_store
+"""
+
+import argparse
+import tempfile
+from pathlib import Path
+
+from ghga_validator.core.compiled_schema import CompiledSchema
+from ghga_validator.core.identifier_store import (
+    IdentifierStore,
+    submission_identifiers,
+)
+from ghga_validator.core.validator import Validator
+from ghga_validator.plugins.ref_validation import RefValidationPlugin
+from ghga_validator.plugins.unique_identifier_validation import (
+    UniqueIdentifierValidationPlugin,
+)
+
+from .utils import SCHEMA, TARGET_CLASS, best_time, synthetic_submission
+
+
+def run():
+    """Run this benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=int, nargs="+", default=[20000, 100000])
+    parser.add_argument("--references", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    compiled_schema = CompiledSchema.from_file(SCHEMA)
+    plugins = [
+        RefValidationPlugin(schema=compiled_schema),
+        UniqueIdentifierValidationPlugin(schema=compiled_schema),
+    ]
+
+    print(f"{'archive':>8} {'register [s]':>13} {'merged [s]':>11} {'store [s]':>10}")
+    for n_samples in args.samples:
+        archive = synthetic_submission(n_samples)
+        n_objects = sum(len(objects) for objects in archive.values())
+        submission = {
+            "datasets": [
+                {
+                    "alias": "new_dataset",
+                    "files": [
+                        file["alias"] for file in archive["files"][: args.references]
+                    ],
+                }
+            ]
+        }
+        merged = {
+            **archive,
+            "datasets": archive["datasets"] + submission["datasets"],
+        }
+
+        with tempfile.TemporaryDirectory() as directory:
+            store = IdentifierStore(Path(directory) / "identifiers.sqlite")
+
+            def register(store=store, archive=archive):
+                store.register(
+                    "archive",
+                    submission_identifiers(
+                        compiled_schema.index, archive, TARGET_CLASS
+                    ),
+                )
+
+            register_time = best_time(register, 1)
+            merged_time = best_time(
+                lambda merged=merged: Validator(
+                    schema=compiled_schema, plugins=plugins
+                ).validate(merged, TARGET_CLASS),
+                args.repeat,
+            )
+            validator = Validator(
+                schema=compiled_schema, plugins=plugins, identifier_store=store
+            )
+            if not validator.validate(submission, TARGET_CLASS).valid:
+                raise RuntimeError("The references to the archive are not resolved")
+            store_time = best_time(
+                lambda submission=submission, validator=validator: validator.validate(
+                    submission, TARGET_CLASS
+                ),
+                args.repeat,
+            )
+            store.close()
+        print(
+            f"{n_objects:>8} {register_time:>13.2f} {merged_time:>11.3f}"
+            f" {store_time:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,107 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure the effect of interning on a submission parsed from JSON, whose
+strings are distinct objects for every occurrence:
+
+- the time of name lookups in the schema index with the shared names of the
+  index compared to equal copies of the names
+- the memory the reference and identifier visitors retain after traversing
+  the submission, serially and sharded. The records of the sharded traversal
+  are copies of the data, so the visitors own the strings they keep.
+
+Run from the repository root with: python -m benchmarks.interning
+"""
+
+import argparse
+import json
+import tracemalloc
+
+from ghga_validator.core.compiled_schema import CompiledSchema
+from ghga_validator.core.identifier_table import IdentifierTable
+from ghga_validator.core.sharded_traversal import traverse_sharded
+from ghga_validator.my_linkml.object_iterator import ObjectIterator, Projection
+from ghga_validator.plugins.ref_validation import RefValidationPlugin
+from ghga_validator.plugins.unique_identifier_validation import (
+    UniqueIdentifierValidationPlugin,
+)
+
+from .utils import SCHEMA, TARGET_CLASS, best_time, synthetic_submission
+
+
+def run():
+    """Run this benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=int, default=330000)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--lookups", type=int, default=1000000)
+    args = parser.parse_args()
+
+    compiled_schema = CompiledSchema.from_file(SCHEMA)
+    index = compiled_schema.index
+
+    names = [
+        (slot.range_class, slot.name)
+        for slot in index.class_slots(TARGET_CLASS)
+        if slot.range_class
+    ]
+    copies = [json.loads(json.dumps(pair)) for pair in names]
+
+    def lookups(pairs):
+        def look_up(pairs=pairs):
+            for _ in range(args.lookups // len(pairs)):
+                for class_name, slot_name in pairs:
+                    index.slot(class_name, slot_name)
+
+        return look_up
+
+    shared_time = best_time(lookups(names))
+    copies_time = best_time(lookups(copies))
+    print(
+        f"{args.lookups} index lookups: {shared_time:.3f}s with shared names,"
+        f" {copies_time:.3f}s with copies of the names"
+    )
+
+    plugins = [
+        RefValidationPlugin(schema=compiled_schema),
+        UniqueIdentifierValidationPlugin(schema=compiled_schema),
+    ]
+    data = json.loads(json.dumps(synthetic_submission(args.samples)))
+    n_objects = sum(len(objects) for objects in data.values())
+    print(f"{'objects':>8} {'workers':>8} {'retained [MB]':>14}")
+    for workers in (1, args.workers):
+        tracemalloc.start()
+        identifiers = IdentifierTable()
+        visitors = [
+            plugin.visitor(TARGET_CLASS, identifiers=identifiers) for plugin in plugins
+        ]
+        objects = (
+            traverse_sharded(index, data, TARGET_CLASS, Projection.REFERENCES, workers)
+            if workers > 1
+            else ObjectIterator(
+                index, data, TARGET_CLASS, projection=Projection.REFERENCES
+            )
+        )
+        for class_name, identifier, obj, path in objects:
+            for visitor in visitors:
+                visitor.visit(class_name, identifier, obj, path)
+        retained = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"{n_objects:>8} {workers:>8} {retained / 1e6:>14.1f}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,60 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compare the traversal time of the ObjectIterator for each projection. Every
+element's data is read completely, as a consumer of the projection would.
+
+Run from the repository root with: python -m benchmarks.projection
+"""
+
+import argparse
+
+from ghga_validator.core.compiled_schema import CompiledSchema
+from ghga_validator.my_linkml.object_iterator import ObjectIterator, Projection
+
+from .utils import SCHEMA, TARGET_CLASS, best_time, synthetic_submission
+
+
+def run():
+    """Run this benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=int, nargs="+", default=[2000, 20000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    index = CompiledSchema.from_file(SCHEMA).index
+
+    print(f"{'objects':>8}" + "".join(f"{mode.name:>13}" for mode in Projection))
+    for n_samples in args.samples:
+        data = synthetic_submission(n_samples)
+        n_objects = sum(len(objects) for objects in data.values())
+
+        timings = []
+        for projection in Projection:
+
+            def traverse(data=data, projection=projection):
+                for _, _, element, _ in ObjectIterator(
+                    index, data, TARGET_CLASS, projection=projection
+                ):
+                    for _ in element.items():
+                        pass
+
+            timings.append(best_time(traverse, args.repeat))
+        print(f"{n_objects:>8}" + "".join(f"{timing:>12.3f}s" for timing in timings))
+
+
+if __name__ == "__main__":
+    run()
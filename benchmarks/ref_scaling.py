@@ -0,0 +1,70 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure how the reference check of the RefValidationPlugin scales with the
+number of references. The time per reference stays constant if the check is
+linear in the size of the submission.
+
+Run from the repository root with: python -m benchmarks.ref_scaling
+"""
+
+import argparse
+
+from ghga_validator.core.compiled_schema import CompiledSchema
+from ghga_validator.plugins.ref_validation import RefValidationPlugin
+
+from .utils import SCHEMA, TARGET_CLASS, best_time, synthetic_submission
+
+
+def count_refs(data: dict) -> int:
+    """Count the references in a synthetic submission"""
+    return sum(
+        len(obj.get(field, []))
+        for objects in data.values()
+        for obj in objects
+        for field in ("files", "samples")
+    )
+
+
+def run():
+    """Run this benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--samples", type=int, nargs="+", default=[1000, 4000, 16000, 64000]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    plugin = RefValidationPlugin(schema=CompiledSchema.from_file(SCHEMA))
+
+    print(f"{'objects':>8} {'refs':>8} {'check [s]':>10} {'per ref [us]':>13}")
+    for n_samples in args.samples:
+        data = synthetic_submission(n_samples)
+        n_objects = sum(len(objects) for objects in data.values())
+        n_refs = count_refs(data)
+
+        def check(data=data):
+            plugin.validate(data, TARGET_CLASS)
+
+        check_time = best_time(check, args.repeat)
+        print(
+            f"{n_objects:>8} {n_refs:>8} {check_time:>10.3f}"
+            f" {check_time / n_refs * 1e6:>13.2f}"
+        )
+
+
+if __name__ == "__main__":
+    run()
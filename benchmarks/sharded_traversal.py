@@ -0,0 +1,108 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compare the validation of the references and identifiers of a large
+submission by a single process with the traversal of its top-level
+collections by a pool of worker processes.
+
+Besides the wall time, the CPU time of the main process is measured, which
+excludes the worker processes. It is the part of the validation that does
+not run in parallel, and bounds the speedup on a machine with enough cores.
+
+Run from the repository root with: python -m benchmarks.sharded_traversal
+"""
+
+import argparse
+import os
+import time
+from typing import Callable
+
+from ghga_validator.core.compiled_schema import CompiledSchema
+from ghga_validator.core.validator import Validator
+from ghga_validator.plugins.ref_validation import RefValidationPlugin
+from ghga_validator.plugins.unique_identifier_validation import (
+    UniqueIdentifierValidationPlugin,
+)
+
+from .utils import SCHEMA, TARGET_CLASS, synthetic_submission
+
+
+def best_times(function: Callable[[], object], repeat: int) -> tuple[float, float]:
+    """
+    Return the best wall time and the best CPU time of the main process of
+    several calls of a function in seconds
+    """
+    wall_times = []
+    cpu_times = []
+    for _ in range(repeat):
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        function()
+        cpu_times.append(time.process_time() - start_cpu)
+        wall_times.append(time.perf_counter() - start_wall)
+    return min(wall_times), min(cpu_times)
+
+
+def run():
+    """Run this benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=int, nargs="+", default=[50000, 200000])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    compiled_schema = CompiledSchema.from_file(SCHEMA)
+    plugins = [
+        RefValidationPlugin(schema=compiled_schema),
+        UniqueIdentifierValidationPlugin(schema=compiled_schema),
+    ]
+
+    print(f"CPU cores: {os.cpu_count()}")
+    print(
+        f"{'objects':>8} {'workers':>8} {'time [s]':>9} {'speedup':>8}"
+        f" {'main CPU [s]':>13} {'speedup':>8}"
+    )
+    for n_samples in args.samples:
+        data = synthetic_submission(n_samples)
+        n_objects = sum(len(objects) for objects in data.values())
+        serial_times = None
+        for workers in args.workers:
+            validator = Validator(
+                schema=compiled_schema,
+                plugins=plugins,
+                workers=workers,
+                chunk_size=args.chunk_size,
+            )
+            if not validator.validate(data, TARGET_CLASS).valid:
+                raise RuntimeError("The synthetic submission is invalid")
+            wall_time, cpu_time = best_times(
+                lambda data=data, validator=validator: validator.validate(
+                    data, TARGET_CLASS
+                ),
+                args.repeat,
+            )
+            if serial_times is None:
+                serial_times = wall_time, cpu_time
+            print(
+                f"{n_objects:>8} {workers:>8} {wall_time:>9.3f}"
+                f" {serial_times[0] / wall_time:>7.2f}x"
+                f" {cpu_time:>13.3f} {serial_times[1] / cpu_time:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,126 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compare the single traversal shared by all traversing plugins in the
+Validator with two baselines:
+
+- three walks: the reference and uniqueness checks as before the single
+  pass, i.e. three independent walks with full element copies, one to
+  collect the identifiers, one to check the references and one to check the
+  uniqueness. The identifiers are looked up in sets instead of the lists of
+  the original code, which would make this baseline quadratic.
+- per plugin: one traversal per plugin with the visitors of the plugins,
+  i.e. two walks with projected elements.
+
+The speedup is given over the three walks.
+
+Run from the repository root with: python -m benchmarks.single_pass
+"""
+
+import argparse
+from collections import defaultdict
+
+from ghga_validator.core.compiled_schema import CompiledSchema
+from ghga_validator.core.validator import Validator
+from ghga_validator.my_linkml.object_iterator import ObjectIterator
+from ghga_validator.my_linkml.schema_index import SchemaIndex
+from ghga_validator.plugins.base_plugin import TraversingValidationPlugin
+from ghga_validator.plugins.ref_validation import RefValidationPlugin
+from ghga_validator.plugins.unique_identifier_validation import (
+    UniqueIdentifierValidationPlugin,
+)
+
+from .utils import SCHEMA, TARGET_CLASS, best_time, synthetic_submission
+
+
+def three_walks(index: SchemaIndex, data: dict) -> tuple[list, list]:
+    """
+    Check the references and the uniqueness of the identifiers in three
+    walks with full element copies, and return the paths of the unknown
+    references and of the duplicates.
+    """
+    all_ids = defaultdict(set)
+    for class_name, identifier, element, _ in ObjectIterator(index, data, TARGET_CLASS):
+        dict(element)
+        all_ids[class_name].add(identifier)
+
+    missing_refs = []
+    for class_name, _, element, path in ObjectIterator(index, data, TARGET_CLASS):
+        for field, value in dict(element).items():
+            slot = index.slot(class_name, field)
+            if slot.range_class and not slot.is_inlined:
+                missing_refs.extend(
+                    path
+                    for ref in (value if isinstance(value, list) else [value])
+                    if ref not in all_ids[slot.range_class]
+                )
+
+    seen_ids = {}
+    duplicates = []
+    for class_name, identifier, element, path in ObjectIterator(
+        index, data, TARGET_CLASS
+    ):
+        dict(element)
+        if (class_name, identifier) in seen_ids:
+            duplicates.append(path)
+        else:
+            seen_ids[class_name, identifier] = path
+    return missing_refs, duplicates
+
+
+def run():
+    """Run this benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=int, nargs="+", default=[500, 2000, 5000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    compiled_schema = CompiledSchema.from_file(SCHEMA)
+    plugins: list[TraversingValidationPlugin] = [
+        RefValidationPlugin(schema=compiled_schema),
+        UniqueIdentifierValidationPlugin(schema=compiled_schema),
+    ]
+    validator = Validator(schema=compiled_schema, plugins=list(plugins))
+
+    print(
+        f"{'objects':>8} {'three walks [s]':>16} {'per plugin [s]':>15}"
+        f" {'single pass [s]':>16} {'speedup':>8}"
+    )
+    for n_samples in args.samples:
+        data = synthetic_submission(n_samples)
+        n_objects = sum(len(objects) for objects in data.values())
+
+        def separate(data=data):
+            for plugin in plugins:
+                plugin.validate(data, TARGET_CLASS)
+
+        def single_pass(data=data):
+            validator.validate(data, TARGET_CLASS)
+
+        three_walks_time = best_time(
+            lambda data=data: three_walks(compiled_schema.index, data), args.repeat
+        )
+        separate_time = best_time(separate, args.repeat)
+        single_pass_time = best_time(single_pass, args.repeat)
+        print(
+            f"{n_objects:>8} {three_walks_time:>16.3f} {separate_time:>15.3f}"
+            f" {single_pass_time:>16.3f}"
+            f" {three_walks_time / single_pass_time:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    run()
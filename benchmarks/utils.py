@@ -0,0 +1,100 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Synthetic submissions and timing helpers shared by the benchmarks"""
+
+import time
+from pathlib import Path
+from typing import Callable
+
+REPO_ROOT_DIR = Path(__file__).parent.parent.resolve()
+SCHEMA = REPO_ROOT_DIR / "tests" / "fixtures" / "schemas" / "advance_model.yaml"
+TARGET_CLASS = "Submission"
+
+
+def synthetic_submission(n_samples: int, files_per_sample: int = 2) -> dict:
+    """
+    Generate a valid submission for the advance model test schema.
+
+    Every sample refers to its own files, every experiment to ten samples and
+    every dataset to the files of a hundred samples.
+
+    Args:
+        n_samples: Number of samples in the submission
+        files_per_sample: Number of files per sample
+
+    Returns:
+        The submission as JSON object
+    """
+    files = []
+    samples = []
+    for sample_number in range(n_samples):
+        sample_alias = f"sample_{sample_number}"
+        file_aliases = [
+            f"{sample_alias}_R{file_number}"
+            for file_number in range(1, files_per_sample + 1)
+        ]
+        files.extend(
+            {
+                "alias": file_alias,
+                "checksum": f"{index:064x}",
+                "filename": f"{file_alias}.fastq",
+                "format": "fastq",
+                "size": 1000 + index,
+            }
+            for index, file_alias in enumerate(file_aliases, len(files))
+        )
+        samples.append(
+            {
+                "alias": sample_alias,
+                "description": "A synthetic sample.",
+                "files": file_aliases,
+            }
+        )
+    experiments = [
+        {
+            "alias": f"experiment_{start}",
+            "description": "A synthetic experiment.",
+            "samples": [sample["alias"] for sample in samples[start : start + 10]],
+        }
+        for start in range(0, n_samples, 10)
+    ]
+    datasets = [
+        {
+            "alias": f"dataset_{start}",
+            "files": [
+                file_alias
+                for sample in samples[start : start + 100]
+                for file_alias in sample["files"]
+            ],
+        }
+        for start in range(0, n_samples, 100)
+    ]
+    return {
+        "files": files,
+        "datasets": datasets,
+        "samples": samples,
+        "experiments": experiments,
+    }
+
+
+def best_time(function: Callable[[], object], repeat: int = 3) -> float:
+    """Return the best wall time of several calls of a function in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
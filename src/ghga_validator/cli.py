@@ -17,68 +17,178 @@
 """Entrypoint of the package"""
 
 import json
+import os
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
 
+import click
 import typer
 import yaml
 from linkml_runtime.utils.schemaview import SchemaView
+from typer.core import TyperGroup
 
-from ghga_validator.core.models import ValidationReport
+from ghga_validator.core.compiled_schema import CompiledSchema, as_compiled_schema
+from ghga_validator.core.identifier_index import DEFAULT_DISK_INDEX_THRESHOLD
+from ghga_validator.core.identifier_store import (
+    IdentifierStore,
+    submission_identifiers,
+)
+from ghga_validator.core.models import CombinedValidationReport, ValidationReport
+from ghga_validator.core.schema_bundle import is_bundle, read_bundle, write_bundle
+from ghga_validator.core.schema_cache import (
+    DEFAULT_MAX_CACHE_SIZE,
+    SchemaCache,
+    schema_fingerprint,
+)
+from ghga_validator.core.schema_registry import RegisteredSchema, SchemaRegistry
 from ghga_validator.core.validator import Validator
+from ghga_validator.my_linkml.import_store import ImportStore
 from ghga_validator.plugins.base_plugin import ValidationPlugin
 from ghga_validator.plugins.utils import discover_plugins
 from ghga_validator.schema_utils import get_target_class
 
-cli = typer.Typer()
+DEFAULT_COMMAND = "main"
+
+GROUP_OPTIONS = ["--help", "--install-completion", "--show-completion"]
+
+
+class DefaultCommandGroup(TyperGroup):
+    """
+    Command group that runs the default command if the arguments start with
+    an option instead of a command name, so that validation can be invoked
+    without naming the subcommand.
+    """
+
+    def parse_args(self, ctx: click.Context, args: list[str]) -> list[str]:
+        """Insert the default command if no command is given"""
+        if args and args[0].startswith("-") and args[0] not in GROUP_OPTIONS:
+            args = [DEFAULT_COMMAND, *args]
+        return super().parse_args(ctx, args)
+
+
+cli = typer.Typer(cls=DefaultCommandGroup)
 
 DEFAULT_PLUGINS = ["GHGAJsonSchemaValidationPlugin"]
 
 VALIDATION_PLUGINS = ["RefValidationPlugin", "UniqueIdentifierValidationPlugin"]
 
 
-def validate_json_file(
-    file: Path, schema: Path, report: Path, target_class: str
-) -> bool:
+def load_schema(
+    schema: Union[Path, SchemaView, CompiledSchema],
+    target_class: Optional[Union[str, list[str]]] = None,
+    cache: Optional[SchemaCache] = None,
+    import_store: Optional[ImportStore] = None,
+) -> CompiledSchema:
+    """
+    Load a schema once so that it can be shared by all validation steps.
+    Args:
+        schema: The URL or path to YAML file or schema bundle, a SchemaView or a
+            compiled schema
+        target_class: The root class name or names, if already known
+        cache: Cache of compiled schemas, the schema is compiled from scratch if None
+        import_store: Store to resolve schema imports from, if not cached
+    """
+    if isinstance(schema, (str, Path)) and is_bundle(schema):
+        return read_bundle(schema)
+    if cache is not None and isinstance(schema, (str, Path)):
+        return cache.load(schema, target_class)
+    if import_store is not None and isinstance(schema, (str, Path)):
+        return CompiledSchema.from_file(schema, import_store=import_store)
+    return as_compiled_schema(schema)
+
+
+def validate_json_file(  # noqa: PLR0913
+    file: Path,
+    schema: Union[Path, SchemaView, CompiledSchema],
+    report: Path,
+    target_class: Union[str, list[str]],
+    cache: Optional[SchemaCache] = None,
+    registry: Optional[SchemaRegistry] = None,
+    only_class: Optional[str] = None,
+    only_path: Optional[str] = None,
+    workers: int = 1,
+    disk_index_threshold: int = DEFAULT_DISK_INDEX_THRESHOLD,
+    prefilter: bool = False,
+    identifier_store: Optional[IdentifierStore] = None,
+    submission: Optional[str] = None,
+) -> bool:  # pylint: disable=too-many-arguments
     """
     Validate JSON object read from a file against a given schema.
     Store the errors to the validation report.
     Args:
         file: The URL or path to file containing data to be validated
-        schema: The URL or path to YAML file
+        schema: The URL or path to YAML file, a SchemaView or a compiled schema
         report: The URL or path to store the validation results
+        target_class: The root class name, or a list of root class names to
+            validate the object against each of them with a combined report
+        cache: Cache of compiled schemas, the schema is compiled from scratch if None
+        registry: Registry of warm schemas and plugins shared between calls,
+            used for schemas given as path
+        only_class: Restrict the validation to the elements of this class
+        only_path: Restrict the validation to the elements at or below this path,
+            references are still resolved against the whole submission
+        workers: Number of worker processes for the traversal of large submissions
+        disk_index_threshold: File size in bytes above which the identifiers are
+            recorded in a disk-backed index instead of in memory
+        prefilter: Whether to put a Bloom filter in front of the disk indexes,
+            only applies to files above the disk index threshold
+        identifier_store: The identifiers of accepted submissions to resolve
+            references and check uniqueness against
+        submission: The name of the validated submission in the identifier
+            store, if it is registered
     """
     with open(file, encoding="utf8") as json_file:
         submission_json = yaml.safe_load(json_file)
     if submission_json is None:
         raise EOFError(f"<{file}> is empty! Nothing to validate!")
-    schema_view = SchemaView(schema)
-    validation_report = validate(
-        schema_view,
-        target_class=target_class,
-        data=submission_json,
-        plugins=load_plugins(DEFAULT_PLUGINS, schema_view),
-    )
-    if validation_report.valid:
-        default_validation_results = validation_report.validation_results
-        validation_report = validate(
-            schema_view,
-            target_class=target_class,
-            data=submission_json,
-            plugins=load_plugins(VALIDATION_PLUGINS, schema_view),
+    if registry is not None and isinstance(schema, (str, Path)):
+        registered_schema = registry.get(schema)
+    else:
+        compiled_schema = load_schema(schema, target_class, cache=cache)
+        registered_schema = RegisteredSchema(
+            compiled_schema.fingerprint or "", compiled_schema
         )
-        validation_report.validation_results = (
-            default_validation_results + validation_report.validation_results
+    disk_index = os.path.getsize(file) > disk_index_threshold
+    if prefilter and not disk_index:
+        typer.echo(
+            f"<{file}> is not larger than the disk index threshold of"
+            + f" {disk_index_threshold} bytes, the prefilter is not used.",
+            err=True,
         )
+    options = {
+        "only_class": only_class,
+        "only_path": only_path,
+        "workers": workers,
+        "disk_index": disk_index,
+        "prefilter": prefilter and disk_index,
+        "identifier_store": identifier_store,
+        "submission": submission,
+    }
+    validation_report: Union[ValidationReport, CombinedValidationReport]
+    if isinstance(target_class, str):
+        validation_report = _validate_target_class(
+            registered_schema, submission_json, target_class, options
+        )
+        exclude: dict = {"object": True}
     else:
-        typer.echo(
-            "JSON schema validation failed. Subsequent validations skipped.", err=True
+        reports = [
+            _validate_target_class(
+                registered_schema, submission_json, class_name, options
+            )
+            for class_name in dict.fromkeys(target_class)
+        ]
+        validation_report = CombinedValidationReport(
+            object=submission_json,
+            types=[report.type for report in reports],
+            valid=all(report.valid for report in reports),
+            reports=reports,
         )
+        exclude = {"object": True, "reports": {"__all__": {"object"}}}
 
     with open(report, "w", encoding="utf-8") as sub:
         json.dump(
             validation_report.dict(
-                exclude={"object"}, exclude_unset=True, exclude_none=True
+                exclude=exclude, exclude_unset=True, exclude_none=True
             ),
             sub,
             ensure_ascii=False,
@@ -87,8 +197,37 @@ def validate_json_file(
     return validation_report.valid
 
 
+def _validate_target_class(
+    registered_schema: RegisteredSchema,
+    data: dict,
+    target_class: str,
+    options: dict,
+) -> ValidationReport:
+    """
+    Validate an object against the schema for one target class. The
+    structural validation runs first, the other plugins only if it succeeds.
+    The options are passed on to RegisteredSchema.validate.
+    """
+    validation_report = registered_schema.validate(
+        data, target_class, DEFAULT_PLUGINS, **options
+    )
+    if validation_report.valid:
+        default_validation_results = validation_report.validation_results
+        validation_report = registered_schema.validate(
+            data, target_class, VALIDATION_PLUGINS, **options
+        )
+        validation_report.validation_results = (
+            default_validation_results + validation_report.validation_results
+        )
+    else:
+        typer.echo(
+            "JSON schema validation failed. Subsequent validations skipped.", err=True
+        )
+    return validation_report
+
+
 def validate(
-    schema: SchemaView,
+    schema: Union[SchemaView, CompiledSchema],
     target_class: str,
     data: dict,
     plugins: list,
@@ -96,7 +235,7 @@ def validate(
     """
     Validate an object of a particular type against a given schema.
     Args:
-        schema: Virtual LinkML schema (SchemaView)
+        schema: Virtual LinkML schema (SchemaView) or compiled schema
         target_class: The root class name
         data: The JSON object to validate
         plugins: List of plugin class names for validation
@@ -106,7 +245,9 @@ def validate(
     return report
 
 
-def load_plugins(plugin_types: list[str], schema: SchemaView) -> list[ValidationPlugin]:
+def load_plugins(
+    plugin_types: list[str], schema: Union[SchemaView, CompiledSchema]
+) -> list[ValidationPlugin]:
     """Load the list of plugins"""
     plugin_list = []
     discovered_plugins = discover_plugins(ValidationPlugin)
@@ -120,9 +261,12 @@ def load_plugins(plugin_types: list[str], schema: SchemaView) -> list[Validation
 
 
 @cli.command()
-def main(
+def main(  # noqa: PLR0913
     schema: Path = typer.Option(
-        ..., "--schema", "-s", help="Path to metadata schema (modelled using LinkML)"
+        ...,
+        "--schema",
+        "-s",
+        help="Path to metadata schema (modelled using LinkML) or schema bundle",
     ),
     input_file: Path = typer.Option(
         ...,
@@ -141,8 +285,72 @@ def main(
         writable=True,
         help="Path to resulting validation report",
     ),
-    target_class: Optional[str] = typer.Option(None, help="The root class name"),
-):
+    target_class: Optional[list[str]] = typer.Option(
+        None,
+        help="The root class name, can be given several times to validate the"
+        + " input against each class with a combined report",
+    ),
+    cache_dir: Optional[Path] = typer.Option(
+        None,
+        file_okay=False,
+        dir_okay=True,
+        envvar="GHGA_VALIDATOR_CACHE_DIR",
+        help="Directory for caching compiled schemas between runs",
+    ),
+    cache_max_size: int = typer.Option(
+        DEFAULT_MAX_CACHE_SIZE,
+        envvar="GHGA_VALIDATOR_CACHE_MAX_SIZE",
+        help="Maximum size of the schema cache in bytes",
+    ),
+    import_store_dir: Optional[Path] = typer.Option(
+        None,
+        "--import-store",
+        file_okay=False,
+        dir_okay=True,
+        envvar="GHGA_VALIDATOR_IMPORT_STORE",
+        help="Directory to resolve schema imports from instead of the network",
+    ),
+    only_class: Optional[str] = typer.Option(
+        None, help="Only validate the objects of this class"
+    ),
+    only_path: Optional[str] = typer.Option(
+        None,
+        help="Only validate the objects at or below this path of the submission,"
+        + " e.g. 'files' or 'files.0' as in the validation report",
+    ),
+    workers: int = typer.Option(
+        1,
+        envvar="GHGA_VALIDATOR_WORKERS",
+        help="Number of worker processes for the traversal of large submissions",
+    ),
+    disk_index_threshold: int = typer.Option(
+        DEFAULT_DISK_INDEX_THRESHOLD,
+        envvar="GHGA_VALIDATOR_DISK_INDEX_THRESHOLD",
+        help="Input file size in bytes above which identifiers are indexed on"
+        + " disk instead of in memory",
+    ),
+    prefilter: bool = typer.Option(
+        False,
+        envvar="GHGA_VALIDATOR_PREFILTER",
+        help="Decide definitely new identifiers by a Bloom filter in front of"
+        + " the disk index, only applies above --disk-index-threshold",
+    ),
+    identifier_store_file: Optional[Path] = typer.Option(
+        None,
+        "--identifier-store",
+        exists=True,
+        file_okay=True,
+        dir_okay=False,
+        envvar="GHGA_VALIDATOR_IDENTIFIER_STORE",
+        help="Identifier store of accepted submissions to resolve references"
+        + " and check uniqueness against",
+    ),
+    submission: Optional[str] = typer.Option(
+        None,
+        help="Name of the submission in the identifier store, its registered"
+        + " identifiers are not reported as duplicates",
+    ),
+):  # pylint: disable=too-many-arguments
     """
     GHGA Validator
 
@@ -151,16 +359,211 @@ def main(
     YAML format and produces a validation report in JSON format.
     """
     typer.echo("Start validating...")
-    if not target_class:
-        target_class = get_target_class(str(Path(schema).resolve()))
-    if not target_class:
-        raise TypeError(
-            "Target class cannot be inferred,"
-            + "please specify the 'target_class' argument"
+    import_store = ImportStore(import_store_dir) if import_store_dir else None
+    cache = (
+        SchemaCache(cache_dir, max_size=cache_max_size, import_store=import_store)
+        if cache_dir
+        else None
+    )
+    target_classes = list(dict.fromkeys(target_class or []))
+    compiled_schema = load_schema(
+        schema.resolve(), target_classes or None, cache=cache, import_store=import_store
+    )
+    if import_store is not None:
+        cache_info = import_store.cache_info()
+        typer.echo(
+            f"Schema imports: {cache_info.hits} hits, {cache_info.misses} misses"
+        )
+    if not target_classes:
+        inferred_class = get_target_class(compiled_schema)
+        if not inferred_class:
+            raise TypeError(
+                "Target class cannot be inferred,"
+                + "please specify the 'target_class' argument"
+            )
+        target_classes = [inferred_class]
+    identifier_store = (
+        IdentifierStore(identifier_store_file) if identifier_store_file else None
+    )
+    try:
+        valid = validate_json_file(
+            input_file,
+            compiled_schema,
+            report,
+            target_classes[0] if len(target_classes) == 1 else target_classes,
+            only_class=only_class,
+            only_path=only_path,
+            workers=workers,
+            disk_index_threshold=disk_index_threshold,
+            prefilter=prefilter,
+            identifier_store=identifier_store,
+            submission=submission,
         )
-    if validate_json_file(input_file, schema, report, target_class):
+    finally:
+        if identifier_store is not None:
+            identifier_store.close()
+    if valid:
         typer.echo(f"<{input_file}> is valid!")
     else:
         typer.echo(
             f"<{input_file}> is invalid! Look at <{report}> for validation report"
         )
+
+
+@cli.command("compile")
+def compile_schema(
+    schema: Path = typer.Option(
+        ..., "--schema", "-s", help="Path to metadata schema (modelled using LinkML)"
+    ),
+    output: Path = typer.Option(
+        ...,
+        "--output",
+        "-o",
+        file_okay=True,
+        dir_okay=False,
+        writable=True,
+        help="Path to resulting schema bundle",
+    ),
+    target_class: Optional[list[str]] = typer.Option(
+        None,
+        help="Additional root class names to include, tree root classes are"
+        + " always included",
+    ),
+    import_store_dir: Optional[Path] = typer.Option(
+        None,
+        "--import-store",
+        file_okay=False,
+        dir_okay=True,
+        envvar="GHGA_VALIDATOR_IMPORT_STORE",
+        help="Directory to resolve schema imports from instead of the network",
+    ),
+):
+    """
+    Compile a LinkML schema into a schema bundle.
+
+    The bundle contains everything derived from the schema for validation and
+    can be passed to the validator via --schema instead of the LinkML schema.
+    """
+    schema = schema.resolve()
+    import_store = ImportStore(import_store_dir) if import_store_dir else None
+    compiled_schema = CompiledSchema.from_file(
+        schema,
+        fingerprint=schema_fingerprint(schema, import_store),
+        import_store=import_store,
+    )
+    write_bundle(compiled_schema, output, target_class or [])
+    typer.echo(f"Schema bundle written to <{output}>")
+
+
+@cli.command("register")
+def register_submission(  # noqa: PLR0913
+    schema: Path = typer.Option(
+        ...,
+        "--schema",
+        "-s",
+        help="Path to metadata schema (modelled using LinkML) or schema bundle",
+    ),
+    input_file: Path = typer.Option(
+        ...,
+        "--input",
+        "-i",
+        exists=True,
+        file_okay=True,
+        dir_okay=False,
+        readable=True,
+        help="Path to the accepted submission file in JSON format",
+    ),
+    submission: str = typer.Option(
+        ..., help="Name of the submission, replaces its earlier registration"
+    ),
+    identifier_store_file: Path = typer.Option(
+        ...,
+        "--identifier-store",
+        file_okay=True,
+        dir_okay=False,
+        envvar="GHGA_VALIDATOR_IDENTIFIER_STORE",
+        help="Identifier store to register the submission in",
+    ),
+    target_class: Optional[str] = typer.Option(None, help="The root class name"),
+    cache_dir: Optional[Path] = typer.Option(
+        None,
+        file_okay=False,
+        dir_okay=True,
+        envvar="GHGA_VALIDATOR_CACHE_DIR",
+        help="Directory for caching compiled schemas between runs",
+    ),
+    cache_max_size: int = typer.Option(
+        DEFAULT_MAX_CACHE_SIZE,
+        envvar="GHGA_VALIDATOR_CACHE_MAX_SIZE",
+        help="Maximum size of the schema cache in bytes",
+    ),
+    import_store_dir: Optional[Path] = typer.Option(
+        None,
+        "--import-store",
+        file_okay=False,
+        dir_okay=True,
+        envvar="GHGA_VALIDATOR_IMPORT_STORE",
+        help="Directory to resolve schema imports from instead of the network",
+    ),
+):  # pylint: disable=too-many-arguments
+    """
+    Register the identifiers of an accepted submission in an identifier store.
+
+    Submissions validated against the store may reference the objects of the
+    registered submission and must not reuse their identifiers.
+    """
+    import_store = ImportStore(import_store_dir) if import_store_dir else None
+    cache = (
+        SchemaCache(cache_dir, max_size=cache_max_size, import_store=import_store)
+        if cache_dir
+        else None
+    )
+    compiled_schema = load_schema(
+        schema.resolve(), target_class, cache=cache, import_store=import_store
+    )
+    if not target_class:
+        target_class = get_target_class(compiled_schema)
+        if not target_class:
+            raise TypeError(
+                "Target class cannot be inferred,"
+                + "please specify the 'target_class' argument"
+            )
+    with open(input_file, encoding="utf8") as json_file:
+        submission_json = yaml.safe_load(json_file)
+    if submission_json is None:
+        raise EOFError(f"<{input_file}> is empty! Nothing to register!")
+    identifier_store = IdentifierStore(identifier_store_file)
+    try:
+        registered = identifier_store.register(
+            submission,
+            submission_identifiers(
+                compiled_schema.index, submission_json, target_class
+            ),
+        )
+    finally:
+        identifier_store.close()
+    typer.echo(f"Registered {registered} identifiers of <{input_file}> as {submission}")
+
+
+@cli.command("prefetch-imports")
+def prefetch_imports(
+    schema: Path = typer.Option(
+        ..., "--schema", "-s", help="Path to metadata schema (modelled using LinkML)"
+    ),
+    import_store_dir: Path = typer.Option(
+        ...,
+        "--import-store",
+        file_okay=False,
+        dir_okay=True,
+        envvar="GHGA_VALIDATOR_IMPORT_STORE",
+        help="Directory to store the schema imports in",
+    ),
+):
+    """
+    Store all imports of a LinkML schema that are given as CURIE
+    (e.g. linkml:types) in an import store, so that the schema can later be
+    loaded without network access.
+    """
+    stored = ImportStore(import_store_dir).populate(schema.resolve())
+    for path in stored:
+        typer.echo(f"Stored <{path}>")
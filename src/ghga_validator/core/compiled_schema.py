@@ -0,0 +1,173 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""A LinkML schema together with the artifacts derived from it"""
+
+import json
+from copy import deepcopy
+from pathlib import Path
+from typing import Optional, Union
+
+from linkml_runtime.dumpers import yaml_dumper
+from linkml_runtime.linkml_model.meta import SchemaDefinition
+from linkml_runtime.utils.schemaview import SchemaView
+
+from ghga_validator.my_linkml.import_store import ImportStore
+from ghga_validator.my_linkml.schema_index import SchemaIndex
+
+
+class CompiledSchema:
+    """
+    A LinkML schema with all imports resolved and the artifacts that are
+    derived from it during validation (e.g. the generated JSON schema for
+    each target class and the slot lookup index).
+
+    Instances can be pickled. Only the resolved schema definitions and the
+    derived artifacts are stored, the SchemaView is rebuilt on demand.
+
+    Args:
+        schema_view: Virtual LinkML schema (SchemaView)
+        fingerprint: Fingerprint of the schema sources, if known
+        json_schemas: Previously generated JSON schemas by target class
+        index: Previously built lookup index of the schema
+        schema_yaml: Self-contained YAML of the schema, used to build the
+            SchemaView on first access if no schema_view is given
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        schema_view: Optional[SchemaView] = None,
+        fingerprint: Optional[str] = None,
+        json_schemas: Optional[dict[str, dict]] = None,
+        index: Optional[SchemaIndex] = None,
+        schema_yaml: Optional[str] = None,
+    ) -> None:  # pylint: disable=too-many-arguments
+        if schema_view is None and schema_yaml is None:
+            raise ValueError("Either schema_view or schema_yaml must be given")
+        self._schema_view = schema_view
+        self._schema_yaml = schema_yaml
+        self._index = index
+        self.fingerprint = fingerprint
+        self.json_schemas = json_schemas if json_schemas is not None else {}
+
+    @classmethod
+    def from_file(
+        cls,
+        schema: Union[str, Path],
+        fingerprint: Optional[str] = None,
+        import_store: Optional[ImportStore] = None,
+    ) -> "CompiledSchema":
+        """Load a LinkML schema from a file and resolve all of its imports,
+        using the import store if given
+        """
+        if import_store is not None:
+            schema_view = import_store.schema_view(str(schema))
+        else:
+            schema_view = SchemaView(str(schema))
+        schema_view.imports_closure()
+        return cls(schema_view, fingerprint=fingerprint)
+
+    @property
+    def schema_view(self) -> SchemaView:
+        """Virtual LinkML schema (SchemaView), built on first access"""
+        if self._schema_view is None:
+            self._schema_view = SchemaView(self._schema_yaml)
+        return self._schema_view
+
+    @property
+    def index(self) -> SchemaIndex:
+        """Lookup index of slots and identifiers, built on first access"""
+        if self._index is None:
+            self._index = SchemaIndex.from_schema_view(self.schema_view)
+        return self._index
+
+    def json_schema(self, target_class: str) -> dict:
+        """Return the JSON schema for the target class, generating it if needed"""
+        if target_class not in self.json_schemas:
+            # pylint: disable=import-outside-toplevel
+            from ghga_validator.my_linkml.jsonschemagen import (
+                ReachableJsonSchemaGenerator,
+            )
+
+            # The merged schema has no imports left, so the generator does not
+            # resolve them again
+            json_schema_as_string = ReachableJsonSchemaGenerator(
+                schema=self._merged_schema(), top_class=target_class
+            ).serialize()
+            self.json_schemas[target_class] = json.loads(json_schema_as_string)
+        return self.json_schemas[target_class]
+
+    def schema_yaml(self) -> str:
+        """Return the schema as self-contained YAML with all imports merged"""
+        if self._schema_yaml is None:
+            self._schema_yaml = yaml_dumper.dumps(self._merged_schema())
+        return self._schema_yaml
+
+    def _merged_schema(self) -> SchemaDefinition:
+        """Return a copy of the schema definition with all imports merged"""
+        schema_view = self.schema_view
+        # Merge a copy, so that the SchemaView in use is not modified
+        merged_view = SchemaView(deepcopy(schema_view.schema))
+        merged_view.schema_map.update(deepcopy(schema_view.schema_map))
+        merged_view.merge_imports()
+        return merged_view.schema
+
+    def __getstate__(self) -> dict:
+        """Only store the resolved schema definitions and derived artifacts"""
+        state = {
+            "fingerprint": self.fingerprint,
+            "json_schemas": self.json_schemas,
+            "index": self.index,
+        }
+        if self._schema_view is None:
+            state["schema_yaml"] = self._schema_yaml
+        else:
+            state["name"] = self._schema_view.schema.name
+            state["schema_map"] = self._schema_view.schema_map
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """Rebuild the SchemaView from the stored schema definitions"""
+        self._schema_view = None
+        self._schema_yaml = state.get("schema_yaml")
+        if "schema_map" in state:
+            schema_map: dict[str, SchemaDefinition] = state["schema_map"]
+            schema_view = SchemaView(schema_map[state["name"]])
+            # Pre-filling the schema map prevents the imports from being loaded again
+            schema_view.schema_map.update(schema_map)
+            self._schema_view = schema_view
+        self._index = state["index"]
+        self.fingerprint = state["fingerprint"]
+        self.json_schemas = state["json_schemas"]
+
+
+def as_compiled_schema(
+    schema: Union[str, Path, SchemaView, CompiledSchema],
+) -> CompiledSchema:
+    """
+    Return the compiled schema for any of the supported schema representations.
+
+    Args:
+        schema: Path to a YAML schema file, a SchemaView or a compiled schema
+
+    Returns:
+        CompiledSchema: The given compiled schema or a newly compiled one
+    """
+    if isinstance(schema, CompiledSchema):
+        return schema
+    if isinstance(schema, SchemaView):
+        return CompiledSchema(schema)
+    return CompiledSchema.from_file(schema)
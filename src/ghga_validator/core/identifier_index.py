@@ -0,0 +1,253 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Disk-backed index of the identifiers and references of a traversal"""
+
+import json
+import os
+import sqlite3
+import tempfile
+from collections.abc import Hashable, Iterator
+from itertools import groupby
+from numbers import Number
+from operator import itemgetter
+from pathlib import Path
+from typing import Optional, Union
+
+from ghga_validator.core.identifier_table import BloomFilter, IdentifierTable
+
+DEFAULT_BATCH_SIZE = 10000
+
+# Size of a submission file in bytes above which the identifiers are recorded
+# in a disk-backed index by default
+DEFAULT_DISK_INDEX_THRESHOLD = 1024 * 1024 * 1024
+
+# Identifier columns are declared without type, so that strings and numbers
+# are stored as given and compared like in Python
+_TABLES = """
+CREATE TABLE objects (
+    seq INTEGER PRIMARY KEY, class TEXT, identifier, path TEXT, selected INTEGER
+);
+CREATE TABLE known_ids (class TEXT, identifier);
+CREATE TABLE ref_fields (position INTEGER PRIMARY KEY, path TEXT, field TEXT, value TEXT);
+CREATE TABLE refs (position INTEGER, item INTEGER, class TEXT, identifier);
+"""
+
+_INSERTS = {
+    "objects": "INSERT INTO objects (class, identifier, path, selected)"
+    " VALUES (?, ?, ?, ?)",
+    "known_ids": "INSERT INTO known_ids VALUES (?, ?)",
+    "ref_fields": "INSERT INTO ref_fields VALUES (?, ?, ?, ?)",
+    "refs": "INSERT INTO refs VALUES (?, ?, ?, ?)",
+}
+
+# Every occurrence of an identifier after the first one, with the path of the
+# first one, if the occurrence or the first one is selected
+_DUPLICATES = """
+SELECT class, identifier, path, first_path FROM (
+    SELECT
+        seq, class, identifier, path, selected,
+        first_value(path) OVER occurrences AS first_path,
+        first_value(selected) OVER occurrences AS first_selected,
+        row_number() OVER occurrences AS occurrence
+    FROM objects AS o
+    {candidates}
+    WINDOW occurrences AS (PARTITION BY class, identifier ORDER BY seq)
+)
+WHERE occurrence > 1 AND (selected OR first_selected)
+ORDER BY seq
+"""
+
+# Restriction of the duplicate identifiers to the candidates of a prefilter
+_CANDIDATES = """
+WHERE EXISTS (
+    SELECT 1 FROM candidates AS c
+    WHERE c.class = o.class AND c.identifier IS o.identifier
+)
+"""
+
+# The references that do not match any known identifier of their class
+_MISSING_REFS = """
+SELECT f.position, f.path, f.field, f.value, r.item, r.class
+FROM refs AS r JOIN ref_fields AS f ON f.position = r.position
+WHERE NOT EXISTS (
+    SELECT 1 FROM known_ids AS k
+    WHERE k.class = r.class AND k.identifier = r.identifier
+)
+ORDER BY r.position, r.item
+"""
+
+
+class SqliteIdentifierIndex:
+    """
+    Index of the identifiers and references of a traversal in a temporary
+    SQLite database, for submissions whose identifiers do not fit in memory.
+    Rows are inserted in batches, duplicate identifiers and missing
+    references are found by set-based queries once all objects are visited.
+    Unlike the IdentifierTable, an index is used by a single visitor. The
+    database is deleted when the index is closed.
+
+    With a prefilter, the identifiers of the objects are also added to a
+    Bloom filter in memory. Identifiers that are definitely new are decided
+    by the filter, only the objects whose identifier was possibly seen before
+    are checked for duplicates in the database. The filter saves this
+    lookup, not the writes: every object is still inserted, since the report
+    of a later duplicate needs the path of the first object, which the filter
+    does not keep. References are always checked in the database: a
+    reference that resolves is possibly known to the filter and has to be
+    looked up anyway.
+
+    Args:
+        directory: Directory for the database file, defaults to the
+            directory for temporary files
+        batch_size: Number of rows inserted at once
+        prefilter: Whether to decide the new identifiers by a Bloom filter
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        prefilter: bool = False,
+    ):
+        file_descriptor, file_name = tempfile.mkstemp(
+            prefix="ghga-validator-", suffix=".sqlite", dir=directory
+        )
+        os.close(file_descriptor)
+        self._file = Path(file_name)
+        self._connection = sqlite3.connect(self._file)
+        self._connection.executescript(
+            "PRAGMA journal_mode = OFF; PRAGMA synchronous = OFF;" + _TABLES
+        )
+        self._batch_size = batch_size
+        self._pending: dict[str, list[tuple]] = {table: [] for table in _INSERTS}
+        self._ref_fields = 0
+        self._seen_ids = BloomFilter() if prefilter else None
+        # The keys of the objects that possibly reuse an identifier
+        self._candidates: set[tuple[str, Hashable]] = set()
+
+    def _insert(self, table: str, row: tuple) -> None:
+        """Queue a row for insertion, a full batch is inserted at once"""
+        pending = self._pending[table]
+        pending.append(row)
+        if len(pending) >= self._batch_size:
+            self._connection.executemany(_INSERTS[table], pending)
+            pending.clear()
+
+    def _flush(self) -> None:
+        """Insert all queued rows"""
+        for table, pending in self._pending.items():
+            self._connection.executemany(_INSERTS[table], pending)
+            pending.clear()
+
+    def add_object(
+        self,
+        class_name: str,
+        identifier: Optional[Union[str, Number]],
+        path: str,
+        selected: bool,
+    ) -> None:
+        """Record an object for the duplicate detection"""
+        self._insert("objects", (class_name, identifier, path, selected))
+        if self._seen_ids is not None:
+            key = (class_name, identifier)
+            if self._seen_ids.add(key):
+                self._candidates.add(key)
+
+    def add_known_id(
+        self, class_name: str, identifier: Optional[Union[str, Number]]
+    ) -> None:
+        """Record the identifier of an object that can be referenced"""
+        self._insert("known_ids", (class_name, identifier))
+
+    def add_reference_field(
+        self,
+        range_class: str,
+        field: str,
+        value: Union[list, str, Number],
+        path: str,
+    ) -> None:
+        """Record the references of a field to objects of the range class"""
+        position = self._ref_fields
+        self._ref_fields += 1
+        self._insert("ref_fields", (position, path, field, json.dumps(value)))
+        for item, ref in enumerate(value if isinstance(value, list) else [value]):
+            # Values that can not be identifiers never match
+            if not isinstance(ref, (str, int, float)):
+                ref = None
+            self._insert("refs", (position, item, range_class, ref))
+
+    def duplicates(self) -> Iterator[tuple[str, Union[str, Number], str, str]]:
+        """
+        Return the duplicate identifiers in the order of the objects.
+
+        Returns:
+            Iterator over the class name, identifier, path and path of the first
+            occurrence of all objects with an identifier used before
+        """
+        self._flush()
+        if self._seen_ids is None:
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS objects_key"
+                " ON objects (class, identifier, seq)"
+            )
+            return self._connection.execute(_DUPLICATES.format(candidates=""))
+        # Only the objects of the candidates can be duplicates
+        if not self._candidates:
+            return iter(())
+        self._connection.executescript(
+            "DROP TABLE IF EXISTS candidates;"
+            " CREATE TEMP TABLE candidates (class TEXT, identifier);"
+        )
+        self._connection.executemany(
+            "INSERT INTO candidates VALUES (?, ?)", self._candidates
+        )
+        self._connection.execute(
+            "CREATE INDEX candidates_key ON candidates (class, identifier)"
+        )
+        return self._connection.execute(_DUPLICATES.format(candidates=_CANDIDATES))
+
+    def missing_references(
+        self,
+    ) -> Iterator[tuple[str, str, str, Union[list, str, Number], list]]:
+        """
+        Return the reference fields with references that do not match the
+        identifier of any object of the range class.
+
+        Returns:
+            Iterator over the path, field, range class, value and the missing
+            references of the reference fields, in the order the fields were
+            recorded
+        """
+        self._flush()
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS known_ids_key ON known_ids (class, identifier)"
+        )
+        rows = self._connection.execute(_MISSING_REFS)
+        for _, field_rows in groupby(rows, key=itemgetter(0)):
+            missing = list(field_rows)
+            _, path, field, value, _, range_class = missing[0]
+            value = json.loads(value)
+            values = value if isinstance(value, list) else [value]
+            yield path, field, range_class, value, [values[row[4]] for row in missing]
+
+    def close(self) -> None:
+        """Close and delete the database"""
+        self._connection.close()
+        self._file.unlink(missing_ok=True)
+
+
+# The identifier containers a visitor can record the identifiers in
+IdentifierIndex = Union[IdentifierTable, SqliteIdentifierIndex]
@@ -0,0 +1,209 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Persistent store of the identifiers of accepted submissions"""
+
+import copy
+import sqlite3
+import threading
+from collections.abc import Hashable, Iterable, Iterator
+from itertools import groupby, islice
+from operator import itemgetter
+from pathlib import Path
+from typing import Optional, Union
+
+from ghga_validator.my_linkml.object_iterator import ObjectIterator, Projection
+from ghga_validator.my_linkml.schema_index import SchemaIndex
+
+# Number of identifiers looked up by one query
+DEFAULT_LOOKUP_BATCH_SIZE = 500
+
+# Identifiers are declared without type, so that strings and numbers are
+# stored as given and compared like in Python
+_TABLES = """
+CREATE TABLE IF NOT EXISTS identifiers (
+    class TEXT NOT NULL,
+    identifier NOT NULL,
+    submission TEXT NOT NULL,
+    PRIMARY KEY (class, identifier)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS identifiers_submission ON identifiers (submission);
+"""
+
+# The registered identifiers of a class among the given ones, the
+# placeholders of the identifiers are appended
+_LOOKUP = (
+    "SELECT identifier, submission FROM identifiers WHERE class = ? AND identifier IN"
+)
+
+# Condition appended to the lookup to ignore the identifiers of a submission
+_EXCLUDE = " AND submission != ?"
+
+# The class name and identifier of an object
+IdentifierKey = tuple[str, Hashable]
+
+
+def _storable(identifier: Hashable) -> bool:
+    """Return whether an identifier can be stored and looked up in the store"""
+    if isinstance(identifier, int):
+        return -(2**63) <= identifier < 2**63
+    return isinstance(identifier, (str, float))
+
+
+def submission_identifiers(
+    index: SchemaIndex, data: dict, target_class: str
+) -> Iterator[IdentifierKey]:
+    """
+    Return the class names and identifiers of all objects of a submission
+    that have an identifier.
+
+    Args:
+        index: Lookup index of the schema
+        data: The submission
+        target_class: The root class name
+
+    Returns:
+        Iterator over the class name and identifier of the objects
+    """
+    for class_name, identifier, _, _ in ObjectIterator(
+        index, data, target_class, projection=Projection.IDENTIFIERS
+    ):
+        if identifier is not None:
+            yield class_name, identifier
+
+
+class IdentifierStore:
+    """
+    Store of the identifiers of accepted submissions in a local SQLite
+    database, which persists between validations. The identifiers of a
+    submission are registered once it is accepted. References of new
+    submissions to objects of accepted submissions are resolved by batched
+    lookups in the store, and identifiers of new submissions can be checked
+    for uniqueness across submissions.
+
+    An identifier of a class can only be registered by one submission. The
+    store can be shared by the threads of a process. A submission that is
+    validated again, e.g. after a correction, is looked up in a view of the
+    store without its own identifiers.
+
+    Args:
+        path: Path of the database file, which is created if it does not exist
+        batch_size: Number of identifiers looked up by one query
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        batch_size: int = DEFAULT_LOOKUP_BATCH_SIZE,
+    ):
+        self.path = Path(path)
+        self._batch_size = batch_size
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.executescript(_TABLES)
+        self._lock = threading.Lock()
+        self._excluded: Optional[str] = None
+
+    def excluding(self, submission: str) -> "IdentifierStore":
+        """
+        Return a view of the store in which the identifiers of a submission
+        are not found. The view shares the database with the store.
+        """
+        view = copy.copy(self)
+        view._excluded = submission
+        return view
+
+    def register(self, submission: str, identifiers: Iterable[IdentifierKey]) -> int:
+        """
+        Register the identifiers of an accepted submission. The identifiers
+        registered for the submission before are replaced.
+
+        Args:
+            submission: The name of the submission
+            identifiers: The class names and identifiers of its objects
+
+        Returns:
+            The number of identifiers registered
+
+        Raises:
+            ValueError: If an identifier is registered by another submission,
+                is given twice or can not be stored
+        """
+        rows = []
+        for class_name, identifier in identifiers:
+            if not _storable(identifier):
+                raise ValueError(
+                    f"Identifier {identifier!r} of class {class_name} can not be"
+                    + " stored"
+                )
+            rows.append((class_name, identifier, submission))
+        try:
+            with self._lock, self._connection:
+                self._connection.execute(
+                    "DELETE FROM identifiers WHERE submission = ?", (submission,)
+                )
+                self._connection.executemany(
+                    "INSERT INTO identifiers VALUES (?, ?, ?)", rows
+                )
+        except sqlite3.IntegrityError as error:
+            raise ValueError(
+                f"Submission {submission} uses identifiers twice or identifiers"
+                + " registered by another submission"
+            ) from error
+        return len(rows)
+
+    def remove(self, submission: str) -> int:
+        """Remove the identifiers of a submission and return their number"""
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "DELETE FROM identifiers WHERE submission = ?", (submission,)
+            )
+        return cursor.rowcount
+
+    def find(self, identifiers: Iterable[IdentifierKey]) -> dict[IdentifierKey, str]:
+        """
+        Look up identifiers in the store, in batches per class. In a view
+        without a submission, its identifiers are not found.
+
+        Args:
+            identifiers: The class names and identifiers to look up
+
+        Returns:
+            The submission that registered each identifier found, by class name
+            and identifier
+        """
+        keys = sorted(
+            {key for key in identifiers if _storable(key[1])},
+            key=itemgetter(0),
+        )
+        found: dict[IdentifierKey, str] = {}
+        for class_name, class_keys in groupby(keys, key=itemgetter(0)):
+            values = (identifier for _, identifier in class_keys)
+            while batch := list(islice(values, self._batch_size)):
+                placeholders = ", ".join("?" * len(batch))
+                query = f"{_LOOKUP} ({placeholders})"
+                parameters = [class_name, *batch]
+                if self._excluded is not None:
+                    query += _EXCLUDE
+                    parameters.append(self._excluded)
+                with self._lock:
+                    rows = self._connection.execute(query, parameters).fetchall()
+                for identifier, submission in rows:
+                    found[(class_name, identifier)] = submission
+        return found
+
+    def close(self) -> None:
+        """Close the database"""
+        with self._lock:
+            self._connection.close()
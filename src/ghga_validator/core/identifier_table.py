@@ -0,0 +1,221 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compact containers for the identifiers and paths recorded in a traversal"""
+
+from array import array
+from collections.abc import Hashable
+from typing import Optional, Union
+
+from ghga_validator.utils import ObjectPath
+
+DEFAULT_BLOOM_CAPACITY = 65536
+
+
+class IdentifierTable:
+    """
+    Dictionary encoding of the identifiers in the data. Each distinct
+    identifier of a class is mapped once to a dense integer code, the codes of
+    different classes do not overlap. The visitors of a traversal share the
+    table and record identifiers and references by their codes in integer
+    containers instead of as Python objects.
+
+    The table also interns the identifiers: a code is decoded to the first
+    encoded object of the identifier, so that a definition and all references
+    to it share one object.
+    """
+
+    def __init__(self) -> None:
+        self._codes: dict[str, dict[Hashable, int]] = {}
+        self._identifiers: list[Hashable] = []
+
+    def encode(self, class_name: str, identifier: Hashable) -> int:
+        """
+        Return the code of an identifier of a class, a new code is assigned
+        to an identifier that was not encoded before.
+
+        Raises:
+            TypeError: If the identifier is not hashable
+        """
+        codes = self._codes.get(class_name)
+        if codes is None:
+            codes = self._codes[class_name] = {}
+        size = len(self._identifiers)
+        code = codes.setdefault(identifier, size)
+        if code == size:
+            self._identifiers.append(identifier)
+        return code
+
+    def decode(self, code: int) -> Hashable:
+        """Return the identifier of a code"""
+        return self._identifiers[code]
+
+    def __len__(self) -> int:
+        """Return the number of encoded identifiers"""
+        return len(self._identifiers)
+
+
+class IdentifierSet:
+    """Set of identifier codes, stored as bitmap with one bit per code"""
+
+    __slots__ = ("_bits",)
+
+    def __init__(self) -> None:
+        self._bits = bytearray()
+
+    def add(self, code: int) -> bool:
+        """Add a code to the set and return whether it was not in the set yet"""
+        byte, bit = code >> 3, 1 << (code & 7)
+        bits = self._bits
+        if byte >= len(bits):
+            bits.extend(bytes(byte + 1 - len(bits)))
+        if bits[byte] & bit:
+            return False
+        bits[byte] |= bit
+        return True
+
+    def __contains__(self, code: int) -> bool:
+        """Return whether a code is in the set"""
+        byte = code >> 3
+        return byte < len(self._bits) and bool(self._bits[byte] & 1 << (code & 7))
+
+
+class PathArray:
+    """
+    Array of element paths. A path is stored by the position of its parent
+    path, which is shared by the elements of a collection, and by its list
+    index, so that a stored path takes a few bytes instead of a path node.
+    """
+
+    # Key of a path stored as its own parent, i.e. the root path
+    _SELF = None
+
+    def __init__(self) -> None:
+        self._parents: list[ObjectPath] = []
+        self._parent_positions: dict[int, int] = {}
+        self._parent_of = array("l")
+        self._indices = array("q")
+        self._other_keys: dict[int, Optional[Union[str, int]]] = {}
+
+    def append(self, path: ObjectPath) -> int:
+        """Store a path at the end of the array and return its position"""
+        self._parent_of.append(-1)
+        self._indices.append(0)
+        position = len(self._indices) - 1
+        self[position] = path
+        return position
+
+    def __setitem__(self, position: int, path: ObjectPath) -> None:
+        """Store a path at a position, the array is extended as required"""
+        if position >= len(self._indices):
+            missing = position + 1 - len(self._indices)
+            self._parent_of.extend([-1] * missing)
+            self._indices.extend([0] * missing)
+
+        parent = path.parent
+        key: Optional[Union[str, int]] = path.key
+        if parent is None:
+            parent, key = path, self._SELF
+        parent_position = self._parent_positions.get(id(parent))
+        if parent_position is None:
+            parent_position = self._parent_positions[id(parent)] = len(self._parents)
+            self._parents.append(parent)
+
+        self._parent_of[position] = parent_position
+        if isinstance(key, int) and key >= 0:
+            self._indices[position] = key
+            self._other_keys.pop(position, None)
+        else:
+            self._other_keys[position] = key
+
+    def __getitem__(self, position: int) -> ObjectPath:
+        """Return the path stored at a position"""
+        parent_position = self._parent_of[position]
+        if parent_position < 0:
+            raise IndexError(f"No path stored at position {position}")
+        parent = self._parents[parent_position]
+        if position not in self._other_keys:
+            return parent.child(self._indices[position])
+        key = self._other_keys[position]
+        return parent if key is self._SELF else parent.child(key)
+
+    def __len__(self) -> int:
+        """Return the size of the array"""
+        return len(self._indices)
+
+
+class BloomFilter:
+    """
+    Probabilistic set of keys with two bytes per key. A lookup is either
+    definitely absent or possibly present, with a false positive rate of a
+    few percent. Keys are hashed with the Python hash, so a filter is only
+    valid within one process.
+
+    The filter is blocked: the hash of a key selects one byte and three bits
+    of it, so that a lookup reads a single byte. It grows with the number of
+    keys: when a stage holds its capacity, a stage with twice the capacity is
+    added. Unhashable keys are always reported as possibly present.
+
+    Args:
+        capacity: Number of keys of the first stage
+    """
+
+    __slots__ = ("_stages", "_capacity", "_count")
+
+    _BYTES_PER_KEY = 2
+
+    def __init__(self, capacity: int = DEFAULT_BLOOM_CAPACITY) -> None:
+        self._stages: list[bytearray] = []
+        self._capacity = capacity // 2
+        self._count = self._capacity
+
+    def add(self, key: Hashable) -> bool:
+        """Add a key to the filter and return whether it was possibly present"""
+        try:
+            key_hash = hash(key)
+        except TypeError:
+            return True
+        # The bits of the key in the byte selected by the key
+        mask = (
+            1 << (key_hash >> 40 & 7)
+            | 1 << (key_hash >> 43 & 7)
+            | 1 << (key_hash >> 46 & 7)
+        )
+        for stage in self._stages:
+            if stage[key_hash % len(stage)] & mask == mask:
+                return True
+        if self._count >= self._capacity:
+            self._capacity *= 2
+            self._count = 0
+            self._stages.append(bytearray(self._capacity * self._BYTES_PER_KEY))
+        stage = self._stages[-1]
+        stage[key_hash % len(stage)] |= mask
+        self._count += 1
+        return False
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Return whether a key is possibly in the filter"""
+        try:
+            key_hash = hash(key)
+        except TypeError:
+            return True
+        mask = (
+            1 << (key_hash >> 40 & 7)
+            | 1 << (key_hash >> 43 & 7)
+            | 1 << (key_hash >> 46 & 7)
+        )
+        return any(
+            stage[key_hash % len(stage)] & mask == mask for stage in self._stages
+        )
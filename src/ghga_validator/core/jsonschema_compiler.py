@@ -0,0 +1,533 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Compile JSON schemas into specialized Python validation code.
+
+For every subschema two functions are generated: _ok_<n> checks whether an
+instance is valid using plain Python operations, _err_<n> yields the errors.
+Errors are only collected for subtrees that failed the check, and the error of
+a failing keyword is created by the keyword implementation of jsonschema, so
+that messages, paths and values are the same as with Draft7Validator.
+Keywords the compiler has no specialized code for are delegated to jsonschema.
+"""
+
+import hashlib
+import json
+import marshal
+import numbers
+import os
+import re
+import sys
+import tempfile
+from collections.abc import Iterator
+from importlib.metadata import version
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+from urllib.parse import unquote
+
+from jsonschema import Draft7Validator
+from jsonschema.exceptions import ValidationError
+
+ENGINE_VERSION = 1
+
+CODE_FILE_SUFFIX = ".code"
+
+_TYPE_EXPRESSIONS = {
+    "array": "isinstance(instance, list)",
+    "boolean": "isinstance(instance, bool)",
+    "integer": "(isinstance(instance, int) and not isinstance(instance, bool))"
+    + " or (isinstance(instance, float) and instance.is_integer())",
+    "null": "instance is None",
+    "number": "isinstance(instance, _Number) and not isinstance(instance, bool)",
+    "object": "isinstance(instance, dict)",
+    "string": "isinstance(instance, str)",
+}
+
+Lines = list[str]
+
+
+class UnsupportedSchemaError(ValueError):
+    """This error is produced if a JSON schema uses features the compiler does
+    not support, i.e. references to other documents or nested base URIs.
+    """
+
+
+class _SchemaNodes:
+    """Numbers all subschemas of a JSON schema that get their own functions.
+    The numbering only depends on the JSON schema, so it can be recomputed
+    when loading previously compiled code.
+    """
+
+    def __init__(self, root: Union[dict, bool]):
+        self.root = root
+        self.nodes: list[Union[dict, bool]] = []
+        self._numbers: dict[int, int] = {}
+        self.number(root)
+        position = 0
+        while position < len(self.nodes):
+            for child in self._children(self.nodes[position]):
+                self.number(child)
+            position += 1
+
+    def number(self, schema: Union[dict, bool]) -> int:
+        """Return the number of a subschema, numbering it if needed"""
+        if id(schema) not in self._numbers:
+            if isinstance(schema, dict) and schema is not self.root and "$id" in schema:
+                raise UnsupportedSchemaError("Nested $id is not supported")
+            self._numbers[id(schema)] = len(self.nodes)
+            self.nodes.append(schema)
+        return self._numbers[id(schema)]
+
+    def resolve(self, ref: Any) -> Union[dict, bool]:
+        """Resolve a reference to a subschema of the same document"""
+        if not isinstance(ref, str) or not ref.startswith("#"):
+            raise UnsupportedSchemaError(f"Reference {ref!r} is not supported")
+        target: Any = self.root
+        for part in ref[1:].split("/")[1:]:
+            part = unquote(part).replace("~1", "/").replace("~0", "~")
+            if isinstance(target, dict) and part in target:
+                target = target[part]
+            elif (
+                isinstance(target, list) and part.isdigit() and int(part) < len(target)
+            ):
+                target = target[int(part)]
+            else:
+                raise UnsupportedSchemaError(f"Reference {ref!r} cannot be resolved")
+            if isinstance(target, dict) and "$id" in target:
+                raise UnsupportedSchemaError("Nested $id is not supported")
+        if not isinstance(target, (dict, bool)):
+            raise UnsupportedSchemaError(f"Reference {ref!r} is not a schema")
+        return target
+
+    def _children(self, schema: Union[dict, bool]) -> Iterator[Union[dict, bool]]:
+        """Yield the subschemas the generated code descends into"""
+        if not isinstance(schema, dict):
+            return
+        if "$ref" in schema:
+            yield self.resolve(schema["$ref"])
+            return
+        for keyword, value in schema.items():
+            if keyword == "properties" and isinstance(value, dict):
+                yield from value.values()
+            elif (keyword in ("items", "not") and isinstance(value, (dict, bool))) or (
+                keyword == "additionalProperties"
+                and isinstance(value, dict)
+                and "patternProperties" not in schema
+            ):
+                yield value
+            elif keyword in ("anyOf", "allOf", "oneOf") and isinstance(value, list):
+                yield from value
+
+
+class _CodeGenerator:
+    """Generates the Python source of the validation functions. The code for a
+    keyword is generated by the method named like the keyword.
+    """
+
+    # pylint: disable=invalid-name,unused-argument
+
+    def __init__(self, nodes: _SchemaNodes):
+        self.nodes = nodes
+        self.constants: Lines = []
+
+    def generate(self) -> str:
+        """Return the source of the validation functions for all subschemas"""
+        functions: Lines = []
+        node_count = len(self.nodes.nodes)
+        for number, schema in enumerate(self.nodes.nodes):
+            ok_lines, err_lines = self._node(number, schema)
+            functions += ["", "", f"def _ok_{number}(instance):"]
+            functions += [f"    {line}" for line in ok_lines]
+            functions += ["", "", f"def _err_{number}(instance, path):"]
+            functions += [f"    {line}" for line in err_lines or ["yield from ()"]]
+        # The numbering must not depend on the code generation, as it is
+        # recomputed without generating code when loading cached code
+        if len(self.nodes.nodes) != node_count:
+            raise RuntimeError("Subschemas were numbered during code generation")
+        return "\n".join(self.constants + functions) + "\n"
+
+    def _node(self, number: int, schema: Union[dict, bool]) -> tuple[Lines, Lines]:
+        """Generate the bodies of both functions of a subschema"""
+        if schema is True:
+            return ["return True"], []
+        if schema is False:
+            return ["return False"], ["yield _false_schema_error(instance, path)"]
+        if "$ref" in schema:
+            # Draft 7 ignores all siblings of $ref
+            target = self.nodes.number(self.nodes.resolve(schema["$ref"]))
+            return [f"return _ok_{target}(instance)"], [
+                f"yield from _err_{target}(instance, path)"
+            ]
+        ok_lines: Lines = []
+        err_lines: Lines = []
+        for keyword, value in schema.items():
+            if keyword not in Draft7Validator.VALIDATORS:
+                continue
+            handler = getattr(self, f"_{keyword}", None)
+            generated = handler(number, schema, value) if handler else None
+            if generated is None:
+                generated = self._delegated(
+                    number,
+                    keyword,
+                    f"_fails({number}, {keyword!r}, instance)",
+                )
+            ok_lines += generated[0]
+            err_lines += generated[1]
+        return [*ok_lines, "return True"], err_lines
+
+    def _constant(self, name: str, number: int, expression: str) -> str:
+        """Define a module level constant and return its name"""
+        constant = f"_{name}_{number}"
+        self.constants.append(f"{constant} = {expression}")
+        return constant
+
+    def _child(self, schema: Union[dict, bool]) -> int:
+        """Return the number of a subschema the generated code descends into"""
+        return self.nodes.number(schema)
+
+    @staticmethod
+    def _delegated(number: int, keyword: str, condition: str) -> tuple[Lines, Lines]:
+        """Check a condition and let jsonschema create the errors if it fails"""
+        return (
+            [f"if {condition}:", "    return False"],
+            [
+                f"if {condition}:",
+                f"    yield from _errors({number}, {keyword!r}, instance, path)",
+            ],
+        )
+
+    def _type(self, number: int, schema: dict, value: Any):
+        types = [value] if isinstance(value, str) else value
+        if not isinstance(types, list) or not all(
+            isinstance(type_name, str) and type_name in _TYPE_EXPRESSIONS
+            for type_name in types
+        ):
+            return None
+        matches = " or ".join(f"({_TYPE_EXPRESSIONS[name]})" for name in types)
+        return self._delegated(number, "type", f"not ({matches or 'False'})")
+
+    def _properties(self, number: int, schema: dict, value: Any):
+        if not isinstance(value, dict):
+            return None
+        ok_lines: Lines = []
+        err_lines: Lines = []
+        for name, subschema in value.items():
+            child = self._child(subschema)
+            condition = f"{name!r} in instance and not _ok_{child}(instance[{name!r}])"
+            ok_lines += [f"    if {condition}:", "        return False"]
+            err_lines += [
+                f"    if {condition}:",
+                f"        yield from _err_{child}(instance[{name!r}], "
+                + _child_path(subschema, repr(name)),
+            ]
+        if not ok_lines:
+            return [], []
+        header = "if isinstance(instance, dict):"
+        return [header, *ok_lines], [header, *err_lines]
+
+    def _required(self, number: int, schema: dict, value: Any):
+        if not isinstance(value, list) or not all(
+            isinstance(name, str) for name in value
+        ):
+            return None
+        if not value:
+            return [], []
+        present = " and ".join(f"{name!r} in instance" for name in value)
+        return self._delegated(
+            number, "required", f"isinstance(instance, dict) and not ({present})"
+        )
+
+    def _additionalProperties(  # noqa: N802
+        self, number: int, schema: dict, value: Any
+    ):
+        properties = schema.get("properties", {})
+        if "patternProperties" in schema or not isinstance(properties, dict):
+            return None
+        if value is True:
+            return [], []
+        known = self._constant(
+            "PROPERTIES", number, f"frozenset({sorted(properties)!r})"
+        )
+        if value is False:
+            allowed = f"key in {known}"
+        elif isinstance(value, dict):
+            child = self._child(value)
+            allowed = f"key in {known} or _ok_{child}(instance[key])"
+        else:
+            return None
+        return self._delegated(
+            number,
+            "additionalProperties",
+            "isinstance(instance, dict)"
+            + f" and not all({allowed} for key in instance)",
+        )
+
+    def _items(self, number: int, schema: dict, value: Any):
+        if not isinstance(value, (dict, bool)):
+            return None
+        child = self._child(value)
+        return (
+            [
+                "if isinstance(instance, list):",
+                "    for item in instance:",
+                f"        if not _ok_{child}(item):",
+                "            return False",
+            ],
+            [
+                "if isinstance(instance, list):",
+                "    for index, item in enumerate(instance):",
+                f"        if not _ok_{child}(item):",
+                f"            yield from _err_{child}(item, "
+                + _child_path(value, "index"),
+            ],
+        )
+
+    def _enum(self, number: int, schema: dict, value: Any):
+        if not isinstance(value, list) or not all(
+            isinstance(each, str) for each in value
+        ):
+            return None
+        allowed = self._constant("ENUM", number, f"frozenset({sorted(value)!r})")
+        return self._delegated(
+            number,
+            "enum",
+            f"(instance not in {allowed} if isinstance(instance, str)"
+            + f" else _fails({number}, 'enum', instance))",
+        )
+
+    def _pattern(self, number: int, schema: dict, value: Any):
+        if not isinstance(value, str):
+            return None
+        pattern = self._constant("PATTERN", number, f"re.compile({value!r})")
+        return self._delegated(
+            number,
+            "pattern",
+            f"isinstance(instance, str) and {pattern}.search(instance) is None",
+        )
+
+    def _format(self, number: int, schema: dict, value: Any):
+        # Formats are not asserted without a format checker
+        return [], []
+
+    def _minItems(self, number: int, schema: dict, value: Any):  # noqa: N802
+        if not isinstance(value, int) or isinstance(value, bool):
+            return None
+        return self._delegated(
+            number,
+            "minItems",
+            f"isinstance(instance, list) and len(instance) < {value}",
+        )
+
+    def _maxItems(self, number: int, schema: dict, value: Any):  # noqa: N802
+        if not isinstance(value, int) or isinstance(value, bool):
+            return None
+        return self._delegated(
+            number,
+            "maxItems",
+            f"isinstance(instance, list) and len(instance) > {value}",
+        )
+
+    def _anyOf(self, number: int, schema: dict, value: Any):  # noqa: N802
+        if not isinstance(value, list) or not value:
+            return None
+        valid = " or ".join(f"_ok_{self._child(each)}(instance)" for each in value)
+        return self._delegated(number, "anyOf", f"not ({valid})")
+
+    def _oneOf(self, number: int, schema: dict, value: Any):  # noqa: N802
+        if not isinstance(value, list) or not value:
+            return None
+        valid = ", ".join(f"_ok_{self._child(each)}(instance)" for each in value)
+        return self._delegated(number, "oneOf", f"[{valid}].count(True) != 1")
+
+    def _allOf(self, number: int, schema: dict, value: Any):  # noqa: N802
+        if not isinstance(value, list):
+            return None
+        ok_lines: Lines = []
+        err_lines: Lines = []
+        for each in value:
+            child = self._child(each)
+            ok_lines += [f"if not _ok_{child}(instance):", "    return False"]
+            err_lines += [
+                f"if not _ok_{child}(instance):",
+                f"    yield from _err_{child}(instance, path)",
+            ]
+        return ok_lines, err_lines
+
+    def _not(self, number: int, schema: dict, value: Any):
+        if not isinstance(value, (dict, bool)):
+            return None
+        return self._delegated(number, "not", f"_ok_{self._child(value)}(instance)")
+
+
+def _child_path(subschema: Union[dict, bool], element: str) -> str:
+    """Return the expression for the path of a child instance. Like jsonschema,
+    errors of the false schema do not include the path element of the child.
+    """
+    return "path)" if subschema is False else f"(*path, {element}))"
+
+
+def generate_source(json_schema: Union[dict, bool]) -> str:
+    """
+    Generate the Python source of the validation functions for a JSON schema.
+
+    Args:
+        json_schema: The JSON schema
+
+    Returns:
+        str: The source, _ok_0 and _err_0 validate against the whole schema
+
+    Raises:
+        UnsupportedSchemaError: If the JSON schema cannot be compiled
+    """
+    return _CodeGenerator(_SchemaNodes(json_schema)).generate()
+
+
+def _code_key(json_schema: Union[dict, bool]) -> str:
+    """Return the key of the compiled code of a JSON schema"""
+    digest = hashlib.sha256()
+    digest.update(f"engine:{ENGINE_VERSION}\n".encode())
+    digest.update(f"python:{sys.version}\n".encode())
+    digest.update(f"jsonschema:{version('jsonschema')}\n".encode())
+    # The generated code depends on the order of the keywords
+    digest.update(json.dumps(json_schema).encode())
+    return digest.hexdigest()
+
+
+class CompiledJsonSchemaValidator:
+    """
+    Validator for a JSON schema that runs generated Python code instead of
+    interpreting the schema. It reports the same errors as Draft7Validator
+    without format checker.
+
+    Args:
+        json_schema: The JSON schema
+        cache_dir: Directory to store the compiled code in, so that the code
+            is only generated once per JSON schema
+
+    Raises:
+        UnsupportedSchemaError: If the JSON schema cannot be compiled
+    """
+
+    def __init__(
+        self,
+        json_schema: Union[dict, bool],
+        cache_dir: Optional[Union[str, Path]] = None,
+    ) -> None:
+        self.schema = json_schema
+        self._reference = Draft7Validator(json_schema)
+        nodes = _SchemaNodes(json_schema)
+        self._nodes: list[Any] = nodes.nodes
+        self._evolved: list[Optional[Draft7Validator]] = [None] * len(self._nodes)
+        code = self._load_code(nodes, Path(cache_dir) if cache_dir else None)
+        namespace: dict[str, Any] = {
+            "re": re,
+            "_Number": numbers.Number,
+            "_errors": self._errors,
+            "_fails": self._fails,
+            "_false_schema_error": _false_schema_error,
+        }
+        exec(code, namespace)  # noqa: S102 # pylint: disable=exec-used
+        self._ok: Callable[[Any], bool] = namespace["_ok_0"]
+        self._err: Callable[[Any, tuple], Iterator[ValidationError]] = namespace[
+            "_err_0"
+        ]
+
+    def is_valid(self, instance: Any) -> bool:
+        """Check whether the instance is valid"""
+        return self._ok(instance)
+
+    def iter_errors(self, instance: Any) -> Iterator[ValidationError]:
+        """Lazily yield all validation errors of the instance"""
+        if self._ok(instance):
+            return iter(())
+        return self._err(instance, ())
+
+    @staticmethod
+    def _load_code(nodes: _SchemaNodes, cache_dir: Optional[Path]):
+        """Load the compiled code from the cache, generate it if needed"""
+        code_path = None
+        if cache_dir is not None:
+            code_path = cache_dir / f"{_code_key(nodes.root)}{CODE_FILE_SUFFIX}"
+            try:
+                return marshal.loads(code_path.read_bytes())  # noqa: S302
+            except FileNotFoundError:
+                pass
+            except (EOFError, ValueError, TypeError):
+                code_path.unlink(missing_ok=True)
+
+        code = compile(_CodeGenerator(nodes).generate(), "<json-schema>", "exec")
+        if code_path is not None:
+            code_path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                dir=code_path.parent, suffix=".tmp", delete=False
+            ) as tmp_file:
+                tmp_file.write(marshal.dumps(code))
+            os.replace(tmp_file.name, code_path)
+        return code
+
+    def _evolved_validator(self, number: int) -> Draft7Validator:
+        """Return the jsonschema validator for a subschema"""
+        validator = self._evolved[number]
+        if validator is None:
+            validator = self._reference.evolve(schema=self._nodes[number])
+            self._evolved[number] = validator
+        return validator
+
+    def _fails(self, number: int, keyword: str, instance: Any) -> bool:
+        """Check a keyword of a subschema with jsonschema"""
+        schema = self._nodes[number]
+        validator = self._evolved_validator(number)
+        errors = validator.VALIDATORS[keyword](
+            validator, schema[keyword], instance, schema
+        )
+        return next(iter(errors or ()), None) is not None
+
+    def _errors(
+        self, number: int, keyword: str, instance: Any, path: tuple
+    ) -> Iterator[ValidationError]:
+        """Create the errors of a keyword of a subschema with jsonschema,
+        the same way Draft7Validator.iter_errors does
+        """
+        schema = self._nodes[number]
+        validator = self._evolved_validator(number)
+        value = schema[keyword]
+        errors = validator.VALIDATORS[keyword](validator, value, instance, schema)
+        for error in errors or ():
+            # pylint: disable=protected-access
+            error._set(
+                validator=keyword,
+                validator_value=value,
+                instance=instance,
+                schema=schema,
+                type_checker=validator.TYPE_CHECKER,
+            )
+            if keyword not in {"if", "$ref"}:
+                error.schema_path.appendleft(keyword)
+            error.relative_path.extendleft(reversed(path))
+            yield error
+
+
+def _false_schema_error(instance: Any, path: tuple) -> ValidationError:
+    """Create the error for an instance of the false schema"""
+    return ValidationError(
+        f"False schema does not allow {instance!r}",
+        validator=None,
+        validator_value=None,
+        instance=instance,
+        schema=False,
+        path=path,
+    )
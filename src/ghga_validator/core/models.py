@@ -65,3 +65,15 @@ class ValidationReport(BaseModel):
     type: str
     valid: bool
     validation_results: list[ValidationResult]
+
+
+class CombinedValidationReport(BaseModel):
+    """
+    CombinedValidationReport represents the validation results of an object
+    against several target classes, with one report per class.
+    """
+
+    object: Optional[dict]
+    types: list[str]
+    valid: bool
+    reports: list[ValidationReport]
@@ -0,0 +1,107 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Portable bundles of compiled LinkML schemas"""
+
+import json
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Union
+
+from ghga_validator.core.compiled_schema import CompiledSchema
+from ghga_validator.my_linkml.schema_index import SchemaIndex
+
+BUNDLE_MAGIC = "ghga-validator-bundle"
+
+BUNDLE_FORMAT_VERSION = 1
+
+
+class BundleVersionError(RuntimeError):
+    """This error is produced if a schema bundle was written in a format
+    version that is not supported by this version of the validator.
+    """
+
+
+def is_bundle(path: Union[str, Path]) -> bool:
+    """Check whether a file is a schema bundle by looking at its header"""
+    with open(path, "rb") as bundle_file:
+        return bundle_file.read(len(BUNDLE_MAGIC)) == BUNDLE_MAGIC.encode()
+
+
+def write_bundle(
+    compiled_schema: CompiledSchema,
+    path: Union[str, Path],
+    target_classes: Iterable[str] = (),
+) -> None:
+    """
+    Write a compiled schema to a bundle file.
+
+    The bundle contains the schema with all imports merged, the lookup index
+    and the JSON schema of every tree root class and of the given target classes.
+
+    Args:
+        compiled_schema: The compiled schema to bundle
+        path: The path of the bundle file
+        target_classes: Additional classes to include the JSON schema for
+    """
+    index = compiled_schema.index
+    json_schemas = {
+        target_class: compiled_schema.json_schema(target_class)
+        for target_class in (*index.tree_roots, *target_classes)
+    }
+    content = {
+        "fingerprint": compiled_schema.fingerprint,
+        "schema": compiled_schema.schema_yaml(),
+        "index": index.to_dict(),
+        "json_schemas": json_schemas,
+    }
+    with open(path, "w", encoding="utf-8") as bundle_file:
+        bundle_file.write(f"{BUNDLE_MAGIC} {BUNDLE_FORMAT_VERSION}\n")
+        json.dump(content, bundle_file, ensure_ascii=False)
+
+
+def read_bundle(path: Union[str, Path]) -> CompiledSchema:
+    """
+    Load a compiled schema from a bundle file.
+
+    The LinkML schema itself is only parsed if it is accessed, the index and
+    JSON schemas are used as stored in the bundle.
+
+    Args:
+        path: The path of the bundle file
+
+    Returns:
+        CompiledSchema: The compiled schema
+
+    Raises:
+        BundleVersionError: If the bundle was written in an unsupported format
+    """
+    with open(path, encoding="utf-8") as bundle_file:
+        magic, _, format_version = bundle_file.readline().strip().partition(" ")
+        if magic != BUNDLE_MAGIC:
+            raise ValueError(f"<{path}> is not a schema bundle")
+        if format_version != str(BUNDLE_FORMAT_VERSION):
+            raise BundleVersionError(
+                f"Schema bundle <{path}> has format version {format_version}, "
+                + f"expected {BUNDLE_FORMAT_VERSION}. Please compile it again."
+            )
+        content = json.load(bundle_file)
+    return CompiledSchema(
+        fingerprint=content["fingerprint"],
+        json_schemas=content["json_schemas"],
+        index=SchemaIndex.from_dict(content["index"]),
+        schema_yaml=content["schema"],
+    )
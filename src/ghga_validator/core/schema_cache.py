@@ -0,0 +1,211 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Persistent on-disk cache for compiled LinkML schemas"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from importlib.metadata import version
+from pathlib import Path
+from typing import Optional, Union
+
+import yaml
+
+from ghga_validator.core.compiled_schema import CompiledSchema
+from ghga_validator.my_linkml.import_store import ImportStore
+from ghga_validator.schema_utils import get_target_class
+
+CACHE_FORMAT_VERSION = 2
+
+CACHE_FILE_SUFFIX = ".pickle"
+
+DEFAULT_MAX_CACHE_SIZE = 256 * 1024 * 1024
+
+
+def _schema_sources(
+    schema: Path, import_store: Optional[ImportStore] = None
+) -> list[tuple[str, Optional[bytes]]]:
+    """
+    Collect the schema file and all of its imports.
+
+    Imports that refer to local files or to files in the import store are
+    followed recursively, other imports given as CURIE or URL
+    (e.g. linkml:types) can only be identified by name.
+
+    Returns:
+        List of (import name, file content) pairs
+    """
+    sources: list[tuple[str, Optional[bytes]]] = []
+    visited = set()
+    todo: list[tuple[str, Optional[Path]]] = [("", schema)]
+    while todo:
+        name, path = todo.pop()
+        if path is None:
+            sources.append((name, None))
+            continue
+        if path in visited:
+            continue
+        visited.add(path)
+        content = path.read_bytes()
+        sources.append((name, content))
+        imports = (yaml.safe_load(content) or {}).get("imports") or []
+        for imp in imports:
+            if ":" in imp:
+                stored_path = import_store.resolve(imp) if import_store else None
+                todo.append((imp, stored_path))
+                continue
+            import_path = (path.parent / f"{imp}.yaml").resolve()
+            todo.append((imp, import_path if import_path.is_file() else None))
+    return sources
+
+
+def schema_fingerprint(
+    schema: Union[str, Path], import_store: Optional[ImportStore] = None
+) -> str:
+    """
+    Compute the fingerprint of a LinkML schema file.
+
+    The fingerprint covers the content of the schema file, all local imports
+    and the versions of the packages the compiled artifacts depend on.
+
+    Args:
+        schema: The path to the YAML schema file
+        import_store: The import store used to resolve imports, if any
+
+    Returns:
+        Hex digest identifying the schema
+    """
+    digest = hashlib.sha256()
+    digest.update(f"format:{CACHE_FORMAT_VERSION}\n".encode())
+    for package in ("ghga_validator", "linkml", "linkml-runtime"):
+        digest.update(f"{package}:{version(package)}\n".encode())
+    for name, content in _schema_sources(Path(schema).resolve(), import_store):
+        digest.update(f"import:{name}\n".encode())
+        if content is not None:
+            digest.update(hashlib.sha256(content).digest())
+    return digest.hexdigest()
+
+
+class SchemaCache:
+    """
+    Directory based cache of compiled LinkML schemas keyed by the schema
+    fingerprint. Least recently used entries are evicted once the total size
+    of the cache exceeds the configured maximum.
+
+    Args:
+        cache_dir: The directory to store the compiled schemas in
+        max_size: Maximum total size of the cache in bytes
+        import_store: The import store used to resolve schema imports, if any
+    """
+
+    def __init__(
+        self,
+        cache_dir: Union[str, Path],
+        max_size: int = DEFAULT_MAX_CACHE_SIZE,
+        import_store: Optional[ImportStore] = None,
+    ) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.max_size = max_size
+        self.import_store = import_store
+
+    def load(
+        self,
+        schema: Union[str, Path],
+        target_class: Optional[Union[str, list[str]]] = None,
+    ) -> CompiledSchema:
+        """
+        Load a compiled schema from the cache, compile it if it is not cached yet.
+
+        Args:
+            schema: The path to the YAML schema file
+            target_class: Class name or list of class names for which the JSON
+                schema should be available, defaults to the tree root class of
+                the schema
+
+        Returns:
+            CompiledSchema: The compiled schema
+        """
+        fingerprint = schema_fingerprint(schema, self.import_store)
+        compiled_schema = self._read(fingerprint)
+        modified = compiled_schema is None
+        if compiled_schema is None:
+            compiled_schema = CompiledSchema.from_file(
+                schema, fingerprint=fingerprint, import_store=self.import_store
+            )
+        if target_class is None:
+            target_class = get_target_class(compiled_schema)
+        target_classes = (
+            [target_class] if isinstance(target_class, str) else target_class
+        )
+        for class_name in target_classes or []:
+            if class_name and class_name not in compiled_schema.json_schemas:
+                compiled_schema.json_schema(class_name)
+                modified = True
+        if modified:
+            self._write(compiled_schema)
+        return compiled_schema
+
+    def _entry_path(self, fingerprint: str) -> Path:
+        """Return the path of the cache entry for a fingerprint"""
+        return self.cache_dir / f"{fingerprint}{CACHE_FILE_SUFFIX}"
+
+    def _read(self, fingerprint: str) -> Optional[CompiledSchema]:
+        """Read a cache entry, unreadable entries are treated as missing"""
+        entry_path = self._entry_path(fingerprint)
+        try:
+            with open(entry_path, "rb") as entry:
+                compiled_schema = pickle.load(entry)  # noqa: S301
+        except FileNotFoundError:
+            return None
+        except Exception:  # pylint: disable=broad-exception-caught
+            entry_path.unlink(missing_ok=True)
+            return None
+        if not isinstance(compiled_schema, CompiledSchema):
+            return None
+        # Mark the entry as recently used for the eviction
+        os.utime(entry_path)
+        return compiled_schema
+
+    def _write(self, compiled_schema: CompiledSchema) -> None:
+        """Atomically write a cache entry and evict old entries if needed"""
+        if compiled_schema.fingerprint is None:
+            raise ValueError("Only schemas with a fingerprint can be cached")
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=self.cache_dir, suffix=".tmp", delete=False
+        ) as tmp_file:
+            pickle.dump(compiled_schema, tmp_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file.name, self._entry_path(compiled_schema.fingerprint))
+        self._evict()
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache fits max_size"""
+        entries = []
+        for entry_path in self.cache_dir.glob(f"*{CACHE_FILE_SUFFIX}"):
+            try:
+                stat = entry_path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+        entries.sort()
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, entry_path in entries:
+            if total_size <= self.max_size:
+                break
+            entry_path.unlink(missing_ok=True)
+            total_size -= size
@@ -0,0 +1,235 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""In-memory registry of warm schemas for long-running processes"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Union
+
+from ghga_validator.core.compiled_schema import CompiledSchema
+from ghga_validator.core.identifier_store import IdentifierStore
+from ghga_validator.core.models import ValidationReport
+from ghga_validator.core.schema_bundle import is_bundle, read_bundle
+from ghga_validator.core.schema_cache import SchemaCache, schema_fingerprint
+from ghga_validator.core.validator import Validator
+from ghga_validator.my_linkml.import_store import ImportStore
+from ghga_validator.plugins.base_plugin import ValidationPlugin
+from ghga_validator.plugins.utils import discover_plugins
+from ghga_validator.utils import CacheInfo
+
+DEFAULT_REGISTRY_CAPACITY = 4
+
+
+class RegisteredSchema:
+    """
+    A compiled schema together with the plugin instances created for it.
+    Plugins are created once per plugin type and shared by all validations
+    against the schema, so that e.g. compiled JSON schema validators stay warm.
+
+    Args:
+        key: The key of the schema in the registry
+        compiled_schema: The compiled schema
+    """
+
+    def __init__(self, key: str, compiled_schema: CompiledSchema) -> None:
+        self.key = key
+        self.compiled_schema = compiled_schema
+        self._plugins: dict[str, ValidationPlugin] = {}
+        self._lock = threading.Lock()
+
+    def plugins(self, plugin_types: list[str]) -> list[ValidationPlugin]:
+        """Return the plugin instances for the plugin types, creating them once"""
+        with self._lock:
+            missing = [name for name in plugin_types if name not in self._plugins]
+            if missing:
+                discovered_plugins = discover_plugins(ValidationPlugin)
+                for plugin_name in missing:
+                    if plugin_name not in discovered_plugins:
+                        raise ModuleNotFoundError(f"Plugin '{plugin_name}' not found")
+                    plugin_class = discovered_plugins[plugin_name]
+                    self._plugins[plugin_name] = plugin_class(
+                        schema=self.compiled_schema
+                    )
+            return [self._plugins[name] for name in plugin_types]
+
+    def validate(  # noqa: PLR0913
+        self,
+        data: dict,
+        target_class: str,
+        plugin_types: list[str],
+        only_class: Optional[str] = None,
+        only_path: Optional[str] = None,
+        workers: int = 1,
+        disk_index: bool = False,
+        prefilter: bool = False,
+        identifier_store: Optional[IdentifierStore] = None,
+        submission: Optional[str] = None,
+    ) -> ValidationReport:  # pylint: disable=too-many-arguments
+        """
+        Validate an object against the schema using the shared plugins.
+
+        Args:
+            data: The JSON object to validate
+            target_class: The root class name
+            plugin_types: List of plugin class names for validation
+            only_class: Restrict the validation to the elements of this class
+            only_path: Restrict the validation to the elements at or below this path
+            workers: Number of worker processes for the traversal of the data
+            disk_index: Whether to record the identifiers in a disk-backed index
+            prefilter: Whether to put a Bloom filter in front of the disk indexes,
+                requires the disk index
+            identifier_store: The identifiers of accepted submissions to resolve
+                references and check uniqueness against
+            submission: The name of the validated submission in the identifier
+                store, if it is registered
+
+        Returns:
+            ValidationReport: A validation report that summarizes the validation
+        """
+        validator = Validator(
+            schema=self.compiled_schema,
+            plugins=self.plugins(plugin_types),
+            workers=workers,
+            disk_index=disk_index,
+            prefilter=prefilter,
+            identifier_store=identifier_store,
+            submission=submission,
+        )
+        return validator.validate(
+            data, target_class, only_class=only_class, only_path=only_path
+        )
+
+
+class SchemaRegistry:
+    """
+    Thread-safe registry of the most recently used schemas keyed by their
+    fingerprint. The least recently used schema is dropped, together with its
+    plugins, once more than capacity schemas are registered.
+
+    Args:
+        capacity: Maximum number of schemas kept in memory
+        cache: Cache of compiled schemas used to load schemas not in memory
+        import_store: Store to resolve schema imports from
+    """
+
+    def __init__(
+        self,
+        capacity: int = DEFAULT_REGISTRY_CAPACITY,
+        cache: Optional[SchemaCache] = None,
+        import_store: Optional[ImportStore] = None,
+    ) -> None:
+        if capacity < 1:
+            raise ValueError("The capacity of the registry must be at least 1")
+        self.capacity = capacity
+        self.cache = cache
+        self.import_store = import_store
+        self._entries: OrderedDict[str, RegisteredSchema] = OrderedDict()
+        self._loading: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def schema_key(self, schema: Union[str, Path]) -> str:
+        """Return the key of a schema file or schema bundle in the registry"""
+        if is_bundle(schema):
+            return "bundle:" + hashlib.sha256(Path(schema).read_bytes()).hexdigest()
+        if self.cache is not None:
+            return schema_fingerprint(schema, self.cache.import_store)
+        return schema_fingerprint(schema, self.import_store)
+
+    def get(self, schema: Union[str, Path]) -> RegisteredSchema:
+        """
+        Return the registered schema, loading it if it is not in memory.
+
+        Concurrent requests for the same schema load it only once, other
+        schemas can be loaded in parallel.
+
+        Args:
+            schema: The path to a YAML schema file or schema bundle
+
+        Returns:
+            RegisteredSchema: The compiled schema with its shared plugins
+        """
+        key = self.schema_key(schema)
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                return entry
+            loading_lock = self._loading.setdefault(key, threading.Lock())
+
+        with loading_lock:
+            with self._lock:
+                entry = self._lookup(key)
+                if entry is not None:
+                    return entry
+                self._misses += 1
+            entry = RegisteredSchema(key, self._load(schema, key))
+            with self._lock:
+                self._entries[key] = entry
+                self._loading.pop(key, None)
+                while len(self._entries) > self.capacity:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def validate(
+        self,
+        schema: Union[str, Path],
+        data: dict,
+        target_class: str,
+        plugin_types: list[str],
+    ) -> ValidationReport:
+        """Validate an object against a registered schema, see RegisteredSchema"""
+        return self.get(schema).validate(data, target_class, plugin_types)
+
+    def cache_info(self) -> CacheInfo:
+        """Report statistics of the registered schemas"""
+        with self._lock:
+            return CacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                maxsize=self.capacity,
+                currsize=len(self._entries),
+            )
+
+    def clear(self) -> None:
+        """Drop all registered schemas"""
+        with self._lock:
+            self._entries.clear()
+
+    def _lookup(self, key: str) -> Optional[RegisteredSchema]:
+        """Return a registered schema and mark it as recently used, requires the lock"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._hits += 1
+            self._entries.move_to_end(key)
+        return entry
+
+    def _load(self, schema: Union[str, Path], key: str) -> CompiledSchema:
+        """Load a compiled schema and build its lookup index"""
+        if key.startswith("bundle:"):
+            compiled_schema = read_bundle(schema)
+        elif self.cache is not None:
+            compiled_schema = self.cache.load(schema)
+        else:
+            compiled_schema = CompiledSchema.from_file(
+                schema, fingerprint=key, import_store=self.import_store
+            )
+        # Build the index up front, the registered schema is shared by threads
+        compiled_schema.index  # noqa: B018 # pylint: disable=pointless-statement
+        return compiled_schema
@@ -0,0 +1,200 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Restriction of the validation to a part of the data"""
+
+from collections.abc import Callable, Iterator
+from typing import Optional
+
+from ghga_validator.my_linkml.object_iterator import ObjectIterator, Projection
+from ghga_validator.my_linkml.schema_index import SchemaIndex
+from ghga_validator.utils import ObjectPath
+
+
+class ValidationScope:
+    """
+    Selects the elements to validate, i.e. the elements of a class and/or the
+    elements at or below a path in the data. The selected elements are
+    validated completely including the data inlined in them, while the rest
+    of the data is only used to resolve references.
+
+    Args:
+        only_class: Name of the class whose elements are validated
+        only_path: Path of the part of the data to validate, in the dot
+            separated format of the validation report, e.g. "files" or "files.0"
+    """
+
+    def __init__(
+        self, only_class: Optional[str] = None, only_path: Optional[str] = None
+    ) -> None:
+        # An empty path selects the whole data like no path
+        only_path = only_path or None
+        if only_class is None and only_path is None:
+            raise ValueError("A validation scope requires a class or a path")
+        self.only_class = only_class
+        self.only_path = only_path
+        self._prefix = tuple(only_path.split(".")) if only_path else ()
+
+    def check(self, index: SchemaIndex, data: dict, target_class: str) -> None:
+        """
+        Check that the scope can select elements of the data, i.e. that the
+        class is a class of the schema and that the path leads to an element
+        or to the elements of a slot.
+
+        Args:
+            index: Lookup index of the schema
+            data: The data to validate
+            target_class: The root class name
+
+        Raises:
+            ValueError: If the class is unknown or no element is at the path
+        """
+        if self.only_class is not None and not index.is_class(self.only_class):
+            raise ValueError(f"No such class {self.only_class}")
+        if self._prefix and not _has_elements(index, data, target_class, self._prefix):
+            raise ValueError(f"No element at path {self.only_path}")
+
+    def contains(self, class_name: str, path: ObjectPath) -> bool:
+        """Return whether the element of a class at a path is selected"""
+        if self.only_class is not None and class_name != self.only_class:
+            return False
+        if len(path) < len(self._prefix):
+            return False
+        return all(
+            str(key) == prefix_key for key, prefix_key in zip(path, self._prefix)
+        )
+
+    def element_filter(self) -> Callable[[str, ObjectPath], bool]:
+        """
+        Create a filter for the elements of one depth-first traversal, which
+        accepts the selected elements and the elements inlined in them.
+        """
+        selected: Optional[ObjectPath] = None
+
+        def accept(class_name: str, path: ObjectPath) -> bool:
+            nonlocal selected
+            if selected is not None and _is_below(path, selected):
+                return True
+            if self.contains(class_name, path):
+                selected = path
+                return True
+            return False
+
+        return accept
+
+    def subtrees(
+        self, index: SchemaIndex, data: dict, target_class: str
+    ) -> Iterator[tuple[str, ObjectPath, dict]]:
+        """
+        Find the selected elements that are not inlined in another selected
+        element.
+
+        Args:
+            index: Lookup index of the schema
+            data: The data to validate
+            target_class: The root class name
+
+        Returns:
+            Iterator over the class name, path and data of the elements
+        """
+        selected: Optional[ObjectPath] = None
+        for class_name, _, _, path in ObjectIterator(
+            index,
+            data,
+            target_class,
+            enumerate_non_identifiable=True,
+            projection=Projection.IDENTIFIERS,
+        ):
+            if selected is not None and _is_below(path, selected):
+                continue
+            if self.contains(class_name, path):
+                selected = path
+                yield class_name, path, _element_data(index, data, target_class, path)
+
+
+def _is_below(path: ObjectPath, ancestor: ObjectPath) -> bool:
+    """
+    Return whether a path is the same as or below another path. The paths are
+    compared by their keys, since paths created from the keys of the same
+    element, e.g. by different worker processes, do not share their nodes.
+    """
+    if len(path) < len(ancestor):
+        return False
+    node: Optional[ObjectPath] = path
+    while node is not None and len(node) > len(ancestor):
+        node = node.parent
+    other: Optional[ObjectPath] = ancestor
+    while node is not None and other is not None:
+        if node is other:
+            return True
+        if node.key != other.key:
+            return False
+        node, other = node.parent, other.parent
+    return node is None and other is None
+
+
+def _has_elements(
+    index: SchemaIndex, data: dict, target_class: str, keys: tuple[str, ...]
+) -> bool:
+    """
+    Return whether the keys of a path lead from the data to an element or to
+    the non-empty value of a slot with an inlined class range
+    """
+    class_name = target_class
+    value: object = data
+    position = 0
+    while position < len(keys):
+        slot_plan = index.class_plan(class_name).recursion_slots.get(keys[position])
+        if slot_plan is None or not isinstance(value, dict):
+            return False
+        value = value.get(slot_plan.name)
+        position += 1
+        if slot_plan.multivalued and position < len(keys):
+            key = keys[position]
+            if isinstance(value, list) and key.isdigit() and str(int(key)) == key:
+                value = value[int(key)] if int(key) < len(value) else None
+            elif isinstance(value, dict):
+                value = value.get(key)
+            else:
+                return False
+            position += 1
+        class_name = slot_plan.range_class
+    return bool(value) or isinstance(value, dict)
+
+
+def _element_data(
+    index: SchemaIndex, data: dict, target_class: str, path: ObjectPath
+) -> dict:
+    """
+    Look up the data of the element at a path. Elements inlined as dictionary
+    are returned with their dictionary key as identifier, like the
+    ObjectIterator presents them.
+    """
+    class_name = target_class
+    keys = list(path)
+    position = 0
+    while position < len(keys):
+        slot_plan = index.class_plan(class_name).recursion_slots[str(keys[position])]
+        data = data[slot_plan.name]
+        position += 1
+        if slot_plan.multivalued:
+            key = keys[position]
+            if isinstance(data, dict) and slot_plan.identifier_slot is not None:
+                data = {**data[key], slot_plan.identifier_slot: key}
+            else:
+                data = data[key]
+            position += 1
+        class_name = slot_plan.range_class
+    return data
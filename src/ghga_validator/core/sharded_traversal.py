@@ -0,0 +1,316 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Traversal of large top-level collections by a pool of worker processes"""
+
+from collections.abc import Iterator, Mapping
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from numbers import Number
+from operator import itemgetter
+from typing import NamedTuple, Optional, Union
+
+from ghga_validator.core.scope import ValidationScope
+from ghga_validator.my_linkml.object_iterator import ObjectIterator, Projection
+from ghga_validator.my_linkml.schema_index import SchemaIndex
+from ghga_validator.utils import ObjectPath, path_as_string
+
+DEFAULT_CHUNK_SIZE = 10000
+
+# A shard is a range of the elements of a top-level slot, (slot name, None,
+# None) stands for all elements of the slot
+Shard = tuple[str, Optional[int], Optional[int]]
+
+# The position of the first element of a shard in its slot and the data of a
+# root element that only contains the shard, as sent to a worker process
+ShardData = tuple[int, dict]
+
+Identifier = Optional[Union[str, Number]]
+
+
+class ShardSummary(NamedTuple):
+    """
+    The result of the traversal of a shard, reduced to what the visitors of
+    the identifiers and references need. The elements are numbered by their
+    position in the traversal of the shard.
+
+    paths: The path of each element in the format of the validation report
+    selected: Whether each element is selected by the scope, None if there is
+        no scope
+    identifiers: The position of the first element of each identifier of the
+        shard, by identifier and class name
+    duplicates: The other elements of the shard, as position, class name and
+        identifier
+    references: The reference fields of the selected elements that are not
+        resolved by the identifiers of the shard, as range class, field name,
+        value and position of the element
+    """
+
+    paths: list[str]
+    selected: Optional[bytes]
+    identifiers: dict[str, dict[Identifier, int]]
+    duplicates: list[tuple[int, str, Identifier]]
+    references: list[tuple[str, str, Union[list, str, Number], int]]
+
+    def is_selected(self, position: int) -> bool:
+        """Return whether an element is selected by the scope"""
+        return self.selected is None or bool(self.selected[position])
+
+    def elements(self) -> list[tuple[int, str, Identifier]]:
+        """Return the position, class name and identifier of all elements"""
+        elements = [
+            (position, class_name, identifier)
+            for class_name, class_ids in self.identifiers.items()
+            for identifier, position in class_ids.items()
+        ]
+        elements.extend(self.duplicates)
+        elements.sort(key=itemgetter(0))
+        return elements
+
+
+def shared_path(keys: tuple, parents: dict[tuple, ObjectPath]) -> ObjectPath:
+    """
+    Create the path of an element from its keys. The paths of the elements
+    of a collection share the path of the parent, which is kept in parents.
+    """
+    parent = parents.get(keys[:-1])
+    if parent is None:
+        parent = parents[keys[:-1]] = ObjectPath.from_keys(keys[:-1])
+    return parent.child(keys[-1])
+
+
+def summarize(  # noqa: PLR0913
+    index: SchemaIndex,
+    data: dict,
+    target_class: str,
+    scope: Optional[ValidationScope] = None,
+    offset: int = 0,
+    include_root: bool = True,
+) -> ShardSummary:
+    """
+    Traverse the data and summarize its identifiers and the references that
+    it does not resolve itself. The data is traversed by an ObjectIterator,
+    so that invalid data is handled exactly as in a serial traversal.
+
+    Args:
+        index: Lookup index of the schema
+        data: The root element, or a root element that only contains a shard
+            of a top-level collection
+        target_class: The root class name
+        scope: The elements whose references are recorded, defaults to all
+        offset: The position of the first element of the shard in the
+            top-level collection
+        include_root: Whether the root element is part of the summary, it is
+            passed to the scope in any case
+
+    Returns:
+        ShardSummary: The summary of the traversed elements
+    """
+    in_scope = scope.element_filter() if scope is not None else None
+    # The paths of the elements of a collection share the path of the parent
+    parents: dict[tuple, ObjectPath] = {}
+    paths: list[str] = []
+    selected = bytearray()
+    identifiers: dict[str, dict[Identifier, int]] = {}
+    duplicates: list[tuple[int, str, Identifier]] = []
+    references: list[tuple[str, str, Union[list, str, Number], int]] = []
+
+    for class_name, identifier, element_data, path in ObjectIterator(
+        index, data, target_class, projection=Projection.REFERENCES
+    ):
+        keys = tuple(path)
+        if keys:
+            if offset:
+                keys = (keys[0], keys[1] + offset, *keys[2:])
+            path = shared_path(keys, parents)
+        is_selected = in_scope is None or in_scope(class_name, path)
+        if not keys and not include_root:
+            continue
+
+        position = len(paths)
+        paths.append(path_as_string(keys))
+        selected.append(is_selected)
+        class_ids = identifiers.get(class_name)
+        if class_ids is None:
+            class_ids = identifiers[class_name] = {}
+        if identifier in class_ids:
+            duplicates.append((position, class_name, identifier))
+        else:
+            class_ids[identifier] = position
+        if is_selected:
+            references.extend(
+                _reference_fields(index, class_name, element_data, position)
+            )
+
+    return ShardSummary(
+        paths,
+        bytes(selected) if in_scope is not None else None,
+        identifiers,
+        duplicates,
+        [
+            reference
+            for reference in references
+            if not _resolved(reference[2], identifiers.get(reference[0]))
+        ],
+    )
+
+
+# The schema, root class and scope of the traversal, set in each worker
+# process by _init_worker
+_worker_state: dict = {}
+
+
+def _init_worker(
+    index: SchemaIndex, target_class: str, scope: Optional[ValidationScope]
+) -> None:
+    """Store the schema, root class and scope of the traversal in a worker"""
+    _worker_state.update(index=index, target_class=target_class, scope=scope)
+
+
+def _summarize_shard(shard_data: ShardData) -> ShardSummary:
+    """Summarize the elements of a shard in a worker process"""
+    offset, data = shard_data
+    return summarize(
+        _worker_state["index"],
+        data,
+        _worker_state["target_class"],
+        _worker_state["scope"],
+        offset=offset,
+        include_root=False,
+    )
+
+
+def _reference_fields(
+    index: SchemaIndex, class_name: str, element_data: Mapping, position: int
+) -> Iterator[tuple[str, str, Union[list, str, Number], int]]:
+    """Return the reference fields of an element"""
+    for field, value in element_data.items():
+        slot_def = index.slot(class_name, field)
+        if slot_def.range_class and not slot_def.is_inlined:
+            yield slot_def.range_class, field, value, position
+
+
+def _resolved(value: object, class_ids: Optional[Mapping]) -> bool:
+    """Return whether all references of a field value are identifiers"""
+    if class_ids is None:
+        return False
+    try:
+        if isinstance(value, list):
+            return all(ref in class_ids for ref in value)
+        return value in class_ids
+    except TypeError:
+        return False
+
+
+def _shards(
+    index: SchemaIndex, data: dict, target_class: str, chunk_size: int
+) -> list[Shard]:
+    """
+    Partition the top-level slots with an inlined class range into shards of
+    at most chunk_size elements, in the order the ObjectIterator visits them.
+    """
+    shards: list[Shard] = []
+    for slot_name, slot_plan in index.class_plan(target_class).recursion_slots.items():
+        if slot_name not in data:
+            continue
+        slot_value = data[slot_name]
+        if (slot_plan.list_allowed and isinstance(slot_value, list)) or (
+            slot_plan.dict_allowed and isinstance(slot_value, dict)
+        ):
+            for start in range(0, len(slot_value), chunk_size):
+                shards.append((slot_name, start, start + chunk_size))
+        else:
+            shards.append((slot_name, None, None))
+    return shards
+
+
+def _shard_data(
+    index: SchemaIndex, data: dict, target_class: str, shard: Shard
+) -> ShardData:
+    """
+    Return the data of a shard, which is sent to a worker process. The root
+    element of the shard keeps the identifier of the root, so that a scope
+    that selects the root also selects the elements of the shard.
+    """
+    slot_name, start, stop = shard
+    slot_value = data[slot_name]
+    offset = 0
+    if start is not None:
+        if isinstance(slot_value, list):
+            offset = start
+            slot_value = slot_value[start:stop]
+        else:
+            slot_value = dict(islice(slot_value.items(), start, stop))
+    shard_root = {slot_name: slot_value}
+    identifier_slot = index.identifier_slot(target_class)
+    if identifier_slot is not None and identifier_slot in data:
+        shard_root[identifier_slot] = data[identifier_slot]
+    return offset, shard_root
+
+
+def can_shard(
+    index: SchemaIndex, data: dict, target_class: str, chunk_size: int
+) -> bool:
+    """Return whether the top-level slots of the data span several shards"""
+    return len(_shards(index, data, target_class, chunk_size)) > 1
+
+
+def summarize_shards(  # noqa: PLR0913
+    index: SchemaIndex,
+    data: dict,
+    target_class: str,
+    scope: Optional[ValidationScope],
+    workers: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[ShardSummary]:
+    """
+    Let a pool of worker processes traverse the elements of the top-level
+    collections in chunks. Each worker only receives the data of its shard
+    and returns a summary of the identifiers and unresolved references of the
+    shard instead of the elements. The first summary is the one of the root
+    element without its top-level collections, which is summarized in this
+    process. The summaries are yielded in the order of a serial traversal,
+    so that visitors that merge them in this order report the same as with a
+    serial traversal.
+
+    Args:
+        index: Lookup index of the schema
+        data: The data to traverse
+        target_class: The root class name
+        scope: The elements whose references are recorded, defaults to all
+        workers: Number of worker processes
+        chunk_size: Maximum number of top-level elements per shard
+
+    Returns:
+        Iterator over the summaries of the root element and the shards
+    """
+    recursion_slots = index.class_plan(target_class).recursion_slots
+    root_data = {
+        slot_name: slot_value
+        for slot_name, slot_value in data.items()
+        if slot_name not in recursion_slots
+    }
+    yield summarize(index, root_data, target_class, scope)
+
+    shards = _shards(index, data, target_class, chunk_size)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(index, target_class, scope),
+    ) as executor:
+        yield from executor.map(
+            _summarize_shard,
+            (_shard_data(index, data, target_class, shard) for shard in shards),
+        )
@@ -16,42 +16,196 @@
 
 """Validator of data against a given LinkML schema."""
 
+import inspect
+from typing import Optional, Union, overload
+
 from linkml_runtime.utils.schemaview import SchemaView
 
-from ghga_validator.core.models import ValidationReport
-from ghga_validator.plugins.base_plugin import ValidationPlugin
+from ghga_validator.core.compiled_schema import CompiledSchema, as_compiled_schema
+from ghga_validator.core.identifier_index import SqliteIdentifierIndex
+from ghga_validator.core.identifier_store import IdentifierStore
+from ghga_validator.core.identifier_table import IdentifierTable
+from ghga_validator.core.models import (
+    CombinedValidationReport,
+    ValidationReport,
+    ValidationResult,
+)
+from ghga_validator.core.scope import ValidationScope
+from ghga_validator.core.sharded_traversal import (
+    DEFAULT_CHUNK_SIZE,
+    can_shard,
+    summarize_shards,
+)
+from ghga_validator.my_linkml.object_iterator import ObjectIterator, Projection
+from ghga_validator.plugins.base_plugin import (
+    ObjectVisitor,
+    TraversingValidationPlugin,
+    ValidationPlugin,
+)
 
 
 class Validator:
     """
     Validator of data against a given LinkML schema.
 
+    Plugins that traverse the data share a single traversal, each object is
+    passed to the visitors of all of these plugins. The traversal extracts
+    the largest projection of the object data requested by these plugins.
+
+    With several workers, large top-level collections are traversed in chunks
+    by a pool of worker processes, if the visitors of all traversing plugins
+    support shards. Each worker receives the data of its shard and returns a
+    summary of its identifiers and unresolved references, the summaries are
+    passed to the visitors in the order of a serial traversal, so the report
+    does not depend on the workers.
+
+    With a disk index, the visitors record the identifiers in temporary SQLite
+    databases instead of in memory, for submissions whose identifiers do not
+    fit in memory. With a prefilter, a Bloom filter in front of a disk index
+    decides the identifiers that are definitely new, so that only the
+    possible duplicates are looked up in the database.
+
+    With an identifier store, references to objects of accepted submissions
+    are resolved against the store, and identifiers used by accepted
+    submissions are reported as duplicates. The identifiers registered for
+    the validated submission itself are ignored.
+
     Args:
-        schema: Virtual LinkML schema (SchemaView)
+        schema: Virtual LinkML schema (SchemaView) or compiled schema
         plugins: List of plugins for validation
+        workers: Number of worker processes for the traversal
+        chunk_size: Maximum number of top-level objects traversed by a worker
+            at once
+        disk_index: Whether to record the identifiers in a disk-backed index
+        prefilter: Whether to put a Bloom filter in front of the disk indexes,
+            requires the disk index
+        identifier_store: The identifiers of accepted submissions
+        submission: The name of the validated submission in the identifier
+            store, if it is registered
+
+    Raises:
+        ValueError: If a prefilter is requested without disk index
 
     """
 
-    def __init__(self, schema: SchemaView, plugins: list[ValidationPlugin]) -> None:
-        self._schema = schema
+    def __init__(  # noqa: PLR0913
+        self,
+        schema: Union[SchemaView, CompiledSchema],
+        plugins: list[ValidationPlugin],
+        workers: int = 1,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        disk_index: bool = False,
+        prefilter: bool = False,
+        identifier_store: Optional[IdentifierStore] = None,
+        submission: Optional[str] = None,
+    ) -> None:  # pylint: disable=too-many-arguments
+        if prefilter and not disk_index:
+            raise ValueError("The prefilter requires the disk index")
+        self._schema = as_compiled_schema(schema)
         self._plugins = plugins
+        self._workers = workers
+        self._chunk_size = chunk_size
+        self._disk_index = disk_index
+        self._prefilter = prefilter
+        self._identifier_store = (
+            identifier_store.excluding(submission)
+            if identifier_store is not None and submission is not None
+            else identifier_store
+        )
 
-    def validate(self, data: dict, target_class: str) -> ValidationReport:
+    @overload
+    def validate(
+        self,
+        data: dict,
+        target_class: str,
+        only_class: Optional[str] = None,
+        only_path: Optional[str] = None,
+    ) -> ValidationReport:
+        ...
+
+    @overload
+    def validate(
+        self,
+        data: dict,
+        target_class: list[str],
+        only_class: Optional[str] = None,
+        only_path: Optional[str] = None,
+    ) -> CombinedValidationReport:
+        ...
+
+    def validate(
+        self,
+        data: dict,
+        target_class: Union[str, list[str]],
+        only_class: Optional[str] = None,
+        only_path: Optional[str] = None,
+    ) -> Union[ValidationReport, CombinedValidationReport]:
         """
         Validate an object.
 
         Args:
             data: The object to validate
-            target_class: The type of object
+            target_class: The type of object or a list of types to validate the
+                object against
+            only_class: Restrict the validation to the elements of this class
+            only_path: Restrict the validation to the elements at or below this
+                path, given in the dot separated format of the report
 
         Returns:
-            ValidationReport: A validation report that summarizes the validation
+            ValidationReport: A validation report that summarizes the validation,
+            or a CombinedValidationReport with one report per type if a list
+            of types is given
 
+        Raises:
+            ValueError: If the class of the scope is not a class of the schema,
+                no element of the data is at the path of the scope or a plugin
+                does not support a scope
         """
-        validation_results = [
-            plugin.validate(data=data, target_class=target_class)
-            for plugin in self._plugins
+        scope = (
+            ValidationScope(only_class, only_path)
+            if only_class is not None or only_path
+            else None
+        )
+        if scope is not None:
+            for plugin in self._plugins:
+                if not _accepts_scope(plugin):
+                    raise ValueError(
+                        f"Plugin {type(plugin).__name__} does not support"
+                        + " restricting the validation to a class or path"
+                    )
+        if isinstance(target_class, str):
+            return self._validate_class(data, target_class, scope)
+
+        target_classes = list(dict.fromkeys(target_class))
+        reports = [
+            self._validate_class(data, class_name, scope)
+            for class_name in target_classes
         ]
+        return CombinedValidationReport(
+            object=data,
+            types=target_classes,
+            valid=all(report.valid for report in reports),
+            reports=reports,
+        )
+
+    def _validate_class(
+        self, data: dict, target_class: str, scope: Optional[ValidationScope]
+    ) -> ValidationReport:
+        """Validate an object against a single target class"""
+        if scope is not None:
+            scope.check(self._schema.index, data, target_class)
+        disk_indexes: list[SqliteIdentifierIndex] = []
+        try:
+            visitors = self._traverse(data, target_class, scope, disk_indexes)
+            validation_results = [
+                visitors[index].finish()
+                if index in visitors
+                else _validate_plugin(plugin, data, target_class, scope)
+                for index, plugin in enumerate(self._plugins)
+            ]
+        finally:
+            for disk_index in disk_indexes:
+                disk_index.close()
         all_valid = all(result.valid for result in validation_results)
         validation_report = ValidationReport(
             object=data,
@@ -60,3 +214,102 @@ class Validator:
             validation_results=validation_results,
         )
         return validation_report
+
+    def _traverse(
+        self,
+        data: dict,
+        target_class: str,
+        scope: Optional[ValidationScope],
+        disk_indexes: list[SqliteIdentifierIndex],
+    ) -> dict[int, ObjectVisitor]:
+        """
+        Traverse the data once per schema and pass all objects to the visitors
+        of the traversing plugins. The whole data is traversed even if the
+        validation is restricted to a scope, e.g. to resolve references. The
+        visitors of a traversal share one identifier table, or with a disk
+        index each visitor gets a disk index of its own, which is appended to
+        the disk indexes to be closed by the caller.
+
+        Returns:
+            The visitors by position of their plugin
+        """
+        visitors: dict[int, ObjectVisitor] = {}
+        traversals: dict[int, tuple[CompiledSchema, list[ObjectVisitor]]] = {}
+        projections: dict[int, Projection] = {}
+        identifiers: dict[int, IdentifierTable] = {}
+        for index, plugin in enumerate(self._plugins):
+            if isinstance(plugin, TraversingValidationPlugin):
+                schema = plugin.compiled_schema
+                if self._disk_index:
+                    disk_indexes.append(
+                        SqliteIdentifierIndex(prefilter=self._prefilter)
+                    )
+                    visitors[index] = plugin.visitor(
+                        target_class, scope, disk_indexes[-1], self._identifier_store
+                    )
+                else:
+                    visitors[index] = plugin.visitor(
+                        target_class,
+                        scope,
+                        identifiers.setdefault(id(schema), IdentifierTable()),
+                        self._identifier_store,
+                    )
+                traversals.setdefault(id(schema), (schema, []))[1].append(
+                    visitors[index]
+                )
+                projections[id(schema)] = max(
+                    projections.get(id(schema), Projection.IDENTIFIERS),
+                    plugin.PROJECTION,
+                )
+
+        for key, (schema, schema_visitors) in traversals.items():
+            sharded = (
+                self._workers > 1
+                and all(visitor.SUPPORTS_SHARDS for visitor in schema_visitors)
+                and can_shard(schema.index, data, target_class, self._chunk_size)
+            )
+            if sharded:
+                for shard in summarize_shards(
+                    schema.index,
+                    data,
+                    target_class,
+                    scope,
+                    self._workers,
+                    self._chunk_size,
+                ):
+                    for visitor in schema_visitors:
+                        visitor.visit_shard(shard)
+                continue
+            visit_functions = [visitor.visit for visitor in schema_visitors]
+            for class_name, identifier, obj, path in ObjectIterator(
+                schema.index, data, target_class, projection=projections[key]
+            ):
+                for visit in visit_functions:
+                    visit(class_name, identifier, obj, path)
+        return visitors
+
+
+def _accepts_scope(plugin: ValidationPlugin) -> bool:
+    """
+    Return whether a plugin accepts a scope, plugins that implement the
+    earlier signature validate(data, target_class) do not
+    """
+    if isinstance(plugin, TraversingValidationPlugin):
+        return True
+    parameters = inspect.signature(plugin.validate).parameters.values()
+    return any(
+        parameter.name == "scope" or parameter.kind is parameter.VAR_KEYWORD
+        for parameter in parameters
+    )
+
+
+def _validate_plugin(
+    plugin: ValidationPlugin,
+    data: dict,
+    target_class: str,
+    scope: Optional[ValidationScope],
+) -> ValidationResult:
+    """Validate the data with a plugin, the scope is only passed if given"""
+    if scope is None:
+        return plugin.validate(data=data, target_class=target_class)
+    return plugin.validate(data=data, target_class=target_class, scope=scope)
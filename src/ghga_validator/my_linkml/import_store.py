@@ -0,0 +1,155 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Provides a local store for resolving LinkML schema imports."""
+
+import os
+import threading
+from copy import deepcopy
+from pathlib import Path
+from typing import Optional, Union
+
+from linkml_runtime.dumpers import yaml_dumper
+from linkml_runtime.linkml_model.meta import SchemaDefinition
+from linkml_runtime.utils.schemaview import SchemaView, load_schema_wrap
+
+from ghga_validator.utils import CacheInfo
+
+
+def _split_curie(imp: str) -> Optional[tuple[str, str]]:
+    """Splits an import given as CURIE into prefix and local name. Returns
+    None for local file imports and full URLs.
+    """
+    prefix, sep, local_name = imp.partition(":")
+    if not sep or not prefix or local_name.startswith("//"):
+        return None
+    return prefix, local_name
+
+
+class ImportStore:
+    """Resolves imports given as CURIE (e.g. linkml:types) from a local
+    directory, in which the schema for an import prefix:name is stored as
+    prefix/name.yaml. Imports that are not found in the directory are
+    resolved by LinkML as usual.
+
+    All imported schemas are parsed once and memoized, so that constructing
+    several SchemaViews in one process does not parse the imports again.
+    """
+
+    def __init__(self, store_dir: Optional[Union[str, Path]] = None):
+        """Creates a new ImportStore backed by the given directory."""
+        self.store_dir = Path(store_dir) if store_dir else None
+        self._schemas: dict[tuple, SchemaDefinition] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def store_path(self, imp: str) -> Optional[Path]:
+        """Returns the path at which an import given as CURIE is stored."""
+        curie = _split_curie(imp)
+        if self.store_dir is None or curie is None:
+            return None
+        prefix, local_name = curie
+        return self.store_dir / prefix / f"{local_name}.yaml"
+
+    def resolve(self, imp: str) -> Optional[Path]:
+        """Returns the stored schema file for an import, if present."""
+        path = self.store_path(imp)
+        return path if path is not None and path.is_file() else None
+
+    def schema_view(self, schema: Union[str, Path, SchemaDefinition]) -> SchemaView:
+        """Creates a SchemaView that resolves its imports via this store."""
+        return StoreBackedSchemaView(schema, import_store=self)
+
+    def load_import(
+        self, schema_view: SchemaView, imp: str, from_schema: SchemaDefinition
+    ) -> SchemaDefinition:
+        """Returns the parsed schema for an import of a SchemaView."""
+        path = self.resolve(imp)
+        if path is not None:
+            key: tuple = ("store", str(path))
+        else:
+            base_dir = (
+                os.path.dirname(from_schema.source_file)
+                if from_schema.source_file
+                else None
+            )
+            key = ("linkml", imp, base_dir)
+
+        with self._lock:
+            schema = self._schemas.get(key)
+            if schema is not None:
+                self._hits += 1
+            else:
+                self._misses += 1
+        if schema is None:
+            if path is not None:
+                schema = load_schema_wrap(str(path))
+            else:
+                schema = SchemaView.load_import(schema_view, imp, from_schema)
+            with self._lock:
+                self._schemas[key] = schema
+        # SchemaViews may modify the imported schemas, so each gets its own copy
+        return deepcopy(schema)
+
+    def populate(self, schema: Union[str, Path]) -> list[Path]:
+        """Resolves all imports of a schema the usual LinkML way and writes
+        the ones given as CURIE to the store directory.
+
+        Returns:
+            List[Path]: The paths of the stored schemas
+        """
+        if self.store_dir is None:
+            raise ValueError("The import store has no directory to populate")
+        schema_view = SchemaView(str(schema))
+        stored = []
+        for name in schema_view.imports_closure():
+            path = self.store_path(name)
+            if path is None:
+                continue
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(
+                yaml_dumper.dumps(schema_view.schema_map[name]), encoding="utf-8"
+            )
+            stored.append(path)
+        return stored
+
+    def cache_info(self) -> CacheInfo:
+        """Reports how often imports were served from the memoized schemas."""
+        with self._lock:
+            return CacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                maxsize=-1,
+                currsize=len(self._schemas),
+            )
+
+
+class StoreBackedSchemaView(SchemaView):
+    """A SchemaView that resolves imports via an ImportStore."""
+
+    def __init__(
+        self, schema: Union[str, Path, SchemaDefinition], import_store: ImportStore
+    ):
+        """Creates a new StoreBackedSchemaView."""
+        self.import_store = import_store
+        super().__init__(schema)
+
+    def load_import(self, imp: str, from_schema: Optional[SchemaDefinition] = None):
+        """Loads an import via the import store."""
+        if from_schema is None:
+            from_schema = self.schema
+        return self.import_store.load_import(self, imp, from_schema)
@@ -0,0 +1,126 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""JSON schema generation restricted to the classes reachable from a root"""
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+from linkml.generators.jsonschemagen import JsonSchemaGenerator
+from linkml_runtime.linkml_model.meta import AnonymousSlotExpression
+from linkml_runtime.utils.schemaview import SchemaView
+
+
+def _expression_ranges(
+    expression: AnonymousSlotExpression,
+) -> Iterator[str]:
+    """Yield the ranges of a slot expression, including boolean sub-expressions"""
+    if expression.range:
+        yield expression.range
+    for sub_expressions in (
+        expression.any_of,
+        expression.exactly_one_of,
+        expression.all_of,
+        expression.none_of,
+    ):
+        for sub_expression in sub_expressions:
+            yield from _expression_ranges(sub_expression)
+
+
+def _class_expressions(
+    schema_view: SchemaView, class_name: str
+) -> Iterator[AnonymousSlotExpression]:
+    """Yield the induced slots of a class and the slot conditions of its rules"""
+    yield from schema_view.class_induced_slots(class_name)
+    for rule in schema_view.get_class(class_name).rules:
+        for condition in (rule.preconditions, rule.postconditions, rule.elseconditions):
+            if condition is not None:
+                yield from condition.slot_conditions.values()
+
+
+def reachable_elements(
+    schema_view: SchemaView, target_class: str, include_descendants: bool = False
+) -> tuple[set[str], set[str]]:
+    """
+    Compute the classes and enums reachable from the target class.
+
+    A class reaches the ranges of its slots, its is_a parent and its mixins.
+    Descendants of a range class are reached if the range class has a type
+    designator or if include_descendants is set, as the generated JSON schema
+    refers to them in that case.
+
+    Args:
+        schema_view: Virtual LinkML schema (SchemaView)
+        target_class: The root class name
+        include_descendants: Whether descendants of range classes are reachable
+
+    Returns:
+        The names of the reachable classes and the names of the reachable enums
+    """
+    all_classes = schema_view.all_classes()
+    all_enums = schema_view.all_enums()
+    classes: set[str] = set()
+    enums: set[str] = set()
+    todo = [target_class]
+    while todo:
+        class_name = todo.pop()
+        if class_name in classes or class_name not in all_classes:
+            continue
+        classes.add(class_name)
+        todo.extend(schema_view.class_parents(class_name, mixins=True))
+
+        for expression in _class_expressions(schema_view, class_name):
+            for range_name in _expression_ranges(expression):
+                if range_name in all_enums:
+                    enums.add(range_name)
+                elif range_name in all_classes:
+                    todo.append(range_name)
+                    if (
+                        include_descendants
+                        or schema_view.get_type_designator_slot(range_name) is not None
+                    ):
+                        todo.extend(schema_view.class_descendants(range_name))
+    return classes, enums
+
+
+@dataclass
+class ReachableJsonSchemaGenerator(JsonSchemaGenerator):
+    """
+    JSON schema generator that only generates definitions for the classes and
+    enums reachable from the top class. Without a top class, the JSON schema
+    of the whole schema is generated.
+    """
+
+    def generate(self) -> dict:
+        """Generate the JSON schema for the reachable classes and enums"""
+        if (
+            self.top_class is None
+            or self.top_class not in self.schemaview.all_classes()
+        ):
+            return super().generate()
+        classes, enums = reachable_elements(
+            self.schemaview,
+            self.top_class,
+            include_descendants=self.include_range_class_descendants,
+        )
+        self.start_schema()
+        for enum_definition in self.schemaview.all_enums().values():
+            if enum_definition.name in enums:
+                self.handle_enum(enum_definition)
+        for class_definition in self.schemaview.all_classes().values():
+            if class_definition.name in classes:
+                self.handle_class(class_definition)
+        return self.top_level_schema
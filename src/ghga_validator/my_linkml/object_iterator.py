@@ -16,15 +16,20 @@
 
 """Provides an ObjectIterator for LinkML data."""
 
-from collections.abc import Iterable, Iterator
-from copy import deepcopy
-from itertools import chain
+import sys
+from collections.abc import Iterator, Mapping
+from enum import IntEnum
 from numbers import Number
+from types import MappingProxyType
 from typing import Optional, Union
 
-from linkml_runtime.linkml_model.meta import ClassDefinitionName, SlotDefinition
+from linkml_runtime.linkml_model.meta import ClassDefinitionName
 from linkml_runtime.utils.schemaview import SchemaView
 
+from ghga_validator.core.compiled_schema import CompiledSchema
+from ghga_validator.my_linkml.schema_index import ClassPlan, SchemaIndex
+from ghga_validator.utils import ObjectPath
+
 
 class RootInferenceError(RuntimeError):
     """This error is produced if the root class could not be determined from a
@@ -32,68 +37,174 @@ class RootInferenceError(RuntimeError):
     """
 
 
+class Projection(IntEnum):
+    """The element data extracted by the ObjectIterator. Each projection
+    contains the data of the previous ones, so that the projection satisfying
+    several consumers is the maximum of their projections.
+
+    IDENTIFIERS: Only class name and identifier, the element data is empty
+    REFERENCES: The element data contains only the slots that reference
+        other elements by identifier
+    FULL: The complete re-serialized element data
+    """
+
+    IDENTIFIERS = 0
+    REFERENCES = 1
+    FULL = 2
+
+
+# The element data yielded for the IDENTIFIERS projection
+_NO_DATA: Mapping = MappingProxyType({})
+
+
+class _KeyedElement(Mapping):
+    """Read-only view of an element of a slot inlined as dictionary, which
+    adds the dictionary key as value of the identifier slot without copying
+    or modifying the element data.
+    """
+
+    __slots__ = ("_data", "_identifier_slot", "_key")
+
+    def __init__(self, data: dict, identifier_slot: str, key: Union[str, Number]):
+        self._data = data
+        self._identifier_slot = identifier_slot
+        self._key = key
+
+    def __getitem__(self, slot_name):
+        if slot_name == self._identifier_slot:
+            return self._key
+        return self._data[slot_name]
+
+    def __iter__(self):
+        yield from self._data
+        if self._identifier_slot not in self._data:
+            yield self._identifier_slot
+
+    def __len__(self):
+        return len(self._data) + (self._identifier_slot not in self._data)
+
+    def __contains__(self, slot_name):
+        return slot_name == self._identifier_slot or slot_name in self._data
+
+
+class LazyElement(Mapping):
+    """Read-only mapping of the re-serialized data of an element yielded by
+    the ObjectIterator. The element is re-serialized on first access to its
+    content and the result is cached, consumers that only use the class name
+    and identifier of an element never re-serialize it.
+    """
+
+    __slots__ = ("_data", "_index", "_class_name", "_inline_non_identifiable", "_value")
+
+    def __init__(
+        self,
+        data: Mapping,
+        index: SchemaIndex,
+        class_name: Union[str, ClassDefinitionName],
+        inline_non_identifiable: bool,
+    ):
+        self._data = data
+        self._index = index
+        self._class_name = class_name
+        self._inline_non_identifiable = inline_non_identifiable
+        self._value: Optional[dict] = None
+
+    def resolve(self) -> dict:
+        """Returns the re-serialized element data"""
+        if self._value is None:
+            self._value = ObjectIterator._re_serialize_element(
+                self._data, self._index, self._class_name, self._inline_non_identifiable
+            )
+        return self._value
+
+    def __getitem__(self, slot_name):
+        """Returns the re-serialized value of a slot"""
+        return self.resolve()[slot_name]
+
+    def __iter__(self):
+        """Iterates over the slot names of the re-serialized element"""
+        return iter(self.resolve())
+
+    def __len__(self):
+        """Returns the number of slots of the re-serialized element"""
+        return len(self.resolve())
+
+    def __repr__(self):
+        """Represents the element by its re-serialized data"""
+        return repr(self.resolve())
+
+
 class ObjectIterator:
     """This iterator class enables iterating through all elements below a
     specified or inferred root element. The iterator returns tuples of an
     elements class name, identifier if present and the corresponding element
     data, which has been re-serialized such that all identifiable inlined
     elements below the element itself have been un-inlined, i.e. replaced by
-    their identifiers.
+    their identifiers. The element data is a LazyElement, which is only
+    re-serialized when it is accessed. A smaller projection can be requested
+    if only the identifiers or references of the elements are needed.
     """
 
-    _schema: SchemaView
+    _index: SchemaIndex
     _root: Union[ClassDefinitionName, str]
+    _plan: ClassPlan
     _data: dict
-    _recursion_iterator: Optional[Iterator]
+    _stack: list[Iterator[tuple[str, Mapping, ObjectPath]]]
+    _started: bool
     _enumerate_non_identifiable: bool
     _inline_non_identifiable: bool
-    _path: list
+    _path: ObjectPath
+    _projection: Projection
 
     def __init__(  # noqa: PLR0913
         self,
-        schema: SchemaView,
+        schema: Union[SchemaView, CompiledSchema, SchemaIndex],
         data: dict,
         root: Optional[str] = None,
         enumerate_non_identifiable=False,
         inline_non_identifiable=True,
-        path: Optional[list] = None,
+        path: Optional[Union[list, ObjectPath]] = None,
+        projection: Projection = Projection.FULL,
     ):  # pylint: disable=too-many-arguments
         """Creates a new IdentifiedObjectIterator."""
-        self._schema = schema
+        if isinstance(schema, SchemaIndex):
+            self._index = schema
+        elif isinstance(schema, CompiledSchema):
+            self._index = schema.index
+        else:
+            self._index = SchemaIndex.from_schema_view(schema)
         self._data = data
         self._enumerate_non_identifiable = enumerate_non_identifiable
         self._inline_non_identifiable = inline_non_identifiable
-        self._path = path if path else []
-        # If a root class was specified, use it
+        self._projection = projection
+        self._path = (
+            path if isinstance(path, ObjectPath) else ObjectPath.from_keys(path or [])
+        )
+        # If a root class was specified, use it, as the shared object of the
+        # class name
         if root:
-            self._root = root
+            self._root = sys.intern(str(root))
         # ... otherwise, attempt to infer the root class from the provided model.
         else:
-            self._root = ObjectIterator._infer_root(schema)
-
-        # Root class slots that we need to recurse into, i.e. all slots with a
-        # class range.
-        self._recursion_slots = [
-            (slot_def.name, slot_def)
-            for slot_def in self._schema.class_induced_slots(self._root)
-            if slot_def.range in schema.all_classes() and slot_def.inlined is not False
-        ]
+            self._root = ObjectIterator._infer_root(self._index)
+
+        # The slots that we need to recurse into, i.e. all slots with an
+        # inlined class range, are compiled once per class and shared by all
+        # iterators of the class
+        self._plan = self._index.class_plan(self._root)
 
-        self._recursion_iterator = None
+        self._stack = []
+        self._started = False
 
     @staticmethod
-    def _infer_root(schema: SchemaView) -> ClassDefinitionName:
+    def _infer_root(index: SchemaIndex) -> ClassDefinitionName:
         """Iterates through all class definitions in a schema and returns the
         name of the single class that is defined as the tree root.
 
         Raises a RootInferenceError if no or multiple such classes are found.
         """
         # Identify all classes that have tree_root set to true
-        root_labeled_classes = [
-            name
-            for name, definition in schema.all_classes().items()
-            if definition.tree_root
-        ]
+        root_labeled_classes = index.tree_roots
 
         # If there are no or multiple classes, raise an error
         if not root_labeled_classes:
@@ -101,12 +212,12 @@ class ObjectIterator:
         if len(root_labeled_classes) > 1:
             raise RootInferenceError("Schema has multiple classes defined as tree root")
 
-        return root_labeled_classes[0]
+        return ClassDefinitionName(root_labeled_classes[0])
 
     @staticmethod
     def _re_serialize_element(
-        data: dict,
-        schema: SchemaView,
+        data: Mapping,
+        index: SchemaIndex,
         root: Union[str, ClassDefinitionName],
         inline_non_identifiable: bool,
     ):
@@ -114,15 +225,14 @@ class ObjectIterator:
         inlined slots are not inlined anymore if the corresponding slot class
         itself has an identifier slot.
         """
+        plan = index.class_plan(root)
         re_serialized_element = {}
         for slot_name, slot_value in data.items():
-            slot_def = schema.induced_slot(slot_name, root)
+            slot_def = plan.inlined_slot(slot_name)
             # If the slot has an inlined class range, transform the inlined
             # value into a reference if it has an identifier slot
-            if slot_def.range in schema.all_classes() and slot_def.inlined is not False:
-                id_slot: Optional[SlotDefinition] = schema.get_identifier_slot(
-                    slot_def.range
-                )
+            if slot_def is not None:
+                id_slot = slot_def.identifier_slot
                 # If the slot class has no identifier, recursively serialize it
                 # if enabled
                 if id_slot is None and inline_non_identifiable:
@@ -136,7 +246,7 @@ class ObjectIterator:
                             )
                         re_serialized_element[slot_name] = [
                             ObjectIterator._re_serialize_element(
-                                v, schema, slot_def.range, inline_non_identifiable
+                                v, index, slot_def.range_class, inline_non_identifiable
                             )
                             for v in slot_value
                         ]
@@ -145,8 +255,8 @@ class ObjectIterator:
                             slot_name
                         ] = ObjectIterator._re_serialize_element(
                             slot_value,
-                            schema,
-                            slot_def.range,
+                            index,
+                            slot_def.range_class,
                             inline_non_identifiable,
                         )
                 elif id_slot is not None:  # noqa: SIM102
@@ -155,18 +265,13 @@ class ObjectIterator:
                     if slot_def.multivalued:
                         # The data is of type list and this is permitted
                         # according to the slot definition
-                        if (
-                            slot_def.inlined_as_list or slot_def.inlined_as_list is None
-                        ) and isinstance(slot_value, list):
+                        if slot_def.list_allowed and isinstance(slot_value, list):
                             re_serialized_element[slot_name] = [
-                                elem[id_slot.name] for elem in slot_value
+                                elem[id_slot] for elem in slot_value
                             ]
                         # The data is of type dict and this is permitted
                         # according to the slot definition
-                        elif (
-                            slot_def.inlined_as_list is False
-                            or slot_def.inlined_as_list is None
-                        ) and isinstance(slot_value, dict):
+                        elif slot_def.dict_allowed and isinstance(slot_value, dict):
                             re_serialized_element[slot_name] = list(slot_value)
                         # The data is of a type that is not permitted according
                         # to the slot definition
@@ -184,75 +289,53 @@ class ObjectIterator:
 
         return re_serialized_element
 
-    def _re_serialize_root(self):
-        """Re-serializes the data stored in this iterator object such that
-        inlined slots are not inlined anymore if the corresponding slot class
-        itself has an identifier slot.
-        """
-        return ObjectIterator._re_serialize_element(
-            self._data, self._schema, self._root, self._inline_non_identifiable
-        )
-
-    def _child_iterators(self) -> Iterable[Iterator]:
-        """Returns an iterable of IdentifiedObjectIterator objects for every
-        class-range slot of the current root class that has not been iterated
-        yet.
+    def _child_elements(
+        self,
+        class_name: Union[str, ClassDefinitionName],
+        data: Mapping,
+        path: ObjectPath,
+    ) -> Iterator[tuple[str, Mapping, ObjectPath]]:
+        """Returns an iterator over the class name, data and path of every
+        element of a class-range slot of the given element.
         """
-        for next_slot_name, next_slot_def in self._recursion_slots:
-            if next_slot_name in self._data.keys():  # noqa: SIM118
-                # If the slot is not multivalued, a single-value list is returned
-                # with an IdentifiedObjectIterator for the value of the slot
+        plan = self._index.class_plan(class_name)
+        for next_slot_name, next_slot_def in plan.recursion_slots.items():
+            if next_slot_name in data.keys():  # noqa: SIM118
+                slot_value = data[next_slot_name]
+                # The paths of all elements of the slot share the slot path
+                slot_path = ObjectPath(path, next_slot_name)
+                # If the slot is not multivalued, the value of the slot is the
+                # only element
                 if not next_slot_def.multivalued:
-                    yield ObjectIterator(
-                        self._schema,
-                        self._data[next_slot_name],
-                        next_slot_def.range,
-                        enumerate_non_identifiable=self._enumerate_non_identifiable,
-                        inline_non_identifiable=self._inline_non_identifiable,
-                        path=self._path + [next_slot_name],  # noqa: RUF005
+                    yield (
+                        next_slot_def.range_class,
+                        slot_value,
+                        slot_path,
                     )
-                # If the slot is multivalued and encoded in list format, a list with
-                # one IdentifiedObjectIterator per element is returned
-                elif (
-                    next_slot_def.inlined_as_list
-                    or next_slot_def.inlined_as_list is None
-                ) and isinstance(self._data[next_slot_name], list):
-                    for idx, elem in enumerate(self._data[next_slot_name]):
-                        yield ObjectIterator(
-                            self._schema,
+                # If the slot is multivalued and encoded in list format, every
+                # list item is an element
+                elif next_slot_def.list_allowed and isinstance(slot_value, list):
+                    for idx, elem in enumerate(slot_value):
+                        yield (
+                            next_slot_def.range_class,
                             elem,
-                            next_slot_def.range,
-                            enumerate_non_identifiable=self._enumerate_non_identifiable,
-                            inline_non_identifiable=self._inline_non_identifiable,
-                            path=self._path + [next_slot_name] + [idx],  # noqa: RUF005
+                            ObjectPath(slot_path, idx),
                         )
-                # If the slot is multivalued and encoded in dictionary format, a list with
-                # one IdentifiedObjectIterator per element is returned. Since the
-                # identifier slot is optional in the dictionary format, the
-                # identifier is set based on the dictionary keys before the data is
-                # used.
-                elif (
-                    next_slot_def.inlined_as_list is False
-                    or next_slot_def.inlined_as_list is None
-                ) and isinstance(self._data[next_slot_name], dict):
-                    identifier_slot = self._schema.get_identifier_slot(
-                        next_slot_def.range
-                    )
+                # If the slot is multivalued and encoded in dictionary format,
+                # every dictionary value is an element. Since the identifier slot
+                # is optional in the dictionary format, the elements are viewed
+                # with the dictionary keys as identifiers.
+                elif next_slot_def.dict_allowed and isinstance(slot_value, dict):
+                    identifier_slot = next_slot_def.identifier_slot
                     if identifier_slot is None:
                         raise RuntimeError(
-                            f"Expected identifier slot for {next_slot_def.range}"
+                            f"Expected identifier slot for {next_slot_def.range_class}"
                         )
-                    modified_data = deepcopy(self._data[next_slot_name])
-                    for key, value in modified_data.items():
-                        value[identifier_slot.name] = key
-                    for key, elem in modified_data.items():
-                        yield ObjectIterator(
-                            self._schema,
-                            elem,
-                            next_slot_def.range,
-                            enumerate_non_identifiable=self._enumerate_non_identifiable,
-                            inline_non_identifiable=self._inline_non_identifiable,
-                            path=self._path + [next_slot_name] + [key],  # noqa: RUF005
+                    for key, elem in slot_value.items():
+                        yield (
+                            next_slot_def.range_class,
+                            _KeyedElement(elem, identifier_slot, key),
+                            ObjectPath(slot_path, key),
                         )
                 # If none of the previous conditions were met, we have encountered a
                 # data format that is incompatible with the multivalued, inlined and
@@ -261,36 +344,79 @@ class ObjectIterator:
                     raise RuntimeError(
                         "Invalid data. Slot is configured as"
                         f" inlined_as_list={next_slot_def.inlined_as_list} but data is"
-                        f" of type {type(self._data[next_slot_name]).__name__}"
+                        f" of type {type(slot_value).__name__}"
                     )
 
+    def _visit(
+        self,
+        class_name: Union[str, ClassDefinitionName],
+        data: Mapping,
+        path: ObjectPath,
+    ) -> Optional[
+        tuple[
+            Union[str, ClassDefinitionName],
+            Optional[Union[str, Number]],
+            Mapping,
+            ObjectPath,
+        ]
+    ]:
+        """Schedules the child elements of an element and returns the tuple to
+        yield for the element, or None if the element is not enumerated.
+        """
+        self._stack.append(self._child_elements(class_name, data, path))
+        plan = self._index.class_plan(class_name)
+        identifier_slot = plan.identifier_slot
+        if identifier_slot or self._enumerate_non_identifiable:
+            return (
+                class_name,  # element class
+                data[identifier_slot] if identifier_slot else None,  # identifier
+                self._project(plan, data),  # element data
+                path,
+            )
+        return None
+
+    def _project(self, plan: ClassPlan, data: Mapping) -> Mapping:
+        """Extracts the element data of the requested projection."""
+        if self._projection == Projection.FULL:
+            return LazyElement(
+                data, self._index, plan.class_name, self._inline_non_identifiable
+            )
+        if self._projection == Projection.REFERENCES:
+            return {
+                slot_name: slot_value
+                for slot_name, slot_value in data.items()
+                if plan.is_reference_slot(slot_name)
+            }
+        return _NO_DATA
+
     def __next__(
         self,
     ) -> tuple[
         Union[str, ClassDefinitionName],
         Optional[Union[str, Number]],
-        dict,
-        list[Union[str, Number]],
+        Mapping,
+        ObjectPath,
     ]:
         """Select the next element"""
-        if self._recursion_iterator is None:
-            # Build an iterator for all slots of the root class that have a class range
-            self._recursion_iterator = chain.from_iterable(self._child_iterators())
-
-            # De-serialize the root element if it is identifiable
-            root_identifier_slot = self._schema.get_identifier_slot(self._root)
-            if root_identifier_slot or self._enumerate_non_identifiable:
-                return (
-                    self._root,  # root element class
-                    self._data[root_identifier_slot.name]
-                    if root_identifier_slot
-                    else None,  # root element identifier
-                    self._re_serialize_root(),  # root element data
-                    self._path,
-                )
-
-        # Pick the next slot with a class range and recurse
-        return next(self._recursion_iterator)
+        if not self._started:
+            self._started = True
+            element = self._visit(self._root, self._data, self._path)
+            if element is not None:
+                return element
+
+        # Depth-first traversal using an explicit stack with one iterator over
+        # the child elements per level, so that the Python stack depth does
+        # not grow with the nesting of the data
+        while self._stack:
+            try:
+                class_name, data, path = next(self._stack[-1])
+            except StopIteration:
+                self._stack.pop()
+                continue
+            element = self._visit(class_name, data, path)
+            if element is not None:
+                return element
+        raise StopIteration
 
     def __iter__(self):
         """Returns the iterator itself."""
@@ -0,0 +1,305 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Provides precomputed lookup tables for a LinkML schema."""
+
+import sys
+from collections.abc import Iterable
+from typing import NamedTuple, Optional
+
+from linkml_runtime.linkml_model.meta import SlotDefinition
+from linkml_runtime.utils.schemaview import SchemaView
+
+
+class SlotInfo(NamedTuple):
+    """The properties of a slot as induced for a particular class."""
+
+    name: str
+    range_class: Optional[str]
+    multivalued: bool
+    inlined: Optional[bool]
+    inlined_as_list: Optional[bool]
+    is_inlined: bool
+
+
+def _intern(name: str) -> str:
+    """Interns a name of the schema, names may be instances of str subclasses."""
+    return sys.intern(str(name))
+
+
+def _intern_slot(slot: SlotInfo) -> SlotInfo:
+    """Interns the slot and range class name of a slot."""
+    return slot._replace(
+        name=_intern(slot.name),
+        range_class=_intern(slot.range_class) if slot.range_class else None,
+    )
+
+
+class SlotPlan(NamedTuple):
+    """How the values of a slot with an inlined class range are traversed."""
+
+    name: str
+    range_class: str
+    multivalued: bool
+    inlined_as_list: Optional[bool]
+    list_allowed: bool
+    dict_allowed: bool
+    identifier_slot: Optional[str]
+
+
+class ClassPlan:
+    """The traversal plan of a class, i.e. its identifier slot, the slots
+    with an inlined class range that need to be recursed into, in the order of
+    the induced slots of the class, and the slots that reference other
+    elements by identifier.
+    """
+
+    __slots__ = (
+        "class_name",
+        "identifier_slot",
+        "recursion_slots",
+        "reference_slots",
+        "_index",
+        "_slot_names",
+    )
+
+    def __init__(self, index: "SchemaIndex", class_name: str):
+        """Compiles the traversal plan of a class."""
+        self._index = index
+        self.class_name = class_name
+        self.identifier_slot = index.identifier_slot(class_name)
+        slots = index.class_slots(class_name)
+        self._slot_names = frozenset(slot.name for slot in slots)
+        self.recursion_slots = {
+            slot.name: self._slot_plan(slot)
+            for slot in slots
+            if slot.range_class and slot.inlined is not False
+        }
+        self.reference_slots = frozenset(
+            slot.name for slot in slots if slot.range_class and not slot.is_inlined
+        )
+
+    def _slot_plan(self, slot: SlotInfo) -> SlotPlan:
+        """Derives the plan of a slot with an inlined class range."""
+        range_class = str(slot.range_class)
+        return SlotPlan(
+            name=slot.name,
+            range_class=range_class,
+            multivalued=slot.multivalued,
+            inlined_as_list=slot.inlined_as_list,
+            list_allowed=slot.inlined_as_list is not False,
+            dict_allowed=not slot.inlined_as_list,
+            identifier_slot=self._index.identifier_slot(range_class),
+        )
+
+    def inlined_slot(self, slot_name: str) -> Optional[SlotPlan]:
+        """Returns the plan of a slot if it has an inlined class range and None
+        for any other slot. Like SchemaIndex.slot, slots that are not used by
+        the class are looked up in the schema level slot definitions.
+        """
+        slot_plan = self.recursion_slots.get(slot_name)
+        if slot_plan is not None or slot_name in self._slot_names:
+            return slot_plan
+        slot = self._index.slot(self.class_name, slot_name)
+        if slot.range_class and slot.inlined is not False:
+            return self._slot_plan(slot)
+        return None
+
+    def is_reference_slot(self, slot_name: str) -> bool:
+        """Returns whether a slot has a class range and is not inlined. Like
+        SchemaIndex.slot, slots that are not used by the class are looked up
+        in the schema level slot definitions.
+        """
+        if slot_name in self.reference_slots:
+            return True
+        if slot_name in self._slot_names:
+            return False
+        slot = self._index.slot(self.class_name, slot_name)
+        return bool(slot.range_class) and not slot.is_inlined
+
+
+class SchemaIndex:
+    """Immutable lookup tables derived from a LinkML schema. The index
+    answers the questions asked for every element during validation, i.e.
+    the induced slots of a class, their ranges and the identifier slot of a
+    class, by plain dictionary lookups instead of SchemaView computations.
+    """
+
+    _class_slots: dict[str, dict[str, SlotInfo]]
+    _global_slots: dict[str, SlotInfo]
+    _identifier_slots: dict[str, Optional[str]]
+    _tree_roots: tuple[str, ...]
+    _class_plans: dict[str, ClassPlan]
+
+    def __init__(
+        self,
+        class_slots: dict[str, dict[str, SlotInfo]],
+        global_slots: dict[str, SlotInfo],
+        identifier_slots: dict[str, Optional[str]],
+        tree_roots: Iterable[str],
+    ):
+        """Creates a new SchemaIndex from precomputed lookup tables."""
+        self._set_tables(class_slots, global_slots, identifier_slots, tree_roots)
+
+    def _set_tables(
+        self,
+        class_slots: dict[str, dict[str, SlotInfo]],
+        global_slots: dict[str, SlotInfo],
+        identifier_slots: dict[str, Optional[str]],
+        tree_roots: Iterable[str],
+    ) -> None:
+        """Sets the lookup tables with all class and slot names interned, so
+        that the names used during validation are shared objects and
+        dictionary lookups by name succeed by identity.
+        """
+        self._class_slots = {
+            _intern(class_name): {
+                _intern(slot_name): _intern_slot(slot)
+                for slot_name, slot in slots.items()
+            }
+            for class_name, slots in class_slots.items()
+        }
+        self._global_slots = {
+            _intern(slot_name): _intern_slot(slot)
+            for slot_name, slot in global_slots.items()
+        }
+        self._identifier_slots = {
+            _intern(class_name): _intern(id_slot) if id_slot is not None else None
+            for class_name, id_slot in identifier_slots.items()
+        }
+        self._tree_roots = tuple(_intern(name) for name in tree_roots)
+        self._class_plans = {}
+
+    @classmethod
+    def from_schema_view(cls, schema: SchemaView) -> "SchemaIndex":
+        """Builds the lookup tables for all classes of a schema."""
+        all_classes = schema.all_classes()
+
+        def slot_info(slot_def: SlotDefinition) -> SlotInfo:
+            return SlotInfo(
+                name=slot_def.name,
+                range_class=slot_def.range if slot_def.range in all_classes else None,
+                multivalued=bool(slot_def.multivalued),
+                inlined=slot_def.inlined,
+                inlined_as_list=slot_def.inlined_as_list,
+                is_inlined=schema.is_inlined(slot_def),
+            )
+
+        class_slots = {
+            str(class_name): {
+                slot_def.name: slot_info(slot_def)
+                for slot_def in schema.class_induced_slots(class_name)
+            }
+            for class_name in all_classes
+        }
+        global_slots = {
+            str(slot_name): slot_info(schema.induced_slot(slot_name))
+            for slot_name in schema.all_slots()
+        }
+        identifier_slots = {}
+        for class_name in all_classes:
+            id_slot = schema.get_identifier_slot(class_name)
+            identifier_slots[str(class_name)] = id_slot.name if id_slot else None
+        tree_roots = [
+            str(name)
+            for name, definition in all_classes.items()
+            if definition.tree_root
+        ]
+        return cls(class_slots, global_slots, identifier_slots, tree_roots)
+
+    def __getstate__(self) -> dict:
+        """Excludes the traversal plans, which are compiled on demand."""
+        state = self.__dict__.copy()
+        state.pop("_class_plans", None)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """Restores the lookup tables without traversal plans."""
+        self._set_tables(
+            state["_class_slots"],
+            state["_global_slots"],
+            state["_identifier_slots"],
+            state["_tree_roots"],
+        )
+
+    def to_dict(self) -> dict:
+        """Returns a JSON serializable representation of the index."""
+        return {
+            "class_slots": {
+                class_name: [list(slot) for slot in slots.values()]
+                for class_name, slots in self._class_slots.items()
+            },
+            "global_slots": [list(slot) for slot in self._global_slots.values()],
+            "identifier_slots": self._identifier_slots,
+            "tree_roots": list(self._tree_roots),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SchemaIndex":
+        """Restores an index from the representation created by to_dict."""
+        class_slots = {
+            class_name: {slot[0]: SlotInfo(*slot) for slot in slots}
+            for class_name, slots in data["class_slots"].items()
+        }
+        global_slots = {slot[0]: SlotInfo(*slot) for slot in data["global_slots"]}
+        return cls(
+            class_slots, global_slots, data["identifier_slots"], data["tree_roots"]
+        )
+
+    @property
+    def tree_roots(self) -> tuple[str, ...]:
+        """Names of all classes that are defined as tree root."""
+        return self._tree_roots
+
+    def is_class(self, name: str) -> bool:
+        """Returns whether the name refers to a class of the schema."""
+        return name in self._class_slots
+
+    def class_slots(self, class_name: str) -> Iterable[SlotInfo]:
+        """Returns the induced slots of a class."""
+        try:
+            return self._class_slots[class_name].values()
+        except KeyError as err:
+            raise ValueError(f"No such class {class_name}") from err
+
+    def slot(self, class_name: str, slot_name: str) -> SlotInfo:
+        """Returns the slot as induced for a class. Like SchemaView.induced_slot,
+        this falls back to the schema level slot definition for slots that are
+        not used by the class.
+        """
+        slot = self._class_slots.get(class_name, {}).get(slot_name)
+        if slot is None:
+            slot = self._global_slots.get(slot_name)
+        if slot is None:
+            raise ValueError(
+                f"No such slot {slot_name} as an attribute of {class_name} ancestors"
+                + " or as a slot definition in the schema"
+            )
+        return slot
+
+    def identifier_slot(self, class_name: Optional[str]) -> Optional[str]:
+        """Returns the name of the identifier slot of a class, if any."""
+        if class_name is None:
+            return None
+        return self._identifier_slots.get(class_name)
+
+    def class_plan(self, class_name: str) -> ClassPlan:
+        """Returns the traversal plan of a class, compiled once per class."""
+        plan = self._class_plans.get(class_name)
+        if plan is None:
+            plan = ClassPlan(self, class_name)
+            self._class_plans[class_name] = plan
+        return plan
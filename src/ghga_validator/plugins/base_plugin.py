@@ -17,23 +17,129 @@
 """Base Class for Validation Plugins"""
 
 from abc import ABC, abstractmethod
+from collections.abc import Mapping
+from numbers import Number
+from typing import Optional, Union
 
+from linkml_runtime.utils.schemaview import SchemaView
+
+from ghga_validator.core.compiled_schema import CompiledSchema, as_compiled_schema
+from ghga_validator.core.identifier_index import IdentifierIndex
+from ghga_validator.core.identifier_store import IdentifierStore
 from ghga_validator.core.models import ValidationResult
+from ghga_validator.core.scope import ValidationScope
+from ghga_validator.core.sharded_traversal import ShardSummary
+from ghga_validator.my_linkml.object_iterator import ObjectIterator, Projection
+from ghga_validator.my_linkml.schema_index import SchemaIndex
+from ghga_validator.utils import ObjectPath
 
 
 class ValidationPlugin(ABC):
     """An abstract class for validation plugins"""
 
-    def __init__(self, schema):
+    def __init__(self, schema: Union[SchemaView, CompiledSchema]):
         """
         Initialize the plugin with the given schema.
 
         Args:
-            schema: schema representation
+            schema: schema representation, either a SchemaView or a compiled schema
 
         """
-        self.schema = schema
+        self.compiled_schema = as_compiled_schema(schema)
+
+    @property
+    def schema(self) -> SchemaView:
+        """Virtual LinkML schema (SchemaView)"""
+        return self.compiled_schema.schema_view
+
+    @property
+    def index(self) -> SchemaIndex:
+        """Lookup index of the slots and identifiers of the schema"""
+        return self.compiled_schema.index
 
     @abstractmethod
-    def validate(self, data, target_class) -> ValidationResult:
-        """Validate input data against the schema starting with the target class"""
+    def validate(
+        self, data, target_class, scope: Optional[ValidationScope] = None
+    ) -> ValidationResult:
+        """
+        Validate input data against the schema starting with the target class.
+        If a scope is given, only the selected elements are validated.
+        """
+
+
+class ObjectVisitor(ABC):
+    """
+    Receives the objects of one traversal of the data, as yielded by the
+    ObjectIterator. The object data is shared by all visitors of a traversal
+    and must not be modified.
+
+    Visitors that only need the identifiers and references of the objects
+    can set SUPPORTS_SHARDS and implement visit_shard, so that the top-level
+    collections of large data are traversed by worker processes. Such a
+    traversal passes summaries of the root object and of the shards instead
+    of the objects.
+    """
+
+    SUPPORTS_SHARDS = False
+
+    @abstractmethod
+    def visit(
+        self,
+        class_name: str,
+        identifier: Optional[Union[str, Number]],
+        data: Mapping,
+        path: ObjectPath,
+    ) -> None:
+        """Process the next object of the traversal"""
+
+    def visit_shard(self, shard: ShardSummary) -> None:
+        """
+        Process the summary of the next shard of the traversal, in place of
+        the objects of the shard
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support shards")
+
+    @abstractmethod
+    def finish(self) -> ValidationResult:
+        """Return the validation result once all objects were visited"""
+
+
+class TraversingValidationPlugin(ValidationPlugin):
+    """
+    An abstract class for validation plugins that inspect every object below
+    the target class. The Validator traverses the data once and passes each
+    object to the visitors of all such plugins.
+
+    PROJECTION is the smallest projection of the object data the visitors of
+    the plugin need, the visitors must accept any larger projection.
+    """
+
+    PROJECTION = Projection.FULL
+
+    @abstractmethod
+    def visitor(
+        self,
+        target_class: str,
+        scope: Optional[ValidationScope] = None,
+        identifiers: Optional[IdentifierIndex] = None,
+        store: Optional[IdentifierStore] = None,
+    ) -> ObjectVisitor:
+        """
+        Create the visitor for a single traversal of the data. All objects
+        are visited, if a scope is given only the selected ones are validated.
+        The visitors of a traversal share the identifier table, if given. A
+        disk-backed identifier index is given to a single visitor. Visitors
+        that resolve or compare identifiers also consult the identifier store
+        of accepted submissions, if given.
+        """
+
+    def validate(
+        self, data, target_class, scope: Optional[ValidationScope] = None
+    ) -> ValidationResult:
+        """Validate input data with a traversal for this plugin only"""
+        visitor = self.visitor(target_class, scope)
+        for class_name, identifier, obj, path in ObjectIterator(
+            self.index, data, target_class, projection=self.PROJECTION
+        ):
+            visitor.visit(class_name, identifier, obj, path)
+        return visitor.finish()
@@ -15,15 +15,35 @@
 
 """Plugin for structural validation of a JSON object"""
 
-import json
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Optional, Union
 
 import jsonschema
-from linkml.generators.jsonschemagen import JsonSchemaGenerator
-from linkml_runtime.utils.schemaview import ClassDefinitionName
+from linkml_runtime.utils.schemaview import ClassDefinitionName, SchemaView
 
+from ghga_validator.core.compiled_schema import CompiledSchema
+from ghga_validator.core.jsonschema_compiler import (
+    CompiledJsonSchemaValidator,
+    UnsupportedSchemaError,
+)
 from ghga_validator.core.models import ValidationMessage, ValidationResult
+from ghga_validator.core.scope import ValidationScope
 from ghga_validator.plugins.base_plugin import ValidationPlugin
-from ghga_validator.utils import path_as_string
+from ghga_validator.utils import CacheInfo, path_as_string
+
+MAX_CACHED_VALIDATORS = 16
+
+ENGINE_DRAFT7 = "draft7"
+
+ENGINE_COMPILED = "compiled"
+
+JSON_SCHEMA_ENGINES = (ENGINE_DRAFT7, ENGINE_COMPILED)
+
+JsonSchemaValidator = Union[jsonschema.Draft7Validator, CompiledJsonSchemaValidator]
 
 
 class GHGAJsonSchemaValidationPlugin(ValidationPlugin):
@@ -31,8 +51,52 @@ class GHGAJsonSchemaValidationPlugin(ValidationPlugin):
 
     NAME = "GHGAJsonSchemaValidationPlugin"
 
+    def __init__(
+        self,
+        schema: Union[SchemaView, CompiledSchema],
+        max_cached_validators: int = MAX_CACHED_VALIDATORS,
+        engine: Optional[str] = None,
+        code_cache_dir: Optional[Union[str, Path]] = None,
+    ):
+        """
+        Initialize the plugin with the given schema.
+
+        Args:
+            schema: schema representation, either a SchemaView or a compiled schema
+            max_cached_validators: Maximum number of compiled JSON schema
+                validators kept in memory
+            engine: "draft7" to interpret the JSON schema with jsonschema or
+                "compiled" to run generated validation code, defaults to the
+                environment variable GHGA_VALIDATOR_JSON_SCHEMA_ENGINE or "draft7"
+            code_cache_dir: Directory to store the generated validation code in,
+                defaults to the environment variable GHGA_VALIDATOR_CODE_CACHE_DIR
+
+        """
+        super().__init__(schema)
+        self.engine = engine or os.environ.get(
+            "GHGA_VALIDATOR_JSON_SCHEMA_ENGINE", ENGINE_DRAFT7
+        )
+        if self.engine not in JSON_SCHEMA_ENGINES:
+            raise ValueError(
+                f"Unknown JSON schema engine '{self.engine}',"
+                + f" expected one of {', '.join(JSON_SCHEMA_ENGINES)}"
+            )
+        self.code_cache_dir = code_cache_dir or os.environ.get(
+            "GHGA_VALIDATOR_CODE_CACHE_DIR"
+        )
+        self._max_cached_validators = max_cached_validators
+        self._validators: OrderedDict[
+            tuple, tuple[dict, JsonSchemaValidator]
+        ] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
     def validate(
-        self, data: dict, target_class: ClassDefinitionName
+        self,
+        data: dict,
+        target_class: ClassDefinitionName,
+        scope: Optional[ValidationScope] = None,
     ) -> ValidationResult:
         """
         Perform validation on an object.
@@ -40,44 +104,99 @@ class GHGAJsonSchemaValidationPlugin(ValidationPlugin):
         Args:
             data: The JSON object to validate
             target_class: class name for root class
+            scope: The elements to validate, each selected element is validated
+                against the JSON schema of its class. Defaults to the whole object
 
         Returns:
             ValidationResult: A validation result that describes the outcome of validation
 
         """
-        json_schema = self.jsonschema_from_linkml(target_class)
+        messages: list[ValidationMessage] = []
+
+        if scope is None:
+            validator = self.get_validator(target_class)
+            self._add_messages(messages, validator.iter_errors(data), [])
+        else:
+            for class_name, path, element in scope.subtrees(
+                self.index, data, target_class
+            ):
+                validator = self.get_validator(ClassDefinitionName(class_name))
+                self._add_messages(messages, validator.iter_errors(element), path)
 
-        messages = []
+        valid = len(messages) == 0
 
-        validator = jsonschema.Draft7Validator(json_schema)
-        errors = validator.iter_errors(data)
+        result = ValidationResult(
+            plugin_name=self.NAME, valid=valid, validation_messages=messages
+        )
+        return result
 
+    @staticmethod
+    def _add_messages(
+        messages: list[ValidationMessage],
+        errors: Iterable[jsonschema.ValidationError],
+        path: Iterable,
+    ) -> None:
+        """Add the messages for validation errors of the element at a path"""
         for error in errors:
             message = ValidationMessage(
                 message=error.message,
-                field=path_as_string(error.absolute_path),
+                field=path_as_string([*path, *error.absolute_path]),
                 value=error.instance,
             )
             messages.append(message)
             for err in error.context:
                 message = ValidationMessage(
                     message=err.message,
-                    field=path_as_string(err.absolute_path),
+                    field=path_as_string([*path, *err.absolute_path]),
                     value=err.instance,
                 )
                 messages.append(message)
 
-        valid = len(messages) == 0
+    def get_validator(self, target_class: ClassDefinitionName) -> JsonSchemaValidator:
+        """
+        Return the compiled JSON schema validator for the target class.
 
-        result = ValidationResult(
-            plugin_name=self.NAME, valid=valid, validation_messages=messages
+        Validators are memoized by schema identity and target class, the least
+        recently used validator is dropped once max_cached_validators is reached.
+        The memo is thread-safe, so the plugin can be shared between threads.
+        """
+        key = (
+            self.compiled_schema.fingerprint or id(self.compiled_schema),
+            str(target_class),
         )
-        return result
+        with self._lock:
+            if key in self._validators:
+                self._hits += 1
+                self._validators.move_to_end(key)
+                return self._validators[key][1]
+
+            self._misses += 1
+            json_schema = self.jsonschema_from_linkml(target_class)
+            validator = self._create_validator(json_schema)
+            self._validators[key] = (json_schema, validator)
+            if len(self._validators) > self._max_cached_validators:
+                self._validators.popitem(last=False)
+            return validator
+
+    def _create_validator(self, json_schema: dict) -> JsonSchemaValidator:
+        """Create the validator for a JSON schema using the configured engine"""
+        if self.engine == ENGINE_COMPILED:
+            try:
+                return CompiledJsonSchemaValidator(json_schema, self.code_cache_dir)
+            except UnsupportedSchemaError:
+                pass
+        return jsonschema.Draft7Validator(json_schema)
+
+    def cache_info(self) -> CacheInfo:
+        """Report statistics of the memoized JSON schema validators"""
+        with self._lock:
+            return CacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                maxsize=self._max_cached_validators,
+                currsize=len(self._validators),
+            )
 
     def jsonschema_from_linkml(self, target_class: ClassDefinitionName) -> dict:
         """Generates JSON schema from a LinkML schema"""
-        json_schema_as_string = JsonSchemaGenerator(
-            schema=self.schema.schema, top_class=target_class
-        ).serialize()
-        json_schema = json.loads(json_schema_as_string)
-        return json_schema
+        return self.compiled_schema.json_schema(target_class)
@@ -15,66 +15,400 @@
 
 """Plugin for validating the non inline references"""
 
+from array import array
 from collections import defaultdict
+from collections.abc import Hashable, Mapping, Set
+from itertools import islice
 from numbers import Number
-from typing import Union
+from typing import Optional, Union
 
+from ghga_validator.core.identifier_index import (
+    IdentifierIndex,
+    SqliteIdentifierIndex,
+)
+from ghga_validator.core.identifier_store import (
+    DEFAULT_LOOKUP_BATCH_SIZE,
+    IdentifierKey,
+    IdentifierStore,
+)
+from ghga_validator.core.identifier_table import (
+    IdentifierSet,
+    IdentifierTable,
+    PathArray,
+)
 from ghga_validator.core.models import ValidationMessage, ValidationResult
-from ghga_validator.my_linkml.object_iterator import ObjectIterator
-from ghga_validator.plugins.base_plugin import ValidationPlugin
-from ghga_validator.schema_utils import get_range_class
-from ghga_validator.utils import path_as_string
+from ghga_validator.core.scope import ValidationScope
+from ghga_validator.core.sharded_traversal import ShardSummary
+from ghga_validator.my_linkml.object_iterator import ObjectIterator, Projection
+from ghga_validator.my_linkml.schema_index import SchemaIndex
+from ghga_validator.plugins.base_plugin import (
+    ObjectVisitor,
+    TraversingValidationPlugin,
+)
+from ghga_validator.utils import ObjectPath, path_as_string
 
 
-# pylint: disable=too-many-locals
-class RefValidationPlugin(ValidationPlugin):
+class RefValidationVisitor(ObjectVisitor):
+    """
+    Collects the identifiers of all objects and the values of all non inlined
+    reference fields, the references are checked once all objects are known.
+    With a scope, only the references of the selected objects are checked, but
+    they are resolved against all objects.
+
+    Identifiers and references are recorded by their codes in an identifier
+    table, which may be shared with other visitors of the traversal. The
+    reference values are not kept, they are decoded from the table.
+
+    The summaries of a sharded traversal are not encoded, their identifiers
+    are merged into sets per class and their unresolved reference fields are
+    kept as they are, to be checked against these sets once all shards are
+    known.
+
+    With an identifier store, references that do not match any object of the
+    data are looked up in the store, so that they may point to objects of
+    accepted submissions.
+    """
+
+    SUPPORTS_SHARDS = True
+
+    def __init__(  # noqa: PLR0913
+        self,
+        index: SchemaIndex,
+        plugin_name: str,
+        scope: Optional[ValidationScope] = None,
+        identifiers: Optional[IdentifierTable] = None,
+        store: Optional[IdentifierStore] = None,
+    ):  # pylint: disable=too-many-arguments
+        self._index = index
+        self._plugin_name = plugin_name
+        self._in_scope = scope.element_filter() if scope else None
+        self._identifiers = (
+            identifiers if identifiers is not None else IdentifierTable()
+        )
+        self._known_ids = IdentifierSet()
+        # The field and path of each reference field and whether its value is
+        # a list, the codes of the referenced identifiers of field i are
+        # ref_codes[ref_offsets[i]:ref_offsets[i + 1]], with -1 for values that
+        # can not be identifiers. The values of such fields are kept as is.
+        self._ref_fields: list[str] = []
+        self._ref_paths = PathArray()
+        self._ref_is_list = bytearray()
+        self._unhashable_values: dict[int, Union[list, str, Number]] = {}
+        self._ref_offsets = array("q", [0])
+        self._ref_codes = array("q")
+        # The range class of each reference field, only needed for the store
+        self._store = store
+        self._ref_classes: list[str] = []
+        # The identifiers by class name and the shards with unresolved
+        # reference fields
+        self._shard_ids: dict[str, set] = {}
+        self._shards: list[ShardSummary] = []
+
+    def visit(
+        self,
+        class_name: str,
+        identifier: Optional[Union[str, Number]],
+        data: Mapping,
+        path: ObjectPath,
+    ) -> None:
+        """Record the identifier and the reference fields of an object"""
+        self._known_ids.add(self._identifiers.encode(class_name, identifier))
+        if self._in_scope is not None and not self._in_scope(class_name, path):
+            return
+        for field, value in data.items():
+            slot_def = self._index.slot(class_name, field)
+            if slot_def.range_class and not slot_def.is_inlined:
+                self._record_reference_field(slot_def.range_class, field, value, path)
+
+    def visit_shard(self, shard: ShardSummary) -> None:
+        """Record the identifiers and the unresolved reference fields of a shard"""
+        for class_name, class_ids in shard.identifiers.items():
+            known = self._shard_ids.get(class_name)
+            if known is None:
+                known = self._shard_ids[class_name] = set()
+            known.update(class_ids)
+        if shard.references:
+            self._shards.append(shard)
+
+    def _record_reference_field(
+        self,
+        range_class: str,
+        field: str,
+        value: Union[list, str, Number],
+        path: ObjectPath,
+    ) -> None:
+        """Record the codes of the identifiers referenced by a field"""
+        position = len(self._ref_fields)
+        self._ref_fields.append(field)
+        if self._store is not None:
+            self._ref_classes.append(range_class)
+        self._ref_paths.append(path)
+        self._ref_is_list.append(isinstance(value, list))
+        for ref in value if isinstance(value, list) else [value]:
+            try:
+                code = self._identifiers.encode(range_class, ref)
+            except TypeError:
+                code = -1
+                self._unhashable_values[position] = value
+            self._ref_codes.append(code)
+        self._ref_offsets.append(len(self._ref_codes))
+
+    def _value(self, position: int, codes: array) -> Union[list, Hashable]:
+        """Restore the value of a reference field from the codes"""
+        if position in self._unhashable_values:
+            return self._unhashable_values[position]
+        values = [self._identifiers.decode(code) for code in codes]
+        return values if self._ref_is_list[position] else values[0]
+
+    def _accepted_refs(self, unresolved: list[int]) -> dict[IdentifierKey, str]:
+        """
+        Look up the unknown references of the unresolved reference fields in
+        the identifier store
+        """
+        if self._store is None:
+            return {}
+        offsets = self._ref_offsets
+        return self._store.find(
+            (self._ref_classes[position], self._identifiers.decode(code))
+            for position in unresolved
+            for code in self._ref_codes[offsets[position] : offsets[position + 1]]
+            if code >= 0 and code not in self._known_ids
+        )
+
+    def finish(self) -> ValidationResult:
+        """Check that all references point to existing objects"""
+        messages = []
+        is_known = self._known_ids.__contains__
+        offsets = self._ref_offsets
+        unresolved = [
+            position
+            for position in range(len(self._ref_fields))
+            if not all(
+                map(
+                    is_known, self._ref_codes[offsets[position] : offsets[position + 1]]
+                )
+            )
+        ]
+        accepted = self._accepted_refs(unresolved)
+        for position in unresolved:
+            field = self._ref_fields[position]
+            codes = self._ref_codes[offsets[position] : offsets[position + 1]]
+            value = self._value(position, codes)
+            values = value if isinstance(value, list) else [value]
+            non_match = [
+                ref
+                for ref, code in zip(values, codes)
+                if code < 0
+                or not (
+                    is_known(code)
+                    or (accepted and (self._ref_classes[position], ref) in accepted)
+                )
+            ]
+            if not non_match:
+                continue
+            message = ValidationMessage(
+                message="Unknown reference(s) " + str(non_match),
+                field=f"{path_as_string(self._ref_paths[position])}.{field}",
+                value=value,
+            )
+            messages.append(message)
+        messages.extend(self._shard_messages())
+
+        valid = len(messages) == 0
+
+        return ValidationResult(
+            plugin_name=self._plugin_name, valid=valid, validation_messages=messages
+        )
+
+    def _shard_messages(self) -> list[ValidationMessage]:
+        """Check the unresolved reference fields of the shards"""
+        no_ids: set = set()
+        unresolved = []
+        for shard in self._shards:
+            for range_class, field, value, position in shard.references:
+                non_match = RefValidationPlugin.find_missing_refs(
+                    value, self._shard_ids.get(range_class, no_ids)
+                )
+                if non_match:
+                    unresolved.append(
+                        (range_class, field, value, shard.paths[position], non_match)
+                    )
+        accepted = (
+            self._store.find(
+                (range_class, ref)
+                for range_class, _, _, _, non_match in unresolved
+                for ref in non_match
+                if isinstance(ref, Hashable)
+            )
+            if self._store is not None and unresolved
+            else {}
+        )
+        messages = []
+        for range_class, field, value, path, non_match in unresolved:
+            if accepted:
+                non_match = [
+                    ref
+                    for ref in non_match
+                    if not isinstance(ref, Hashable)
+                    or (range_class, ref) not in accepted
+                ]
+                if not non_match:
+                    continue
+            messages.append(
+                ValidationMessage(
+                    message="Unknown reference(s) " + str(non_match),
+                    field=f"{path}.{field}",
+                    value=value,
+                )
+            )
+        return messages
+
+
+class SqliteRefValidationVisitor(ObjectVisitor):
+    """
+    Records the identifiers of all objects and the values of all non inlined
+    reference fields in a disk-backed identifier index and checks the
+    references once all objects are known, like the RefValidationVisitor.
+    """
+
+    SUPPORTS_SHARDS = True
+
+    def __init__(  # noqa: PLR0913
+        self,
+        index: SchemaIndex,
+        plugin_name: str,
+        identifiers: SqliteIdentifierIndex,
+        scope: Optional[ValidationScope] = None,
+        store: Optional[IdentifierStore] = None,
+    ):  # pylint: disable=too-many-arguments
+        self._index = index
+        self._plugin_name = plugin_name
+        self._in_scope = scope.element_filter() if scope else None
+        self._identifiers = identifiers
+        self._store = store
+
+    def visit(
+        self,
+        class_name: str,
+        identifier: Optional[Union[str, Number]],
+        data: Mapping,
+        path: ObjectPath,
+    ) -> None:
+        """Record the identifier and the reference fields of an object"""
+        self._identifiers.add_known_id(class_name, identifier)
+        if self._in_scope is not None and not self._in_scope(class_name, path):
+            return
+        for field, value in data.items():
+            slot_def = self._index.slot(class_name, field)
+            if slot_def.range_class and not slot_def.is_inlined:
+                self._identifiers.add_reference_field(
+                    slot_def.range_class, field, value, path_as_string(path)
+                )
+
+    def visit_shard(self, shard: ShardSummary) -> None:
+        """Record the identifiers and the unresolved reference fields of a shard"""
+        for class_name, class_ids in shard.identifiers.items():
+            for identifier in class_ids:
+                self._identifiers.add_known_id(class_name, identifier)
+        for range_class, field, value, position in shard.references:
+            self._identifiers.add_reference_field(
+                range_class, field, value, shard.paths[position]
+            )
+
+    def finish(self) -> ValidationResult:
+        """Check that all references point to existing objects"""
+        messages = []
+        missing = self._identifiers.missing_references()
+        # The missing references are looked up in the store in batches
+        while batch := list(islice(missing, DEFAULT_LOOKUP_BATCH_SIZE)):
+            accepted = (
+                self._store.find(
+                    (range_class, ref)
+                    for _, _, range_class, _, non_match in batch
+                    for ref in non_match
+                )
+                if self._store is not None
+                else {}
+            )
+            for path, field, range_class, value, non_match in batch:
+                if accepted:
+                    non_match = [
+                        ref
+                        for ref in non_match
+                        if not isinstance(ref, Hashable)
+                        or (range_class, ref) not in accepted
+                    ]
+                    if not non_match:
+                        continue
+                message = ValidationMessage(
+                    message="Unknown reference(s) " + str(non_match),
+                    field=f"{path}.{field}",
+                    value=value,
+                )
+                messages.append(message)
+        valid = len(messages) == 0
+
+        return ValidationResult(
+            plugin_name=self._plugin_name, valid=valid, validation_messages=messages
+        )
+
+
+class RefValidationPlugin(TraversingValidationPlugin):
     """
     Plugin to check whether the values in non inline reference fields point
     to existing objects.
     """
 
     NAME = "RefValidationPlugin"
+    PROJECTION = Projection.REFERENCES
 
-    def validate(self, data: dict, target_class: str) -> ValidationResult:
+    def visitor(
+        self,
+        target_class: str,
+        scope: Optional[ValidationScope] = None,
+        identifiers: Optional[IdentifierIndex] = None,
+        store: Optional[IdentifierStore] = None,
+    ) -> Union[RefValidationVisitor, SqliteRefValidationVisitor]:
         """
-        Perform validation on an object.
+        Create the visitor for a single traversal of the data.
 
         Args:
-            data: The object to validate
             target_class: class name for root class
+            scope: The objects whose references are checked, defaults to all
+            identifiers: The identifier table shared by the visitors of the
+                traversal, defaults to a table of its own, or a disk-backed
+                identifier index of the visitor
+            store: The identifiers of accepted submissions, if given
 
         Returns:
-            ValidationResult: A validation result that describes the outcome of validation
+            RefValidationVisitor: Visitor that checks the references once all
+            objects have been visited
 
         """
-        all_class_ids = self.get_all_class_ids(data, target_class)
-        messages = self.validate_refs(data, target_class, all_class_ids)
+        if isinstance(identifiers, SqliteIdentifierIndex):
+            return SqliteRefValidationVisitor(
+                self.index, self.NAME, identifiers, scope, store
+            )
+        return RefValidationVisitor(self.index, self.NAME, scope, identifiers, store)
 
-        valid = len(messages) == 0
-
-        result = ValidationResult(
-            plugin_name=self.NAME, valid=valid, validation_messages=messages
-        )
-        return result
-
-    def get_all_class_ids(self, obj: dict, target_class: str) -> dict[str, list[str]]:
-        """Get all lists of identifies of inlined objects organized by class name
+    def get_all_class_ids(self, obj: dict, target_class: str) -> dict[str, list]:
+        """
+        Get all identifiers of the objects organized by class name. The
+        Validator collects the identifiers in the visitor instead.
 
         Args:
-            obj (Dict): The object to be parsed
-            target_class (str): Target class
+            obj: The object to be parsed
+            target_class: Target class
 
         Returns:
-            Dict[class_name, List[str]]: The dictionary containing the lists of
+            Dict[class_name, List]: The dictionary containing the lists of
             identifiers by the class name
         """
-        all_ids = defaultdict(list)
-
+        all_ids: dict[str, list] = defaultdict(list)
         for class_name, identifier, _, _ in ObjectIterator(
-            self.schema, obj, target_class
+            self.index, obj, target_class, projection=Projection.IDENTIFIERS
         ):
             all_ids[class_name].append(identifier)
-
         return all_ids
 
     def validate_refs(
@@ -84,31 +418,35 @@ class RefValidationPlugin(ValidationPlugin):
         all_class_ids: dict,
     ) -> list[ValidationMessage]:
         """
-        Validate non inlined reference fields in the JSON data
+        Validate the non inlined reference fields against pre-computed
+        identifiers. The Validator checks the references with the visitor
+        instead, which collects the identifiers in the same traversal.
 
         Args:
             object_to_validate: input data
             target_class: parent class in the schema
-            all_class_ids: pre-computed dictionary containing all identifiers ordered by class
+            all_class_ids: pre-computed dictionary containing all identifiers
+                ordered by class
 
         Returns:
             List[ValidationMessage]: List of validation messages
-
         """
+        id_sets: dict[str, Set] = {}
         messages = []
-
         for class_name, _, data, path in ObjectIterator(
-            self.schema, object_to_validate, target_class
+            self.index, object_to_validate, target_class, projection=self.PROJECTION
         ):
             for field, value in data.items():
-                slot_def = self.schema.induced_slot(field, class_name)
-                range_class = get_range_class(self.schema, slot_def)
-                if range_class and not self.schema.is_inlined(slot_def):
-                    non_match = self.find_missing_refs(
-                        value, all_class_ids[range_class]
+                slot_def = self.index.slot(class_name, field)
+                range_class = slot_def.range_class
+                if not range_class or slot_def.is_inlined:
+                    continue
+                if range_class not in id_sets:
+                    id_sets[range_class] = _identifier_set(
+                        all_class_ids.get(range_class, [])
                     )
-                    if len(non_match) == 0:
-                        continue
+                non_match = self.find_missing_refs(value, id_sets[range_class])
+                if non_match:
                     message = ValidationMessage(
                         message="Unknown reference(s) " + str(non_match),
                         field=f"{path_as_string(path)}.{field}",
@@ -117,17 +455,41 @@ class RefValidationPlugin(ValidationPlugin):
                     messages.append(message)
         return messages
 
+    @staticmethod
     def find_missing_refs(
-        self,
         ref_value: Union[list[Union[Number, str]], Union[Number, str]],
-        id_list: list,
+        ids: Set,
     ) -> list:
         """
         Search for missing references
 
+        Args:
+            ref_value: A single reference or a list of references
+            ids: The identifiers of the objects of the referenced class
+
         Returns:
             List: List of missing references
         """
-        if not isinstance(ref_value, list):
-            return [ref_value] if ref_value not in id_list else []
-        return [x for x in ref_value if x not in id_list]
+        values = ref_value if isinstance(ref_value, list) else [ref_value]
+        try:
+            # All references of a multivalued field are looked up at once in
+            # the common case that none of them is missing
+            if all(map(ids.__contains__, values)):
+                return []
+            return [x for x in values if x not in ids]
+        except TypeError:
+            # Unhashable values can not be identifiers
+            return [x for x in values if not _is_known(x, ids)]
+
+
+def _identifier_set(ids: list) -> Set:
+    """Return the hashable identifiers of a list as set"""
+    return {identifier for identifier in ids if isinstance(identifier, Hashable)}
+
+
+def _is_known(value, ids: Set) -> bool:
+    """Return whether a value is among the identifiers, False if unhashable"""
+    try:
+        return value in ids
+    except TypeError:
+        return False
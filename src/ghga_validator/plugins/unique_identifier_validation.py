@@ -15,39 +15,358 @@
 
 """Plugin for validating the identifier uniqueness"""
 
+from collections.abc import Hashable, Mapping
+from numbers import Number
+from operator import itemgetter
+from typing import Optional, Union
+
+from ghga_validator.core.identifier_index import (
+    IdentifierIndex,
+    SqliteIdentifierIndex,
+)
+from ghga_validator.core.identifier_store import (
+    DEFAULT_LOOKUP_BATCH_SIZE,
+    IdentifierStore,
+)
+from ghga_validator.core.identifier_table import (
+    IdentifierSet,
+    IdentifierTable,
+    PathArray,
+)
 from ghga_validator.core.models import ValidationMessage, ValidationResult
-from ghga_validator.my_linkml.object_iterator import ObjectIterator
-from ghga_validator.plugins.base_plugin import ValidationPlugin
-from ghga_validator.utils import path_as_string
+from ghga_validator.core.scope import ValidationScope
+from ghga_validator.core.sharded_traversal import ShardSummary
+from ghga_validator.my_linkml.object_iterator import Projection
+from ghga_validator.my_linkml.schema_index import SchemaIndex
+from ghga_validator.plugins.base_plugin import (
+    ObjectVisitor,
+    TraversingValidationPlugin,
+)
+from ghga_validator.utils import ObjectPath, path_as_string
+
+
+class _AcceptedIdentifierCheck:
+    """
+    Looks up the identifiers of objects in the identifier store of accepted
+    submissions in batches, and reports the objects whose identifier is
+    already used by an accepted submission.
+    """
+
+    def __init__(self, index: SchemaIndex, store: IdentifierStore):
+        self._index = index
+        self._store = store
+        self._pending: list[tuple[str, Hashable, str]] = []
+        self.messages: list[ValidationMessage] = []
+
+    def add(
+        self, class_name: str, identifier: Optional[Union[str, Number]], path: str
+    ) -> None:
+        """Queue the identifier of an object, a full batch is looked up at once"""
+        if identifier is None or not isinstance(identifier, Hashable):
+            return
+        self._pending.append((class_name, identifier, path))
+        if len(self._pending) >= DEFAULT_LOOKUP_BATCH_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        """Look up all queued identifiers"""
+        found = self._store.find(
+            (class_name, identifier) for class_name, identifier, _ in self._pending
+        )
+        for class_name, identifier, path in self._pending:
+            submission = found.get((class_name, identifier))
+            if submission is not None:
+                id_slot_name = self._index.identifier_slot(class_name) or "UNKNOWN"
+                message = ValidationMessage(
+                    message="Duplicate value for identifier, same value used by"
+                    + f" accepted submission {submission}.",
+                    field=f"{path}.{id_slot_name}",
+                    value=identifier,
+                )
+                self.messages.append(message)
+        self._pending.clear()
+
 
+class UniqueIdentifierValidationVisitor(ObjectVisitor):
+    """Reports objects whose identifier was already used by another object
+    of the same class. With a scope, only duplicates that involve a selected
+    object are reported. With an identifier store, the selected objects whose
+    identifier is used by an accepted submission are reported as well.
 
-class UniqueIdentifierValidationPlugin(ValidationPlugin):
+    The summaries of a sharded traversal are not encoded, the objects of the
+    shards are numbered in traversal order and the first object of each
+    identifier is kept by class name, so that the identifiers of a shard are
+    merged with dict operations.
+    """
+
+    SUPPORTS_SHARDS = True
+
+    def __init__(  # noqa: PLR0913
+        self,
+        index: SchemaIndex,
+        plugin_name: str,
+        scope: Optional[ValidationScope] = None,
+        identifiers: Optional[IdentifierTable] = None,
+        store: Optional[IdentifierStore] = None,
+    ):  # pylint: disable=too-many-arguments
+        self._index = index
+        self._plugin_name = plugin_name
+        self._in_scope = scope.element_filter() if scope else None
+        self._identifiers = (
+            identifiers if identifiers is not None else IdentifierTable()
+        )
+        self._seen_ids = IdentifierSet()
+        self._selected_ids = IdentifierSet()
+        # The path of the first object with an identifier, by identifier code
+        self._first_paths = PathArray()
+        # The number of the first object of each identifier of the shards by
+        # class name, and the path and selection of the objects by number
+        self._shard_firsts: dict[str, dict[Optional[Union[str, Number]], int]] = {}
+        self._shard_paths: list[str] = []
+        self._shard_selected = bytearray()
+        self._messages: list[ValidationMessage] = []
+        self._accepted = (
+            _AcceptedIdentifierCheck(index, store) if store is not None else None
+        )
+
+    def visit(
+        self,
+        class_name: str,
+        identifier: Optional[Union[str, Number]],
+        data: Mapping,
+        path: ObjectPath,
+    ) -> None:
+        """Check the identifier of an object against all previous ones"""
+        selected = self._in_scope is None or self._in_scope(class_name, path)
+        if selected and self._accepted is not None:
+            self._accepted.add(class_name, identifier, path_as_string(path))
+        code = self._identifiers.encode(class_name, identifier)
+        if not self._seen_ids.add(code):
+            if not selected and code not in self._selected_ids:
+                return
+            self._messages.append(
+                self._duplicate(
+                    class_name,
+                    identifier,
+                    path_as_string(path),
+                    path_as_string(self._first_paths[code]),
+                )
+            )
+        else:
+            self._first_paths[code] = path
+            if selected and self._in_scope is not None:
+                self._selected_ids.add(code)
+
+    def visit_shard(self, shard: ShardSummary) -> None:
+        """Check the identifiers of a shard against all previous ones"""
+        offset = len(self._shard_paths)
+        self._shard_paths.extend(shard.paths)
+        if shard.selected is not None:
+            self._shard_selected.extend(shard.selected)
+        messages = self._shard_duplicates(shard, offset)
+        messages.sort(key=itemgetter(0))
+        self._messages.extend(message for _, message in messages)
+        if self._accepted is not None:
+            for position, class_name, identifier in shard.elements():
+                if shard.is_selected(position):
+                    self._accepted.add(class_name, identifier, shard.paths[position])
+
+    def _shard_duplicates(
+        self, shard: ShardSummary, offset: int
+    ) -> list[tuple[int, ValidationMessage]]:
+        """
+        Record the identifiers of a shard whose objects are numbered from
+        offset on and return the messages about the duplicates by number
+        """
+        duplicates = list(shard.duplicates)
+        for class_name, class_ids in shard.identifiers.items():
+            firsts = self._shard_firsts.get(class_name)
+            if firsts is None:
+                firsts = self._shard_firsts[class_name] = {}
+            if not class_ids.keys().isdisjoint(firsts.keys()):
+                duplicates.extend(
+                    (position, class_name, identifier)
+                    for identifier, position in class_ids.items()
+                    if identifier in firsts
+                )
+                class_ids = {
+                    identifier: position
+                    for identifier, position in class_ids.items()
+                    if identifier not in firsts
+                }
+            firsts.update(
+                {
+                    identifier: position + offset
+                    for identifier, position in class_ids.items()
+                }
+            )
+        messages: list[tuple[int, ValidationMessage]] = []
+        for position, class_name, identifier in duplicates:
+            first = self._shard_firsts[class_name][identifier]
+            if self._is_shard_selected(position + offset) or self._is_shard_selected(
+                first
+            ):
+                messages.append(
+                    (
+                        position + offset,
+                        self._duplicate(
+                            class_name,
+                            identifier,
+                            self._shard_paths[position + offset],
+                            self._shard_paths[first],
+                        ),
+                    )
+                )
+        return messages
+
+    def _is_shard_selected(self, number: int) -> bool:
+        """Return whether an object of the shards is selected by the scope"""
+        return self._in_scope is None or bool(self._shard_selected[number])
+
+    def _duplicate(
+        self,
+        class_name: str,
+        identifier: Optional[Union[str, Number]],
+        path: str,
+        previous_path: str,
+    ) -> ValidationMessage:
+        """Create the message for an object whose identifier was used before"""
+        id_slot_name = self._index.identifier_slot(class_name) or "UNKNOWN"
+        return ValidationMessage(
+            message="Duplicate value for identifier, same value used at "
+            + f"{previous_path}.{id_slot_name}.",
+            field=f"{path}.{id_slot_name}",
+            value=identifier,
+        )
+
+    def finish(self) -> ValidationResult:
+        """Return the duplicate identifiers found"""
+        messages = self._messages
+        if self._accepted is not None:
+            self._accepted.flush()
+            messages = messages + self._accepted.messages
+        valid = len(messages) == 0
+
+        return ValidationResult(
+            plugin_name=self._plugin_name,
+            valid=valid,
+            validation_messages=messages,
+        )
+
+
+class SqliteUniqueIdentifierValidationVisitor(ObjectVisitor):
+    """Records the identifiers of all objects in a disk-backed identifier
+    index and reports the objects whose identifier was already used by
+    another object of the same class, like the
+    UniqueIdentifierValidationVisitor.
+    """
+
+    SUPPORTS_SHARDS = True
+
+    def __init__(  # noqa: PLR0913
+        self,
+        index: SchemaIndex,
+        plugin_name: str,
+        identifiers: SqliteIdentifierIndex,
+        scope: Optional[ValidationScope] = None,
+        store: Optional[IdentifierStore] = None,
+    ):  # pylint: disable=too-many-arguments
+        self._index = index
+        self._plugin_name = plugin_name
+        self._in_scope = scope.element_filter() if scope else None
+        self._identifiers = identifiers
+        self._accepted = (
+            _AcceptedIdentifierCheck(index, store) if store is not None else None
+        )
+
+    def visit(
+        self,
+        class_name: str,
+        identifier: Optional[Union[str, Number]],
+        data: Mapping,
+        path: ObjectPath,
+    ) -> None:
+        """Record the identifier of an object"""
+        selected = self._in_scope is None or self._in_scope(class_name, path)
+        path_string = path_as_string(path)
+        self._identifiers.add_object(class_name, identifier, path_string, selected)
+        if selected and self._accepted is not None:
+            self._accepted.add(class_name, identifier, path_string)
+
+    def visit_shard(self, shard: ShardSummary) -> None:
+        """Record the identifiers of the objects of a shard"""
+        for position, class_name, identifier in shard.elements():
+            path = shard.paths[position]
+            selected = shard.is_selected(position)
+            self._identifiers.add_object(class_name, identifier, path, selected)
+            if selected and self._accepted is not None:
+                self._accepted.add(class_name, identifier, path)
+
+    def finish(self) -> ValidationResult:
+        """Return the duplicate identifiers found in the index"""
+        messages = []
+        for class_name, identifier, path, first_path in self._identifiers.duplicates():
+            id_slot_name = self._index.identifier_slot(class_name) or "UNKNOWN"
+            message = ValidationMessage(
+                message="Duplicate value for identifier, same value used at "
+                + f"{first_path}.{id_slot_name}.",
+                field=f"{path}.{id_slot_name}",
+                value=identifier,
+            )
+            messages.append(message)
+        if self._accepted is not None:
+            self._accepted.flush()
+            messages.extend(self._accepted.messages)
+        valid = len(messages) == 0
+
+        return ValidationResult(
+            plugin_name=self._plugin_name,
+            valid=valid,
+            validation_messages=messages,
+        )
+
+
+class UniqueIdentifierValidationPlugin(TraversingValidationPlugin):
     """
     Plugin to check whether the fields defined as identifier/unique key
     are unique for a class.
     """
 
     NAME = "UniqueIdentifierValidationPlugin"
+    PROJECTION = Projection.IDENTIFIERS
 
-    def validate(self, data: dict, target_class: str) -> ValidationResult:
+    def visitor(
+        self,
+        target_class: str,
+        scope: Optional[ValidationScope] = None,
+        identifiers: Optional[IdentifierIndex] = None,
+        store: Optional[IdentifierStore] = None,
+    ) -> Union[
+        UniqueIdentifierValidationVisitor, SqliteUniqueIdentifierValidationVisitor
+    ]:
         """
-        Perform validation on an object.
+        Create the visitor for a single traversal of the data.
 
         Args:
-            data: The JSON object to validate
             target_class: class name for root class
+            scope: The objects whose identifiers are checked, defaults to all
+            identifiers: The identifier table shared by the visitors of the
+                traversal, defaults to a table of its own, or a disk-backed
+                identifier index of the visitor
+            store: The identifiers of accepted submissions, if given
 
         Returns:
-            ValidationResult: A validation result that describes the outcome of validation
+            UniqueIdentifierValidationVisitor: Visitor that checks the
+            identifiers of all visited objects
 
         """
-        messages = self.validate_unique_fields(data, target_class)
-        valid = len(messages) == 0
-
-        result = ValidationResult(
-            plugin_name=self.NAME, valid=valid, validation_messages=messages
+        if isinstance(identifiers, SqliteIdentifierIndex):
+            return SqliteUniqueIdentifierValidationVisitor(
+                self.index, self.NAME, identifiers, scope, store
+            )
+        return UniqueIdentifierValidationVisitor(
+            self.index, self.NAME, scope, identifiers, store
         )
-        return result
 
     def validate_unique_fields(
         self,
@@ -55,33 +374,14 @@ class UniqueIdentifierValidationPlugin(ValidationPlugin):
         target_class: str,
     ) -> list[ValidationMessage]:
         """
-        Validate non inlined reference fields in a JSON object
+        Validate the uniqueness of the identifiers in a JSON object, with a
+        traversal for this plugin only
 
         Args:
             object_to_validate: input JSON object
             target_class: parent class in the schema
 
         Returns:
-            SlotDefinition: class definition
-
+            List[ValidationMessage]: List of validation messages
         """
-        messages = []
-
-        seen_ids: dict[tuple, list] = {}
-        for class_name, identifier, data, path in ObjectIterator(
-            self.schema, object_to_validate, target_class
-        ):
-            id_slot = self.schema.get_identifier_slot(class_name)
-            id_slot_name = id_slot.name if id_slot is not None else "UNKNOWN"
-            if (class_name, identifier) in seen_ids:
-                previous_path = seen_ids[class_name, identifier]
-                message = ValidationMessage(
-                    message="Duplicate value for identifier, "
-                    + f"same value used at {path_as_string(previous_path)}.",
-                    field=f"{path_as_string(path)}.{id_slot_name}",
-                    value=data[id_slot_name],
-                )
-                messages.append(message)
-            else:
-                seen_ids[class_name, identifier] = [*path, id_slot_name]
-        return messages
+        return self.validate(object_to_validate, target_class).validation_messages
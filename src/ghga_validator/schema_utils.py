@@ -16,11 +16,13 @@
 
 """Utils for LinkML schema"""
 
-from typing import Optional
+from pathlib import Path
+from typing import Optional, Union
 
-from linkml.utils.datautils import infer_root_class
 from linkml_runtime.utils.schemaview import SchemaView, SlotDefinition
 
+from ghga_validator.core.compiled_schema import CompiledSchema, as_compiled_schema
+
 
 def get_range_class(schema_view, slot_def: SlotDefinition) -> Optional[str]:
     """Return the range class for a slot
@@ -34,15 +36,21 @@ def get_range_class(schema_view, slot_def: SlotDefinition) -> Optional[str]:
     return slot_def.range if slot_def.range in schema_view.all_classes() else None
 
 
-def get_target_class(schema: str) -> Optional[str]:
+def get_target_class(
+    schema: Union[str, Path, SchemaView, CompiledSchema],
+) -> Optional[str]:
     """
     Infer the root class from schema
     Args:
-        schema (str): YAML schema as the string
+        schema: Path to the YAML schema, a SchemaView or a compiled schema
 
     Returns:
         class name for root class, if found in the scheme
     """
-    with open(schema, encoding="utf8") as file:
-        input_schema = file.read()
-        return infer_root_class(SchemaView(input_schema))
+    compiled_schema = as_compiled_schema(schema)
+    if compiled_schema.index.tree_roots:
+        return compiled_schema.index.tree_roots[0]
+    # pylint: disable=import-outside-toplevel
+    from linkml.utils.datautils import infer_root_class
+
+    return infer_root_class(compiled_schema.schema_view)
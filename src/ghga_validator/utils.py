@@ -16,11 +16,93 @@
 
 """Utils"""
 
+from collections.abc import Iterable, Iterator, Sequence
+from typing import NamedTuple, Optional, Union
 
-def path_as_string(error_path: list) -> str:
+
+class CacheInfo(NamedTuple):
+    """Statistics of a cache, modelled after functools.lru_cache"""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class ObjectPath(Sequence):
+    """Immutable path to an element in JSON data. A path is a linked node
+    that refers to the path of its parent element, so that the paths of all
+    elements below a parent share the parent path instead of copying it.
+    """
+
+    __slots__ = ("parent", "key", "_length")
+
+    parent: Optional["ObjectPath"]
+    key: Union[str, int]
+    _length: int
+
+    def __init__(
+        self,
+        parent: Optional["ObjectPath"] = None,
+        key: Union[str, int] = "",
+    ):
+        """Creates the root path or, given a parent and a key, a child path."""
+        self.parent = parent
+        self.key = key
+        self._length = 0 if parent is None else parent._length + 1
+
+    @classmethod
+    def from_keys(cls, keys: Iterable[Union[str, int]]) -> "ObjectPath":
+        """Creates a path from the keys of the elements along the path."""
+        path = cls()
+        for key in keys:
+            path = ObjectPath(path, key)
+        return path
+
+    def child(self, *keys: Union[str, int]) -> "ObjectPath":
+        """Returns the path of an element below this one."""
+        path = self
+        for key in keys:
+            path = ObjectPath(path, key)
+        return path
+
+    def __iter__(self) -> Iterator[Union[str, int]]:
+        """Iterates over the keys from the root to this element."""
+        keys: list[Union[str, int]] = []
+        path = self
+        while path.parent is not None:
+            keys.append(path.key)
+            path = path.parent
+        return reversed(keys)
+
+    def __len__(self) -> int:
+        """Returns the number of keys of the path."""
+        return self._length
+
+    def __getitem__(self, index):
+        """Returns a key or a list of keys of the path."""
+        keys = list(self)
+        return keys[index]
+
+    def __eq__(self, other) -> bool:
+        """Compares the keys of the path with another path, list or tuple."""
+        if not isinstance(other, (ObjectPath, list, tuple)):
+            return NotImplemented
+        return len(self) == len(other) and list(self) == list(other)
+
+    def __hash__(self) -> int:
+        """Hashes the keys of the path."""
+        return hash(tuple(self))
+
+    def __repr__(self) -> str:
+        """Represents the path by its keys."""
+        return f"ObjectPath({list(self)!r})"
+
+
+def path_as_string(error_path: Iterable) -> str:
     """Convert the path to the error in JSON to string format
     Args:
-        error_path (List): path to the error in JSON
+        error_path (Iterable): path to the error in JSON
     Returns:
         str: string representation of the error path
     """
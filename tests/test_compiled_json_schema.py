@@ -0,0 +1,207 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Differential tests of the compiled JSON schema validator against Draft7Validator"""
+
+import copy
+import json
+
+import pytest
+import yaml
+from jsonschema import Draft7Validator
+
+from ghga_validator.core.compiled_schema import CompiledSchema
+from ghga_validator.core.jsonschema_compiler import (
+    CompiledJsonSchemaValidator,
+    _CodeGenerator,
+)
+from ghga_validator.plugins.jsonschema_validation import (
+    GHGAJsonSchemaValidationPlugin,
+)
+
+from .fixtures.utils import BASE_DIR
+
+SCHEMAS = sorted((BASE_DIR / "schemas").glob("*.yaml"))
+
+KEYWORD_SCHEMA = {
+    "$defs": {
+        "Item": {
+            "type": "object",
+            "properties": {
+                "id": {"type": "string", "pattern": "^ID:[0-9]+$"},
+                "kind": {"enum": ["a", "b", 1]},
+                "size": {"type": ["integer", "null"], "minimum": 0},
+            },
+            "required": ["id"],
+            "additionalProperties": False,
+        }
+    },
+    "type": "object",
+    "properties": {
+        "items": {"type": "array", "items": {"$ref": "#/$defs/Item"}, "minItems": 1},
+        "choice": {"anyOf": [{"type": "string"}, {"$ref": "#/$defs/Item"}]},
+        "single": {"oneOf": [{"type": "number"}, {"type": "integer"}]},
+        "both": {"allOf": [{"minLength": 2}, {"maxLength": 3}]},
+        "never": {"not": {"type": "string"}},
+        "fixed": {"const": "x", "format": "email"},
+        "mapping": {"additionalProperties": {"type": "boolean"}},
+        "patterned": {"patternProperties": {"^x": {"type": "number"}}},
+        "nothing": False,
+        "tuple": {"items": [{"type": "string"}, True, False]},
+    },
+    "additionalProperties": {"type": "string"},
+}
+
+KEYWORD_INSTANCES = [
+    {},
+    {"items": []},
+    {"items": [{"id": "ID:1", "kind": "a", "size": 3}]},
+    {"items": [{"id": "X", "kind": 2, "size": -1.5, "extra": 1}, {}], "other": 1},
+    {"items": "none", "choice": 3, "single": 1, "both": "a", "never": "s"},
+    {"choice": {"id": 1}, "single": 1.5, "both": "abcd", "never": 1, "fixed": "y"},
+    {"mapping": {"a": True, "b": "no"}, "patterned": {"x1": "1", "y": 2}},
+    {"nothing": None, "tuple": ["a", 1, 2, 3], "items": [{"id": "ID:2"}] * 2},
+    {"items": [{"id": "ID:1", "kind": True, "size": 2.0}]},
+    [],
+    "string",
+]
+
+
+def _summary(errors) -> list:
+    """Return the parts of the errors the validation messages are made of"""
+    return [
+        (
+            error.message,
+            list(error.absolute_path),
+            repr(error.instance),
+            _summary(error.context),
+        )
+        for error in errors
+    ]
+
+
+def _object_paths(node, path=()):
+    """Yield the paths of all objects in the data"""
+    if isinstance(node, dict):
+        yield path
+        for key, value in node.items():
+            yield from _object_paths(value, (*path, key))
+    elif isinstance(node, list):
+        for index, value in enumerate(node):
+            yield from _object_paths(value, (*path, index))
+
+
+def _mutate(node: dict, change: int):
+    """Apply one of several changes to an object"""
+    keys = list(node)
+    if change == 0 or not keys:
+        node["unexpected"] = "value"
+    elif change == 1:
+        del node[keys[0]]
+    elif change == 2:
+        node[keys[-1]] = 12
+    else:
+        node[keys[-1]] = None if isinstance(node[keys[-1]], list) else [1]
+
+
+def _mutations(data):
+    """Yield the data and variants of it with a single change at an object"""
+    yield data
+    for path in list(_object_paths(data)):
+        for change in range(4):
+            variant = copy.deepcopy(data)
+            node = variant
+            for key in path:
+                node = node[key]
+            _mutate(node, change)
+            yield variant
+
+
+def _fixture_data():
+    """Load all fixture data files"""
+    data = []
+    for data_file in sorted((BASE_DIR / "data").glob("*.json")):
+        with open(data_file, encoding="utf8") as json_file:
+            content = yaml.safe_load(json_file)
+        if content is not None:
+            data.append(content)
+    return data
+
+
+@pytest.mark.parametrize("schema", SCHEMAS, ids=lambda path: path.name)
+def test_compiled_validator_fixtures(schema):
+    """Test that the errors for the fixtures are the same as with Draft7Validator"""
+    compiled_schema = CompiledSchema.from_file(schema)
+    instances = [variant for data in _fixture_data() for variant in _mutations(data)]
+    for class_name, class_def in compiled_schema.schema_view.all_classes().items():
+        if class_def.abstract or class_def.mixin:
+            continue
+        json_schema = compiled_schema.json_schema(class_name)
+        expected = Draft7Validator(json_schema)
+        compiled = CompiledJsonSchemaValidator(json_schema)
+        for instance in instances:
+            assert _summary(compiled.iter_errors(instance)) == _summary(
+                expected.iter_errors(instance)
+            )
+            assert compiled.is_valid(instance) is expected.is_valid(instance)
+
+
+def test_compiled_validator_keywords():
+    """Test keywords that the fixture schemas do not use"""
+    expected = Draft7Validator(KEYWORD_SCHEMA)
+    compiled = CompiledJsonSchemaValidator(KEYWORD_SCHEMA)
+    for instance in KEYWORD_INSTANCES:
+        assert _summary(compiled.iter_errors(instance)) == _summary(
+            expected.iter_errors(instance)
+        )
+
+
+def test_compiled_validator_cache(tmp_path, monkeypatch):
+    """Test that the generated code is loaded from the cache directory"""
+    CompiledJsonSchemaValidator(KEYWORD_SCHEMA, cache_dir=tmp_path)
+    assert len(list(tmp_path.iterdir())) == 1
+
+    def generate(self):
+        raise AssertionError("The code must be loaded from the cache")
+
+    monkeypatch.setattr(_CodeGenerator, "generate", generate)
+    compiled = CompiledJsonSchemaValidator(
+        json.loads(json.dumps(KEYWORD_SCHEMA)), cache_dir=tmp_path
+    )
+    expected = Draft7Validator(KEYWORD_SCHEMA)
+    for instance in KEYWORD_INSTANCES:
+        assert _summary(compiled.iter_errors(instance)) == _summary(
+            expected.iter_errors(instance)
+        )
+
+
+def test_plugin_engine(tmp_path):
+    """Test that the plugin reports the same messages with both engines"""
+    schema = BASE_DIR / "schemas" / "advance_model.yaml"
+    compiled_schema = CompiledSchema.from_file(schema)
+    draft7_plugin = GHGAJsonSchemaValidationPlugin(compiled_schema)
+    compiled_plugin = GHGAJsonSchemaValidationPlugin(
+        compiled_schema, engine="compiled", code_cache_dir=tmp_path
+    )
+    assert isinstance(
+        compiled_plugin.get_validator("Submission"), CompiledJsonSchemaValidator
+    )
+    for data in _fixture_data():
+        assert compiled_plugin.validate(data, "Submission") == draft7_plugin.validate(
+            data, "Submission"
+        )
+
+    with pytest.raises(ValueError):
+        GHGAJsonSchemaValidationPlugin(compiled_schema, engine="unknown")
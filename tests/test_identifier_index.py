@@ -0,0 +1,152 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test the validation with a disk-backed identifier index"""
+
+import json
+import tempfile
+
+import pytest
+
+from ghga_validator.cli import (
+    VALIDATION_PLUGINS,
+    load_plugins,
+    load_schema,
+    validate_json_file,
+)
+from ghga_validator.core.identifier_index import SqliteIdentifierIndex
+from ghga_validator.core.identifier_table import BloomFilter
+from ghga_validator.core.validator import Validator
+
+from .fixtures.utils import BASE_DIR
+
+
+@pytest.mark.parametrize(
+    "data_file,scope",
+    [
+        ("example_data.json", {}),
+        ("example_data_wrong_ref.json", {}),
+        ("example_data_wrong_ref.json", {"only_class": "Dataset"}),
+        ("example_data_not_unique_id.json", {}),
+        ("example_data_not_unique_id.json", {"only_path": "files.2"}),
+        ("example_data_not_unique_id.json", {"only_path": "files.1"}),
+    ],
+)
+def test_disk_index(data_file, scope, tmp_path, monkeypatch):
+    """
+    Test that the disk index reports the same as the in-memory table, with
+    and without prefilter
+    """
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    compiled_schema = load_schema(BASE_DIR / "schemas" / "advance_model.yaml")
+    with open(BASE_DIR / "data" / data_file, encoding="utf-8") as json_file:
+        data = json.load(json_file)
+
+    reports = [
+        Validator(
+            schema=compiled_schema,
+            plugins=load_plugins(VALIDATION_PLUGINS, compiled_schema),
+            disk_index=disk_index,
+            prefilter=prefilter,
+        ).validate(data, "Submission", **scope)
+        for disk_index, prefilter in [(False, False), (True, False), (True, True)]
+    ]
+    assert reports[0] == reports[1] == reports[2]
+    # The databases are removed after the validation
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.parametrize("capacity", [2, 65536])
+def test_prefilter_duplicates(capacity, tmp_path, monkeypatch):
+    """Test that the prefilter finds the same duplicates as the exact query"""
+    monkeypatch.setattr(BloomFilter.__init__, "__defaults__", (capacity,))
+    objects = [
+        ("File", "file_1", "files.0", True),
+        ("File", 1, "files.1", False),
+        ("Sample", "file_1", "samples.0", True),
+        ("File", None, "files.2", True),
+        ("File", 1.0, "files.3", True),
+        ("File", "file_1", "files.4", False),
+        ("File", None, "files.5", False),
+        ("File", "1", "files.6", True),
+    ]
+    duplicates = []
+    for prefilter in (False, True):
+        index = SqliteIdentifierIndex(tmp_path, prefilter=prefilter)
+        for class_name, identifier, path, selected in objects:
+            index.add_object(class_name, identifier, path, selected)
+        duplicates.append(list(index.duplicates()))
+        index.close()
+    assert (
+        duplicates[0]
+        == duplicates[1]
+        == [
+            ("File", 1.0, "files.3", "files.1"),
+            ("File", "file_1", "files.4", "files.0"),
+            ("File", None, "files.5", "files.2"),
+        ]
+    )
+
+
+def test_disk_index_threshold(tmp_path, monkeypatch, capsys):
+    """
+    Test that the disk index is used for files above the threshold, the
+    prefilter only applies to the disk index and is otherwise not used with
+    a warning
+    """
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path / "index"))
+    (tmp_path / "index").mkdir()
+    schema = BASE_DIR / "schemas" / "advance_model.yaml"
+    file = BASE_DIR / "data" / "example_data_not_unique_id.json"
+
+    closed: list[SqliteIdentifierIndex] = []
+    close = SqliteIdentifierIndex.close
+    monkeypatch.setattr(
+        SqliteIdentifierIndex,
+        "close",
+        lambda disk_index: closed.append(disk_index) or close(disk_index),
+    )
+
+    results = {}
+    for threshold, disk_indexes in [(0, 2), (file.stat().st_size, 0)]:
+        closed.clear()
+        report = tmp_path / f"report_{threshold}.json"
+        assert not validate_json_file(
+            file,
+            schema,
+            report,
+            "Submission",
+            disk_index_threshold=threshold,
+            prefilter=True,
+        )
+        assert len(closed) == disk_indexes
+        assert ("the prefilter is not used" in capsys.readouterr().err) == (
+            disk_indexes == 0
+        )
+        with open(report, encoding="utf-8") as report_file:
+            results[threshold] = json.load(report_file)
+    assert results[0] == results[file.stat().st_size]
+    assert not list((tmp_path / "index").iterdir())
+
+
+def test_prefilter_requires_disk_index():
+    """Test that a prefilter without disk index is rejected"""
+    compiled_schema = load_schema(BASE_DIR / "schemas" / "advance_model.yaml")
+    with pytest.raises(ValueError):
+        Validator(
+            schema=compiled_schema,
+            plugins=load_plugins(VALIDATION_PLUGINS, compiled_schema),
+            prefilter=True,
+        )
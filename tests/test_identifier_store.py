@@ -0,0 +1,233 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test the validation against the identifiers of accepted submissions"""
+
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from ghga_validator.cli import VALIDATION_PLUGINS, cli, load_plugins, load_schema
+from ghga_validator.core.identifier_store import (
+    IdentifierStore,
+    submission_identifiers,
+)
+from ghga_validator.core.validator import Validator
+
+from .fixtures.utils import BASE_DIR
+
+SCHEMA = BASE_DIR / "schemas" / "advance_model.yaml"
+
+
+def split_submission() -> tuple[dict, dict]:
+    """
+    Split the example data into an accepted submission with the first sample
+    and its files, and a new submission that references them.
+    """
+    with open(BASE_DIR / "data" / "example_data.json", encoding="utf-8") as file:
+        data = json.load(file)
+    accepted = {"files": data["files"][:2], "samples": data["samples"][:1]}
+    new = {
+        "datasets": data["datasets"],
+        "experiments": data["experiments"],
+        "files": data["files"][2:],
+        "samples": data["samples"][1:],
+    }
+    return accepted, new
+
+
+def test_identifier_store(tmp_path):
+    """Test registering and looking up identifiers"""
+    path = tmp_path / "identifiers.sqlite"
+    store = IdentifierStore(path, batch_size=2)
+    assert store.register("SUB_1", [("File", "file_1"), ("File", 1)]) == 2
+    assert store.register("SUB_2", [("File", "file_2"), ("Sample", "file_1")]) == 2
+
+    # Identifiers of another submission or given twice are rejected
+    with pytest.raises(ValueError):
+        store.register("SUB_3", [("File", "file_3"), ("File", "file_1")])
+    with pytest.raises(ValueError):
+        store.register("SUB_3", [("File", "file_3"), ("File", "file_3")])
+    with pytest.raises(ValueError):
+        store.register("SUB_3", [("File", ["file_3"])])
+    store.close()
+
+    # The store persists, the lookups are batched per class
+    store = IdentifierStore(path, batch_size=2)
+    keys = [
+        ("File", "file_1"),
+        ("File", 1.0),
+        ("File", "1"),
+        ("File", "file_2"),
+        ("File", "file_3"),
+        ("Sample", "file_1"),
+        ("Sample", None),
+        ("Sample", ["file_1"]),
+    ]
+    assert store.find(keys) == {
+        ("File", "file_1"): "SUB_1",
+        ("File", 1): "SUB_1",
+        ("File", "file_2"): "SUB_2",
+        ("Sample", "file_1"): "SUB_2",
+    }
+
+    # A submission is registered again with its current identifiers
+    assert store.register("SUB_2", [("File", "file_2"), ("File", "file_3")]) == 2
+    assert store.find(keys) == {
+        ("File", "file_1"): "SUB_1",
+        ("File", 1): "SUB_1",
+        ("File", "file_2"): "SUB_2",
+        ("File", "file_3"): "SUB_2",
+    }
+    # A view without a submission does not find its identifiers
+    assert store.excluding("SUB_2").find(keys) == {
+        ("File", "file_1"): "SUB_1",
+        ("File", 1): "SUB_1",
+    }
+    assert store.remove("SUB_1") == 2
+    assert store.find(keys).keys() == {("File", "file_2"), ("File", "file_3")}
+    store.close()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("disk_index", [False, True])
+def test_validate_with_identifier_store(disk_index, workers, tmp_path):
+    """Test that references and identifiers are checked against the store"""
+    compiled_schema = load_schema(SCHEMA)
+    accepted, new = split_submission()
+    store = IdentifierStore(tmp_path / "identifiers.sqlite")
+
+    def validate(data, submission=None, **scope):
+        validator = Validator(
+            schema=compiled_schema,
+            plugins=load_plugins(VALIDATION_PLUGINS, compiled_schema),
+            workers=workers,
+            chunk_size=1,
+            disk_index=disk_index,
+            identifier_store=store,
+            submission=submission,
+        )
+        return validator.validate(data, "Submission", **scope)
+
+    # References to objects of accepted submissions are only known once the
+    # submissions are registered
+    report = validate(new)
+    assert not report.valid
+    assert [
+        message.field
+        for result in report.validation_results
+        for message in result.validation_messages
+    ] == ["datasets.0.files", "experiments.0.samples"]
+    store.register(
+        "SUB_1", submission_identifiers(compiled_schema.index, accepted, "Submission")
+    )
+    assert validate(new).valid
+
+    # Unknown references are still reported
+    new["datasets"][0]["files"].append("test_sample_03_R1")
+    report = validate(new)
+    assert not report.valid
+    messages = report.validation_results[0].validation_messages
+    assert len(messages) == 1
+    assert messages[0].message == "Unknown reference(s) ['test_sample_03_R1']"
+
+    # Identifiers used by an accepted submission are reported as duplicates
+    new["datasets"][0]["files"].pop()
+    new["files"].append(accepted["files"][0])
+    report = validate(new)
+    assert not report.valid
+    messages = report.validation_results[1].validation_messages
+    assert len(messages) == 1
+    assert messages[0].field == "files.2.alias"
+    assert messages[0].message == (
+        "Duplicate value for identifier, same value used by accepted submission"
+        + " SUB_1."
+    )
+    # Only the identifiers of the selected objects are checked
+    assert validate(new, only_class="Sample").valid
+
+    # A registered submission validated again does not conflict with itself
+    assert not validate(accepted).valid
+    assert validate(accepted, submission="SUB_1").valid
+    assert not validate(new, submission="SUB_2").valid
+    store.close()
+
+
+def test_register_and_validate_cli(tmp_path):
+    """Test registering a submission and validating against it via the CLI"""
+    accepted, new = split_submission()
+    for name, data in [("accepted", accepted), ("new", new)]:
+        with open(tmp_path / f"{name}.json", "w", encoding="utf-8") as file:
+            json.dump(data, file)
+    store = tmp_path / "identifiers.sqlite"
+    options = ["--schema", str(SCHEMA), "--identifier-store", str(store)]
+
+    def register(file_name, submission):
+        return CliRunner().invoke(
+            cli,
+            [
+                "register",
+                *options,
+                "--input",
+                str(tmp_path / file_name),
+                "--submission",
+                submission,
+            ],
+        )
+
+    def validate(*submission):
+        return CliRunner().invoke(
+            cli,
+            [
+                *options,
+                "--input",
+                str(tmp_path / "new.json"),
+                "--report",
+                str(tmp_path / "report.json"),
+                *submission,
+            ],
+        )
+
+    result = register("accepted.json", "SUB_1")
+    assert result.exit_code == 0
+    assert "Registered 3 identifiers" in result.output
+    result = validate()
+    assert result.exit_code == 0
+    assert "is valid!" in result.output
+
+    # Once registered, the submission is only valid without its own identifiers
+    assert register("new.json", "SUB_2").exit_code == 0
+    for submission, valid in [([], False), (["--submission", "SUB_2"], True)]:
+        result = validate(*submission)
+        assert result.exit_code == 0
+        assert ("is valid!" in result.output) == valid
+
+    # Only the register command creates the store
+    result = CliRunner().invoke(
+        cli,
+        [
+            "--schema",
+            str(SCHEMA),
+            "--identifier-store",
+            str(tmp_path / "missing.sqlite"),
+            "--input",
+            str(tmp_path / "new.json"),
+            "--report",
+            str(tmp_path / "report.json"),
+        ],
+    )
+    assert result.exit_code != 0
+    assert not (tmp_path / "missing.sqlite").exists()
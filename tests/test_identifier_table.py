@@ -0,0 +1,100 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test the compact containers for identifiers and paths"""
+
+import pytest
+
+from ghga_validator.core.identifier_table import (
+    BloomFilter,
+    IdentifierSet,
+    IdentifierTable,
+    PathArray,
+)
+from ghga_validator.utils import ObjectPath
+
+
+def test_identifier_table():
+    """Test that identifiers are mapped to dense codes per class"""
+    table = IdentifierTable()
+
+    assert table.encode("File", "file_1") == 0
+    assert table.encode("File", "file_2") == 1
+    assert table.encode("Sample", "file_1") == 2
+    assert table.encode("File", "file_1") == 0
+    assert len(table) == 3
+
+    # Codes are decoded to the first encoded object of an identifier
+    identifier = "".join(["file_", "1"])
+    assert table.decode(table.encode("File", identifier)) is not identifier
+    assert table.decode(table.encode("File", identifier)) == identifier
+
+    with pytest.raises(TypeError):
+        table.encode("File", ["file_1"])
+
+
+def test_identifier_set():
+    """Test the bitmap of identifier codes"""
+    codes = IdentifierSet()
+
+    assert codes.add(9) is True
+    assert codes.add(9) is False
+    assert codes.add(0) is True
+    assert 9 in codes
+    assert 0 in codes
+    assert 8 not in codes
+    assert 1000 not in codes
+
+
+def test_path_array():
+    """Test that the stored paths are restored with their keys"""
+    root = ObjectPath()
+    files = root.child("files")
+    paths = [
+        root,
+        files.child(0),
+        files.child(1),
+        root.child("datasets", 0, "files"),
+        root.child("samples", "sample_1"),
+    ]
+
+    path_array = PathArray()
+    positions = [path_array.append(path) for path in paths]
+    assert [path_array[position] for position in positions] == paths
+
+    # Paths can be stored at any position, the gaps are empty
+    path_array[10] = files.child(2)
+    assert len(path_array) == 11
+    assert path_array[10] == ["files", 2]
+    with pytest.raises(IndexError):
+        path_array[7]  # pylint: disable=pointless-statement
+
+
+def test_bloom_filter():
+    """Test that the Bloom filter has no false negatives as it grows"""
+    bloom_filter = BloomFilter(capacity=256)
+    keys = [("File", f"file_{number}") for number in range(1000)]
+
+    possibly_present = [bloom_filter.add(key) for key in keys]
+    assert all(key in bloom_filter for key in keys)
+    # Only a few new keys are reported as possibly present
+    assert sum(possibly_present) < 100
+    assert all(bloom_filter.add(key) for key in keys)
+
+    # Equal keys are found, unhashable keys are always possibly present
+    bloom_filter.add(("File", 1))
+    assert ("File", 1.0) in bloom_filter
+    assert bloom_filter.add(("File", ["file_1"]))
+    assert ("File", ["file_1"]) in bloom_filter
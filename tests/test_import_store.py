@@ -0,0 +1,96 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test resolving schema imports from the local import store"""
+
+from linkml_runtime.utils.schemaview import SchemaView
+from typer.testing import CliRunner
+
+from ghga_validator.cli import cli
+from ghga_validator.core.compiled_schema import CompiledSchema
+from ghga_validator.my_linkml.import_store import ImportStore
+
+from .fixtures.utils import BASE_DIR
+
+
+def test_import_store(tmp_path, monkeypatch):
+    """Test that prefetched imports are resolved offline and memoized"""
+    schema = BASE_DIR / "schemas" / "advance_model.yaml"
+    store_dir = tmp_path / "imports"
+
+    result = CliRunner().invoke(
+        cli,
+        ["prefetch-imports", "--schema", str(schema), "--import-store", str(store_dir)],
+    )
+    assert result.exit_code == 0
+    assert (store_dir / "linkml" / "types.yaml").is_file()
+
+    expected = SchemaView(str(schema))
+    expected_types = expected.all_types().keys()
+    expected_classes = expected.all_classes().keys()
+
+    def offline(*args, **kwargs):
+        raise AssertionError("Imports must not be resolved by LinkML")
+
+    monkeypatch.setattr(SchemaView, "load_import", offline)
+
+    import_store = ImportStore(store_dir)
+    for _ in range(2):
+        schema_view = CompiledSchema.from_file(
+            schema, import_store=import_store
+        ).schema_view
+        assert schema_view.all_types().keys() == expected_types
+        assert schema_view.all_classes().keys() == expected_classes
+
+    cache_info = import_store.cache_info()
+    assert cache_info.misses == 1
+    assert cache_info.hits == 1
+
+
+def test_register_offline(tmp_path, monkeypatch):
+    """Test that the register command resolves imports from the import store"""
+    schema = BASE_DIR / "schemas" / "advance_model.yaml"
+    store_dir = tmp_path / "imports"
+    cache_dir = tmp_path / "cache"
+    ImportStore(store_dir).populate(schema)
+
+    def offline(*args, **kwargs):
+        raise AssertionError("Imports must not be resolved by LinkML")
+
+    monkeypatch.setattr(SchemaView, "load_import", offline)
+
+    result = CliRunner().invoke(
+        cli,
+        [
+            "register",
+            "--schema",
+            str(schema),
+            "--input",
+            str(BASE_DIR / "data" / "example_data.json"),
+            "--submission",
+            "SUB_1",
+            "--identifier-store",
+            str(tmp_path / "identifiers.sqlite"),
+            "--target-class",
+            "Submission",
+            "--import-store",
+            str(store_dir),
+            "--cache-dir",
+            str(cache_dir),
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert "Registered" in result.output
+    assert any(cache_dir.iterdir())
@@ -15,10 +15,19 @@
 
 """Test object validator"""
 
+import sys
+import tracemalloc
+
 import yaml
 from linkml_runtime.utils.schemaview import SchemaView
 
-from ghga_validator.my_linkml.object_iterator import ObjectIterator
+from ghga_validator.my_linkml.object_iterator import (
+    LazyElement,
+    ObjectIterator,
+    Projection,
+)
+from ghga_validator.my_linkml.schema_index import SchemaIndex
+from ghga_validator.utils import ObjectPath, path_as_string
 
 from .fixtures.utils import BASE_DIR
 
@@ -52,3 +61,188 @@ def test_object_iterator():
     assert len(list1) == len(list2)
     assert list1[0][0:2] == list2[0][0:2]
     assert list1[0][3] != list2[0][3]
+
+
+TREE_SCHEMA = """
+id: https://example.org/tree
+name: tree
+prefixes:
+  linkml: https://w3id.org/linkml/
+imports:
+  - linkml:types
+default_range: string
+classes:
+  Node:
+    tree_root: true
+    slots:
+      - id
+      - children
+      - leaves
+  Leaf:
+    slots:
+      - id
+slots:
+  id:
+    identifier: true
+  children:
+    range: Node
+    multivalued: true
+    inlined_as_list: true
+  leaves:
+    range: Leaf
+    multivalued: true
+    inlined: true
+"""
+
+
+def test_object_iterator_order(tmp_path):
+    """Test that elements are yielded depth first in slot order"""
+    schema = tmp_path / "tree.yaml"
+    schema.write_text(TREE_SCHEMA, encoding="utf8")
+    data = {
+        "id": "a",
+        "children": [
+            {"id": "b", "children": [{"id": "c"}], "leaves": {"l1": {}}},
+            {"id": "d"},
+        ],
+        "leaves": {"l2": {}},
+    }
+
+    elements = list(ObjectIterator(SchemaView(schema), data))
+
+    assert elements == [
+        ("Node", "a", {"id": "a", "children": ["b", "d"], "leaves": ["l2"]}, []),
+        (
+            "Node",
+            "b",
+            {"id": "b", "children": ["c"], "leaves": ["l1"]},
+            ["children", 0],
+        ),
+        ("Node", "c", {"id": "c"}, ["children", 0, "children", 0]),
+        ("Leaf", "l1", {"id": "l1"}, ["children", 0, "leaves", "l1"]),
+        ("Node", "d", {"id": "d"}, ["children", 1]),
+        ("Leaf", "l2", {"id": "l2"}, ["leaves", "l2"]),
+    ]
+
+
+def test_object_iterator_deep_nesting(tmp_path):
+    """Test that the nesting depth of the data is not limited by the Python stack"""
+    schema = tmp_path / "tree.yaml"
+    schema.write_text(TREE_SCHEMA, encoding="utf8")
+    depth = 5 * sys.getrecursionlimit()
+    data: dict = {"id": "0"}
+    node = data
+    for level in range(1, depth):
+        child = {"id": str(level)}
+        node["children"] = [child]
+        node = child
+
+    identifiers = [
+        identifier for _, identifier, _, _ in ObjectIterator(SchemaView(schema), data)
+    ]
+
+    assert identifiers == [str(level) for level in range(depth)]
+
+
+def test_object_iterator_dict_inlined_zero_copy(tmp_path):
+    """Test that elements inlined as dictionary are neither copied nor modified"""
+    schema = tmp_path / "tree.yaml"
+    schema.write_text(TREE_SCHEMA, encoding="utf8")
+    index = SchemaIndex.from_schema_view(SchemaView(schema))
+    for class_name in ("Node", "Leaf"):
+        index.class_plan(class_name)
+    n_leaves = 20000
+
+    tracemalloc.start()
+    try:
+        data = {
+            "id": "root",
+            "leaves": {f"leaf_{number}": {} for number in range(n_leaves)},
+        }
+        data_size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        iterator = ObjectIterator(index, data)
+        n_elements = sum(1 for _ in iterator)
+        _, peak_size = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert n_elements == n_leaves + 1
+    assert all(leaf == {} for leaf in data["leaves"].values())
+    # The traversal must not hold a copy of the collection
+    assert peak_size - data_size < data_size / 10
+
+
+def test_object_iterator_lazy_elements(tmp_path, monkeypatch):
+    """Test that elements are only re-serialized once when they are accessed"""
+    schema = tmp_path / "tree.yaml"
+    schema.write_text(TREE_SCHEMA, encoding="utf8")
+    data = {"id": "a", "children": [{"id": "b"}, {"id": "c"}]}
+    re_serialize = ObjectIterator._re_serialize_element
+    calls = []
+
+    def counting_re_serialize(*args):
+        calls.append(args)
+        return re_serialize(*args)
+
+    monkeypatch.setattr(
+        ObjectIterator, "_re_serialize_element", staticmethod(counting_re_serialize)
+    )
+    elements = list(ObjectIterator(SchemaView(schema), data))
+
+    assert [identifier for _, identifier, _, _ in elements] == ["a", "b", "c"]
+    assert not calls
+
+    root_data = elements[0][2]
+    assert isinstance(root_data, LazyElement)
+    assert root_data == {"id": "a", "children": ["b", "c"]}
+    assert root_data["children"] == ["b", "c"]
+    assert len(calls) == 1
+
+
+def test_object_iterator_shared_paths(tmp_path):
+    """Test that the paths of child elements share the path of their parent"""
+    schema = tmp_path / "tree.yaml"
+    schema.write_text(TREE_SCHEMA, encoding="utf8")
+    data = {"id": "a", "children": [{"id": "b", "children": [{"id": "c"}]}]}
+
+    paths = [path for _, _, _, path in ObjectIterator(SchemaView(schema), data)]
+
+    assert paths == [[], ["children", 0], ["children", 0, "children", 0]]
+    assert paths[2].parent.parent is paths[1]
+    assert path_as_string(paths[2]) == "children.0.children.0"
+    assert path_as_string(paths[2].child("id")) == "children.0.children.0.id"
+    assert ObjectPath.from_keys(["children", 0]) == paths[1]
+    assert len(paths[2]) == 4
+    assert paths[2][-1] == 0
+
+
+def test_object_iterator_projections():
+    """Test that the projections extract the class, identifier and references"""
+    schema = SchemaView(BASE_DIR / "schemas" / "advance_model.yaml")
+    with open(BASE_DIR / "data" / "example_data.json", encoding="utf8") as json_file:
+        data = yaml.safe_load(json_file)
+
+    full = list(ObjectIterator(schema, data, "Submission"))
+    for projection in Projection:
+        projected = list(
+            ObjectIterator(schema, data, "Submission", projection=projection)
+        )
+        assert [element[:2] for element in projected] == [
+            element[:2] for element in full
+        ]
+        assert [element[3] for element in projected] == [element[3] for element in full]
+        for (class_name, _, data_projected, _), (_, _, data_full, _) in zip(
+            projected, full
+        ):
+            if projection == Projection.FULL:
+                expected = dict(data_full)
+            elif projection == Projection.REFERENCES:
+                expected = {
+                    slot_name: slot_value
+                    for slot_name, slot_value in data_full.items()
+                    if slot_name in {"files", "samples"} and class_name != "Submission"
+                }
+            else:
+                expected = {}
+            assert data_projected == expected
@@ -0,0 +1,85 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test generating JSON schemas for the classes reachable from the target class"""
+
+import json
+
+import pytest
+import yaml
+from jsonschema import Draft7Validator
+from linkml.generators.jsonschemagen import JsonSchemaGenerator
+
+from ghga_validator.core.compiled_schema import CompiledSchema
+from ghga_validator.my_linkml.jsonschemagen import reachable_elements
+
+from .fixtures.utils import BASE_DIR
+
+SCHEMAS = sorted((BASE_DIR / "schemas").glob("*.yaml"))
+
+DATA = sorted((BASE_DIR / "data").glob("*.json"))
+
+
+def _refs(json_schema):
+    """Yield all definitions referenced in a JSON schema"""
+    if isinstance(json_schema, dict):
+        for key, value in json_schema.items():
+            if key == "$ref":
+                yield value.rsplit("/", 1)[-1]
+            else:
+                yield from _refs(value)
+    elif isinstance(json_schema, list):
+        for value in json_schema:
+            yield from _refs(value)
+
+
+@pytest.mark.parametrize("schema", SCHEMAS, ids=lambda path: path.name)
+def test_reachable_json_schema(schema):
+    """Test that the reduced JSON schema validates like the full JSON schema"""
+    compiled_schema = CompiledSchema.from_file(schema)
+    schema_view = compiled_schema.schema_view
+    data = []
+    for data_file in DATA:
+        with open(data_file, encoding="utf8") as json_file:
+            data.append(yaml.safe_load(json_file))
+
+    for class_name, class_def in schema_view.all_classes().items():
+        if class_def.abstract or class_def.mixin:
+            continue
+        classes, _ = reachable_elements(schema_view, class_name)
+        assert class_name in classes
+        full_json_schema = json.loads(
+            JsonSchemaGenerator(
+                schema=compiled_schema._merged_schema(), top_class=class_name
+            ).serialize()
+        )
+        reduced = dict(compiled_schema.json_schema(class_name))
+        full = dict(full_json_schema)
+
+        assert set(_refs(reduced)) <= set(reduced["$defs"])
+        for name, definition in reduced["$defs"].items():
+            assert definition == full["$defs"][name]
+        reduced.pop("$defs")
+        full.pop("$defs")
+        assert reduced == full
+
+        reduced_validator = Draft7Validator(compiled_schema.json_schema(class_name))
+        full_validator = Draft7Validator(full_json_schema)
+        for instance in data:
+            reduced_errors = reduced_validator.iter_errors(instance)
+            full_errors = full_validator.iter_errors(instance)
+            assert [error.message for error in reduced_errors] == [
+                error.message for error in full_errors
+            ]
@@ -0,0 +1,63 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test compiling schemas into bundles and validating against them"""
+
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from ghga_validator.cli import cli, load_schema, validate_json_file
+from ghga_validator.core.schema_bundle import BundleVersionError, read_bundle
+
+from .fixtures.utils import BASE_DIR
+
+
+def test_validate_with_bundle(tmp_path):
+    """Test that validating against a bundle gives the same report"""
+    schema = BASE_DIR / "schemas" / "advance_model.yaml"
+    bundle = tmp_path / "schema.bundle"
+
+    result = CliRunner().invoke(
+        cli, ["compile", "--schema", str(schema), "--output", str(bundle)]
+    )
+    assert result.exit_code == 0
+
+    for data_file in ["example_data.json", "example_data_wrong_ref.json"]:
+        file = BASE_DIR / "data" / data_file
+        compiled_schema = load_schema(bundle)
+        valid = validate_json_file(
+            file, compiled_schema, tmp_path / "bundle.json", "Submission"
+        )
+        assert valid is validate_json_file(
+            file, schema, tmp_path / "schema.json", "Submission"
+        )
+        with open(tmp_path / "bundle.json", encoding="utf8") as report:
+            bundle_report = json.load(report)
+        with open(tmp_path / "schema.json", encoding="utf8") as report:
+            schema_report = json.load(report)
+        assert bundle_report == schema_report
+        # The LinkML schema is not needed for validating against a bundle
+        assert compiled_schema._schema_view is None
+
+
+def test_stale_bundle(tmp_path):
+    """Test that bundles of a different format version are rejected"""
+    bundle = tmp_path / "schema.bundle"
+    bundle.write_text("ghga-validator-bundle 0\n{}", encoding="utf8")
+
+    with pytest.raises(BundleVersionError):
+        read_bundle(bundle)
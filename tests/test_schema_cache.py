@@ -0,0 +1,60 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test the on-disk cache of compiled schemas"""
+
+import shutil
+
+from ghga_validator.cli import validate_json_file
+from ghga_validator.core.schema_cache import SchemaCache, schema_fingerprint
+
+from .fixtures.utils import BASE_DIR
+
+
+def test_schema_cache_roundtrip(tmp_path):
+    """Test that a cached schema is reused and validates like a fresh one"""
+    schema = BASE_DIR / "schemas" / "advance_model.yaml"
+    file = BASE_DIR / "data" / "example_data_wrong_ref.json"
+    report = tmp_path / "report.json"
+    cache = SchemaCache(tmp_path / "cache")
+
+    assert validate_json_file(file, schema, report, "Submission", cache=cache) is False
+    entries = list((tmp_path / "cache").iterdir())
+    assert [entry.name for entry in entries] == [f"{schema_fingerprint(schema)}.pickle"]
+
+    compiled_schema = cache.load(schema)
+    assert "Submission" in compiled_schema.json_schemas
+    assert "File" in compiled_schema.schema_view.all_classes()
+    assert validate_json_file(file, schema, report, "Submission", cache=cache) is False
+
+
+def test_schema_cache_invalidation(tmp_path):
+    """Test that changing the schema content changes the fingerprint"""
+    schema = tmp_path / "schema.yaml"
+    shutil.copy(BASE_DIR / "schemas" / "minimal_model.yaml", schema)
+    fingerprint = schema_fingerprint(schema)
+
+    with open(schema, "a", encoding="utf8") as schema_file:
+        schema_file.write("\n# modified\n")
+
+    assert schema_fingerprint(schema) != fingerprint
+
+
+def test_schema_cache_eviction(tmp_path):
+    """Test that the cache does not grow beyond its maximum size"""
+    cache = SchemaCache(tmp_path, max_size=1)
+    cache.load(BASE_DIR / "schemas" / "minimal_model.yaml", "Submission")
+
+    assert not list(tmp_path.glob("*.pickle"))
@@ -0,0 +1,101 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test the schema lookup index"""
+
+import json
+import pickle
+import sys
+
+import pytest
+from linkml_runtime.utils.schemaview import SchemaView
+
+from ghga_validator.my_linkml.object_iterator import ObjectIterator
+from ghga_validator.my_linkml.schema_index import SchemaIndex
+
+from .fixtures.utils import BASE_DIR
+
+
+@pytest.mark.parametrize(
+    "schema_file", ["advance_model.yaml", "model_with_inherited_classes.yaml"]
+)
+def test_schema_index(schema_file):
+    """Test that the index agrees with the SchemaView it was built from"""
+    schema = SchemaView(BASE_DIR / "schemas" / schema_file)
+    index = SchemaIndex.from_schema_view(schema)
+
+    for class_name in schema.all_classes():
+        id_slot = schema.get_identifier_slot(class_name)
+        assert index.identifier_slot(class_name) == (id_slot.name if id_slot else None)
+        for slot_def in schema.class_induced_slots(class_name):
+            slot = index.slot(class_name, slot_def.name)
+            assert slot.range_class == (
+                slot_def.range if slot_def.range in schema.all_classes() else None
+            )
+            assert slot.multivalued == bool(slot_def.multivalued)
+            assert slot.inlined_as_list == slot_def.inlined_as_list
+            assert slot.is_inlined == schema.is_inlined(slot_def)
+
+    assert index.tree_roots == ("Submission",)
+    with pytest.raises(ValueError):
+        index.slot("Submission", "no_such_slot")
+
+
+def test_class_plan():
+    """Test that traversal plans are compiled once and shared by iterators"""
+    schema = SchemaView(BASE_DIR / "schemas" / "advance_model.yaml")
+    index = SchemaIndex.from_schema_view(schema)
+    file = BASE_DIR / "data" / "example_data.json"
+    with open(file, encoding="utf8") as json_file:
+        data = json.load(json_file)
+
+    plan = index.class_plan("Submission")
+    assert index.class_plan("Submission") is plan
+    assert plan.identifier_slot == index.identifier_slot("Submission")
+    assert list(plan.recursion_slots) == [
+        slot.name
+        for slot in index.class_slots("Submission")
+        if slot.range_class and slot.inlined is not False
+    ]
+    for slot_plan in plan.recursion_slots.values():
+        assert slot_plan.identifier_slot == index.identifier_slot(slot_plan.range_class)
+
+    iterated = list(ObjectIterator(index, data, "Submission"))
+    assert {class_name for class_name, *_ in iterated} <= set(index._class_plans)
+    child_iterator = ObjectIterator(index, data["files"][0], "File")
+    assert child_iterator._plan is index.class_plan("File")
+
+    # Plans are not pickled, but compiled again on demand
+    restored = pickle.loads(pickle.dumps(index))
+    assert restored._class_plans == {}
+    assert restored.class_plan("Submission").recursion_slots == plan.recursion_slots
+
+
+def test_interned_names():
+    """Test that the names of the index are shared objects"""
+    schema = SchemaView(BASE_DIR / "schemas" / "advance_model.yaml")
+    index = SchemaIndex.from_schema_view(schema)
+    # Copies of the names, as created by parsing JSON
+    class_name, slot_name = json.loads('["Sample", "files"]')
+
+    for restored in (
+        index,
+        SchemaIndex.from_dict(json.loads(json.dumps(index.to_dict()))),
+        pickle.loads(pickle.dumps(index)),
+    ):
+        slot = restored.slot(class_name, slot_name)
+        assert slot.name is sys.intern(slot_name)
+        assert slot.range_class is sys.intern("File")
+        assert restored.identifier_slot(class_name) is sys.intern("alias")
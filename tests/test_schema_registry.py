@@ -0,0 +1,97 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test sharing schemas and plugins via the schema registry"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from ghga_validator.cli import DEFAULT_PLUGINS, VALIDATION_PLUGINS, validate_json_file
+from ghga_validator.core.schema_registry import SchemaRegistry
+
+from .fixtures.utils import BASE_DIR
+
+SCHEMAS = [
+    BASE_DIR / "schemas" / "minimal_model.yaml",
+    BASE_DIR / "schemas" / "advance_model.yaml",
+    BASE_DIR / "schemas" / "advance_model_attr.yaml",
+]
+
+
+def test_registry_lru():
+    """Test that schemas and plugins are shared and evicted by recent use"""
+    registry = SchemaRegistry(capacity=2)
+    first = registry.get(SCHEMAS[0])
+    plugins = first.plugins(DEFAULT_PLUGINS)
+    assert registry.get(SCHEMAS[0]) is first
+    assert first.plugins(DEFAULT_PLUGINS)[0] is plugins[0]
+
+    registry.get(SCHEMAS[1])
+    registry.get(SCHEMAS[0])
+    # The least recently used schema is evicted
+    registry.get(SCHEMAS[2])
+    assert registry.get(SCHEMAS[0]) is first
+    cache_info = registry.cache_info()
+    assert cache_info.currsize == 2
+    assert cache_info.misses == 3
+
+    registry.get(SCHEMAS[1])
+    assert registry.cache_info().misses == 4
+
+
+def test_registry_threads():
+    """Test that concurrent validations load each schema once"""
+    registry = SchemaRegistry()
+    with open(
+        BASE_DIR / "data" / "example_data_wrong_ref.json", encoding="utf8"
+    ) as json_file:
+        data = json.load(json_file)
+
+    def validate(schema):
+        report = registry.validate(
+            schema, data, "Submission", DEFAULT_PLUGINS + VALIDATION_PLUGINS
+        )
+        return report.dict(exclude={"object"})
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        reports = list(executor.map(validate, SCHEMAS[:2] * 8))
+
+    assert registry.cache_info().misses == 2
+    expected = {
+        schema: SchemaRegistry()
+        .validate(schema, data, "Submission", DEFAULT_PLUGINS + VALIDATION_PLUGINS)
+        .dict(exclude={"object"})
+        for schema in SCHEMAS[:2]
+    }
+    for schema, report in zip(SCHEMAS[:2] * 8, reports):
+        assert report == expected[schema]
+
+
+def test_validate_json_file_with_registry(tmp_path):
+    """Test that validating with a registry produces the same report"""
+    registry = SchemaRegistry()
+    file = BASE_DIR / "data" / "example_data_wrong_ref.json"
+    for report in ["first.json", "second.json"]:
+        validate_json_file(
+            file, SCHEMAS[1], tmp_path / report, "Submission", registry=registry
+        )
+    validate_json_file(file, SCHEMAS[1], tmp_path / "fresh.json", "Submission")
+
+    reports = []
+    for report in ["first.json", "second.json", "fresh.json"]:
+        with open(tmp_path / report, encoding="utf8") as report_file:
+            reports.append(json.load(report_file))
+    assert reports[0] == reports[1] == reports[2]
+    assert registry.cache_info().hits == 1
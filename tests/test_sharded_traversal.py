@@ -0,0 +1,160 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test the traversal of top-level collections by worker processes"""
+
+import json
+
+import pytest
+
+from ghga_validator.cli import VALIDATION_PLUGINS, load_plugins, load_schema
+from ghga_validator.core.sharded_traversal import can_shard, summarize_shards
+from ghga_validator.core.validator import Validator
+from ghga_validator.my_linkml.object_iterator import ObjectIterator, Projection
+from ghga_validator.utils import path_as_string
+
+from .fixtures.utils import BASE_DIR
+
+
+def load_data(data_file: str) -> dict:
+    """Load a data file of the test fixtures"""
+    with open(BASE_DIR / "data" / data_file, encoding="utf-8") as json_file:
+        return json.load(json_file)
+
+
+def test_summarize_shards():
+    """Test that the shards are summarized in the order of a serial traversal"""
+    compiled_schema = load_schema(BASE_DIR / "schemas" / "advance_model.yaml")
+    index = compiled_schema.index
+    data = load_data("example_data.json")
+
+    assert can_shard(index, data, "Submission", chunk_size=1)
+    shards = list(
+        summarize_shards(index, data, "Submission", None, workers=2, chunk_size=1)
+    )
+    # The root element is summarized first, without its top-level slots
+    assert len(shards) == 1 + sum(len(data[slot]) for slot in data)
+    assert shards[0].paths == []
+
+    # The root element has no identifier and is not yielded
+    serial = list(
+        ObjectIterator(index, data, "Submission", projection=Projection.REFERENCES)
+    )
+    assert [
+        (class_name, identifier, shard.paths[position], shard.is_selected(position))
+        for shard in shards
+        for position, class_name, identifier in shard.elements()
+    ] == [
+        (class_name, identifier, path_as_string(path), True)
+        for class_name, identifier, _, path in serial
+    ]
+    # The references point to other top-level slots, so none of them are
+    # resolved within a shard and all are sent back
+    assert [
+        (range_class, field, value, shard.paths[position])
+        for shard in shards
+        for range_class, field, value, position in shard.references
+    ] == [
+        (index.slot(class_name, field).range_class, field, value, path_as_string(path))
+        for class_name, _, obj, path in serial
+        for field, value in obj.items()
+    ]
+
+
+@pytest.mark.parametrize("disk_index", [False, True])
+@pytest.mark.parametrize(
+    "data_file",
+    [
+        "example_data.json",
+        "example_data_wrong_ref.json",
+        "example_data_not_unique_id.json",
+    ],
+)
+def test_validate_sharded(data_file, disk_index):
+    """Test that the report does not depend on the number of workers"""
+    compiled_schema = load_schema(BASE_DIR / "schemas" / "advance_model.yaml")
+    data = load_data(data_file)
+
+    reports = [
+        Validator(
+            schema=compiled_schema,
+            plugins=load_plugins(VALIDATION_PLUGINS, compiled_schema),
+            workers=workers,
+            chunk_size=chunk_size,
+            disk_index=disk_index,
+        ).validate(data, "Submission")
+        for workers, chunk_size in [(1, 1), (2, 1), (2, 2)]
+    ]
+    assert reports[0] == reports[1] == reports[2]
+
+
+def test_validate_sharded_scope():
+    """Test that a scope selects the same elements as by a serial traversal"""
+    compiled_schema = load_schema(BASE_DIR / "schemas" / "nested_model.yaml")
+    data = {
+        "files": [{"alias": "file_1"}, {"alias": "file_2"}],
+        "samples": [
+            {
+                "alias": "sample_1",
+                "files": ["file_1"],
+                "aliquots": [
+                    {"alias": "aliquot_1", "files": ["file_3"]},
+                    {"alias": "aliquot_2", "files": ["file_2"]},
+                ],
+            },
+            {
+                "alias": "sample_2",
+                "files": ["file_4"],
+                "aliquots": [{"alias": "aliquot_1", "files": ["file_1"]}],
+            },
+        ],
+    }
+
+    reports = [
+        Validator(
+            schema=compiled_schema,
+            plugins=load_plugins(VALIDATION_PLUGINS, compiled_schema),
+            workers=workers,
+            chunk_size=1,
+        ).validate(data, "Submission", only_class="Sample")
+        for workers in (1, 2)
+    ]
+    assert [
+        [message.field for message in result.validation_messages]
+        for result in reports[0].validation_results
+    ] == [
+        ["samples.0.aliquots.0.files", "samples.1.files"],
+        ["samples.1.aliquots.0.alias"],
+    ]
+    assert reports[0] == reports[1]
+
+    for scope in [
+        {"only_class": "Aliquot"},
+        {"only_path": "samples.1"},
+        {"only_path": "samples.0.aliquots.0"},
+        {"only_class": "File", "only_path": "files"},
+    ]:
+        reports = [
+            Validator(
+                schema=compiled_schema,
+                plugins=load_plugins(VALIDATION_PLUGINS, compiled_schema),
+                workers=workers,
+                chunk_size=1,
+                disk_index=disk_index,
+            ).validate(data, "Submission", **scope)
+            for workers in (1, 2)
+            for disk_index in (False, True)
+        ]
+        assert reports[0] == reports[1] == reports[2] == reports[3]
@@ -0,0 +1,73 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test the single traversal shared by the traversing plugins"""
+
+import json
+
+import pytest
+
+from ghga_validator.core import validator as validator_module
+from ghga_validator.core.compiled_schema import CompiledSchema
+from ghga_validator.core.validator import Validator
+from ghga_validator.my_linkml.object_iterator import Projection
+from ghga_validator.plugins.jsonschema_validation import GHGAJsonSchemaValidationPlugin
+from ghga_validator.plugins.ref_validation import RefValidationPlugin
+from ghga_validator.plugins.unique_identifier_validation import (
+    UniqueIdentifierValidationPlugin,
+)
+
+from .fixtures.utils import BASE_DIR
+
+
+@pytest.mark.parametrize(
+    "data_file",
+    [
+        "example_data.json",
+        "example_data_wrong_ref.json",
+        "example_data_not_unique_id.json",
+    ],
+)
+def test_single_traversal(data_file, monkeypatch):
+    """Test that all traversing plugins share one traversal with equal results"""
+    compiled_schema = CompiledSchema.from_file(
+        BASE_DIR / "schemas" / "advance_model.yaml"
+    )
+    with open(BASE_DIR / "data" / data_file, encoding="utf-8") as json_file:
+        data = json.load(json_file)
+    plugins = [
+        GHGAJsonSchemaValidationPlugin(schema=compiled_schema),
+        RefValidationPlugin(schema=compiled_schema),
+        UniqueIdentifierValidationPlugin(schema=compiled_schema),
+    ]
+    expected = [plugin.validate(data, "Submission") for plugin in plugins]
+
+    traversals = []
+    object_iterator = validator_module.ObjectIterator
+
+    def counting_iterator(*args, **kwargs):
+        traversals.append(kwargs)
+        return object_iterator(*args, **kwargs)
+
+    monkeypatch.setattr(validator_module, "ObjectIterator", counting_iterator)
+    report = Validator(schema=compiled_schema, plugins=plugins).validate(
+        data, "Submission"
+    )
+
+    assert len(traversals) == 1
+    # The largest projection requested by the traversing plugins
+    assert traversals[0]["projection"] == Projection.REFERENCES
+    assert report.validation_results == expected
+    assert report.valid == all(result.valid for result in expected)
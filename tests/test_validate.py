@@ -17,7 +17,10 @@
 
 import os
 
-from ghga_validator.cli import validate_json_file
+from typer.testing import CliRunner
+
+from ghga_validator.cli import cli, load_schema, validate_json_file
+from ghga_validator.schema_utils import get_target_class
 
 from .fixtures.utils import BASE_DIR
 
@@ -32,3 +35,32 @@ def test_validate_slots():
     assert validate_json_file(file, schema, report, str(target_class)) is True
     if os.path.exists(report):
         os.remove(report)
+
+
+def test_validate_shared_schema(tmp_path):
+    """Test that a schema loaded once can be reused for inference and validation"""
+    compiled_schema = load_schema(BASE_DIR / "schemas" / "advance_model.yaml")
+    target_class = get_target_class(compiled_schema)
+    report = tmp_path / "report.json"
+
+    assert target_class == "Submission"
+    for data_file, valid in [
+        ("example_data.json", True),
+        ("example_data_wrong_ref.json", False),
+    ]:
+        file = BASE_DIR / "data" / data_file
+        assert validate_json_file(file, compiled_schema, report, target_class) is valid
+
+
+def test_cli_main(tmp_path):
+    """Test the command line interface with an inferred target class"""
+    schema = BASE_DIR / "schemas" / "advance_model.yaml"
+    file = BASE_DIR / "data" / "example_data.json"
+    report = tmp_path / "report.json"
+
+    result = CliRunner().invoke(
+        cli, ["--schema", str(schema), "--input", str(file), "--report", str(report)]
+    )
+
+    assert result.exit_code == 0
+    assert "is valid!" in result.stdout
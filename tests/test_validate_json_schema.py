@@ -17,7 +17,14 @@
 
 import os
 
+import yaml
+from linkml_runtime.utils.schemaview import SchemaView
+
 from ghga_validator.cli import validate_json_file
+from ghga_validator.plugins.jsonschema_validation import (
+    GHGAJsonSchemaValidationPlugin,
+)
+from ghga_validator.utils import CacheInfo
 
 from .fixtures.utils import BASE_DIR
 
@@ -32,3 +39,21 @@ def test_validate_json_file_schema():
     assert validate_json_file(file, schema, report, str(target_class)) is False
     if os.path.exists(report):
         os.remove(report)
+
+
+def test_jsonschema_validator_memo():
+    """Test that the compiled JSON schema validator is reused across calls"""
+    schema = SchemaView(BASE_DIR / "schemas" / "advance_model.yaml")
+    file = BASE_DIR / "data" / "example_data_wrong_json_schema.json"
+    with open(file, encoding="utf8") as json_file:
+        data = yaml.safe_load(json_file)
+
+    plugin = GHGAJsonSchemaValidationPlugin(schema=schema, max_cached_validators=1)
+    first = plugin.validate(data, "Submission")
+    second = plugin.validate(data, "Submission")
+
+    assert first == second
+    assert plugin.cache_info() == CacheInfo(hits=1, misses=1, maxsize=1, currsize=1)
+
+    plugin.validate(data, "File")
+    assert plugin.cache_info().currsize == 1
@@ -0,0 +1,96 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test the validation against several target classes"""
+
+import json
+
+from typer.testing import CliRunner
+
+from ghga_validator.cli import (
+    DEFAULT_PLUGINS,
+    VALIDATION_PLUGINS,
+    cli,
+    load_plugins,
+    load_schema,
+)
+from ghga_validator.core.models import CombinedValidationReport
+from ghga_validator.core.validator import Validator
+
+from .fixtures.utils import BASE_DIR
+
+SCHEMA = BASE_DIR / "schemas" / "minimal_model_parent.yaml"
+DATA = BASE_DIR / "data" / "example_data_minimal_model.json"
+
+
+def test_validate_multiple_classes():
+    """Test that the combined report contains the report of each class"""
+    compiled_schema = load_schema(SCHEMA)
+    validator = Validator(
+        schema=compiled_schema,
+        plugins=load_plugins(DEFAULT_PLUGINS + VALIDATION_PLUGINS, compiled_schema),
+    )
+    with open(DATA, encoding="utf-8") as json_file:
+        data = json.load(json_file)
+
+    report = validator.validate(data, ["ParentSubmission", "Submission"])
+
+    assert isinstance(report, CombinedValidationReport)
+    assert report.types == ["ParentSubmission", "Submission"]
+    assert [class_report.type for class_report in report.reports] == report.types
+    assert report.reports[0] == validator.validate(data, "ParentSubmission")
+    assert report.reports[1] == validator.validate(data, "Submission")
+    assert report.reports[0].valid
+    assert not report.reports[1].valid
+    assert not report.valid
+
+    report = validator.validate(data["submissions"][0], ["Submission", "Submission"])
+    assert report.types == ["Submission"]
+    assert report.valid
+
+
+def test_cli_multiple_classes(tmp_path):
+    """Test the combined report written by the command line interface"""
+    report = tmp_path / "report.json"
+
+    result = CliRunner().invoke(
+        cli,
+        [
+            "--schema",
+            str(SCHEMA),
+            "--input",
+            str(DATA),
+            "--report",
+            str(report),
+            "--target-class",
+            "ParentSubmission",
+            "--target-class",
+            "Submission",
+        ],
+    )
+
+    assert result.exit_code == 0
+    assert "is invalid!" in result.stdout
+    with open(report, encoding="utf-8") as report_file:
+        combined_report = json.load(report_file)
+    assert "object" not in combined_report
+    assert combined_report["types"] == ["ParentSubmission", "Submission"]
+    assert [class_report["valid"] for class_report in combined_report["reports"]] == [
+        True,
+        False,
+    ]
+    assert all(
+        "object" not in class_report for class_report in combined_report["reports"]
+    )
@@ -17,7 +17,8 @@
 
 import os
 
-from ghga_validator.cli import validate_json_file
+from ghga_validator.cli import load_schema, validate_json_file
+from ghga_validator.plugins.ref_validation import RefValidationPlugin
 
 from .fixtures.utils import BASE_DIR
 
@@ -32,3 +33,61 @@ def test_validate_ref():
     assert validate_json_file(file, schema, report, str(target_class)) is False
     if os.path.exists(report):
         os.remove(report)
+
+
+def test_find_missing_refs():
+    """Test the lookup of references among the identifiers of a class"""
+    ids = {"file_1", "file_2", 3}
+    find_missing_refs = RefValidationPlugin.find_missing_refs
+
+    assert find_missing_refs("file_1", ids) == []
+    assert find_missing_refs("file_3", ids) == ["file_3"]
+    assert find_missing_refs(["file_1", 3], ids) == []
+    assert find_missing_refs(["file_4", "file_1", "file_4"], ids) == [
+        "file_4",
+        "file_4",
+    ]
+    assert find_missing_refs(["file_1", {"alias": "file_2"}], ids) == [
+        {"alias": "file_2"}
+    ]
+
+
+def test_ref_values():
+    """Test that the values of unknown references are reported as given"""
+    compiled_schema = load_schema(BASE_DIR / "schemas" / "advance_model.yaml")
+    plugin = RefValidationPlugin(schema=compiled_schema)
+    data = {
+        "files": [{"alias": "file_1"}, {"alias": "file_2"}],
+        "samples": [
+            {"alias": "sample_1", "files": ["file_1", "file_3"]},
+            {"alias": "sample_2", "files": ["file_2", {"alias": "file_1"}]},
+        ],
+        "datasets": [{"alias": "dataset_1", "files": ["file_2"]}],
+    }
+
+    result = plugin.validate(data, "Submission")
+    assert [
+        (message.field, message.value) for message in result.validation_messages
+    ] == [
+        ("samples.0.files", ["file_1", "file_3"]),
+        ("samples.1.files", ["file_2", {"alias": "file_1"}]),
+    ]
+
+
+def test_validate_refs_with_class_ids():
+    """Test the reference validation against pre-computed identifiers"""
+    compiled_schema = load_schema(BASE_DIR / "schemas" / "advance_model.yaml")
+    plugin = RefValidationPlugin(schema=compiled_schema)
+    data = {
+        "files": [{"alias": "file_1"}, {"alias": "file_2"}],
+        "samples": [{"alias": "sample_1", "files": ["file_1", "file_3"]}],
+    }
+
+    all_class_ids = plugin.get_all_class_ids(data, "Submission")
+    assert all_class_ids == {"File": ["file_1", "file_2"], "Sample": ["sample_1"]}
+    messages = plugin.validate_refs(data, "Submission", all_class_ids)
+    assert [(message.field, message.message) for message in messages] == [
+        ("samples.0.files", "Unknown reference(s) ['file_3']")
+    ]
+    all_class_ids["File"].append("file_3")
+    assert plugin.validate_refs(data, "Submission", all_class_ids) == []
@@ -0,0 +1,210 @@
+# Copyright 2021 - 2023 Universität Tübingen, DKFZ, EMBL, and Universität zu Köln
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test the validation restricted to a class or a subtree"""
+
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from ghga_validator.cli import (
+    DEFAULT_PLUGINS,
+    VALIDATION_PLUGINS,
+    cli,
+    load_plugins,
+    load_schema,
+)
+from ghga_validator.core.models import ValidationResult
+from ghga_validator.core.scope import ValidationScope
+from ghga_validator.core.validator import Validator
+from ghga_validator.plugins.base_plugin import ValidationPlugin
+
+from .fixtures.utils import BASE_DIR
+
+
+def report_fields(data_file: str, **scope) -> list[str]:
+    """Validate a data file with all plugins and return the reported fields"""
+    compiled_schema = load_schema(BASE_DIR / "schemas" / "advance_model.yaml")
+    validator = Validator(
+        schema=compiled_schema,
+        plugins=load_plugins(DEFAULT_PLUGINS + VALIDATION_PLUGINS, compiled_schema),
+    )
+    with open(BASE_DIR / "data" / data_file, encoding="utf-8") as json_file:
+        data = json.load(json_file)
+    report = validator.validate(data, "Submission", **scope)
+    return [
+        message.field
+        for result in report.validation_results
+        for message in result.validation_messages
+    ]
+
+
+@pytest.mark.parametrize(
+    "data_file,scope,fields",
+    [
+        (
+            "example_data_wrong_json_schema.json",
+            {},
+            [f"files.{i}.size" for i in range(4)],
+        ),
+        (
+            "example_data_wrong_json_schema.json",
+            {"only_path": "files.1"},
+            ["files.1.size"],
+        ),
+        ("example_data_wrong_json_schema.json", {"only_class": "Dataset"}, []),
+        (
+            "example_data_wrong_ref.json",
+            {"only_class": "Dataset"},
+            ["datasets.0.files"],
+        ),
+        ("example_data_wrong_ref.json", {"only_path": "files"}, []),
+        ("example_data_not_unique_id.json", {"only_path": "files"}, ["files.3.alias"]),
+        # The duplicate of a selected identifier is reported
+        (
+            "example_data_not_unique_id.json",
+            {"only_path": "files.2"},
+            ["files.3.alias"],
+        ),
+        ("example_data_not_unique_id.json", {"only_path": "files.1"}, []),
+        (
+            "example_data_not_unique_id.json",
+            {"only_class": "Sample", "only_path": "samples.1"},
+            ["samples.1.files"],
+        ),
+        (
+            "example_data_not_unique_id.json",
+            {"only_class": "Sample", "only_path": "files"},
+            [],
+        ),
+    ],
+)
+def test_validate_scope(data_file, scope, fields):
+    """Test that only the messages about the selected elements are reported"""
+    assert report_fields(data_file, **scope) == fields
+
+
+@pytest.mark.parametrize(
+    "scope",
+    [
+        {"only_class": "Sample_"},
+        {"only_path": "filez"},
+        {"only_path": "files.99"},
+        {"only_path": "files.01"},
+        {"only_path": "files.1.size"},
+        {"only_path": "files.1.alias"},
+        {"only_class": "File", "only_path": "files.-1"},
+    ],
+)
+def test_invalid_scope(scope):
+    """Test that a scope that can not select any element is rejected"""
+    with pytest.raises(ValueError):
+        report_fields("example_data_wrong_json_schema.json", **scope)
+
+
+def test_empty_path_scope():
+    """Test that an empty path selects the whole data"""
+    assert report_fields("example_data_wrong_json_schema.json", only_path="") == [
+        f"files.{i}.size" for i in range(4)
+    ]
+    assert report_fields(
+        "example_data_wrong_ref.json", only_class="Dataset", only_path=""
+    ) == ["datasets.0.files"]
+
+
+class EarlierSignaturePlugin(ValidationPlugin):
+    """Plugin that implements the validate signature without scope"""
+
+    NAME = "EarlierSignaturePlugin"
+
+    def validate(self, data, target_class):  # pylint: disable=arguments-differ
+        """Accept any data"""
+        return ValidationResult(
+            plugin_name=self.NAME, valid=True, validation_messages=[]
+        )
+
+
+def test_plugin_without_scope():
+    """Test plugins that do not accept a scope"""
+    compiled_schema = load_schema(BASE_DIR / "schemas" / "advance_model.yaml")
+    validator = Validator(
+        schema=compiled_schema,
+        plugins=[
+            EarlierSignaturePlugin(compiled_schema),
+            *load_plugins(VALIDATION_PLUGINS, compiled_schema),
+        ],
+    )
+    with open(BASE_DIR / "data" / "example_data.json", encoding="utf-8") as json_file:
+        data = json.load(json_file)
+
+    assert validator.validate(data, "Submission").valid
+    with pytest.raises(ValueError, match="EarlierSignaturePlugin"):
+        validator.validate(data, "Submission", only_class="File")
+
+
+def test_scope_subtrees():
+    """Test that selected elements are validated with the data inlined in them"""
+    compiled_schema = load_schema(BASE_DIR / "schemas" / "advance_model.yaml")
+    with open(BASE_DIR / "data" / "example_data.json", encoding="utf-8") as json_file:
+        data = json.load(json_file)
+
+    subtrees = list(
+        ValidationScope(only_path="samples").subtrees(
+            compiled_schema.index, data, "Submission"
+        )
+    )
+    assert [(class_name, list(path)) for class_name, path, _ in subtrees] == [
+        ("Sample", ["samples", 0]),
+        ("Sample", ["samples", 1]),
+    ]
+    assert subtrees[1][2] is data["samples"][1]
+
+    # The root element contains all other elements
+    subtrees = list(
+        ValidationScope(only_class="Submission").subtrees(
+            compiled_schema.index, data, "Submission"
+        )
+    )
+    assert len(subtrees) == 1
+
+    with pytest.raises(ValueError):
+        ValidationScope()
+
+
+def test_cli_scope(tmp_path):
+    """Test the scope options of the command line interface"""
+    schema = BASE_DIR / "schemas" / "advance_model.yaml"
+    file = BASE_DIR / "data" / "example_data_wrong_ref.json"
+    report = tmp_path / "report.json"
+
+    for options, valid in [
+        (["--only-path", "files"], True),
+        (["--only-class", "Dataset"], False),
+    ]:
+        result = CliRunner().invoke(
+            cli,
+            [
+                "--schema",
+                str(schema),
+                "--input",
+                str(file),
+                "--report",
+                str(report),
+                *options,
+            ],
+        )
+        assert result.exit_code == 0
+        assert ("is valid!" in result.stdout) is valid
@@ -17,7 +17,10 @@
 
 import os
 
-from ghga_validator.cli import validate_json_file
+from ghga_validator.cli import load_schema, validate_json_file
+from ghga_validator.plugins.unique_identifier_validation import (
+    UniqueIdentifierValidationPlugin,
+)
 
 from .fixtures.utils import BASE_DIR
 
@@ -32,3 +35,15 @@ def test_validate_unique_id():
     assert validate_json_file(file, schema, report, str(target_class)) is False
     if os.path.exists(report):
         os.remove(report)
+
+
+def test_validate_unique_fields():
+    """Test the uniqueness validation of a single plugin"""
+    compiled_schema = load_schema(BASE_DIR / "schemas" / "advance_model.yaml")
+    plugin = UniqueIdentifierValidationPlugin(schema=compiled_schema)
+    data = {"files": [{"alias": "file_1"}, {"alias": "file_2"}, {"alias": "file_1"}]}
+
+    messages = plugin.validate_unique_fields(data, "Submission")
+    assert [message.field for message in messages] == ["files.2.alias"]
+    data["files"].pop()
+    assert plugin.validate_unique_fields(data, "Submission") == []